@@ -0,0 +1,30 @@
+"""
+Benchmarks of engines across shapes of workloads::
+
+    $ python -m benchmarks --output results.json
+    $ python -m benchmarks -e thread -e asyncio -b io -b dispatch
+
+Benchmarks:
+
+* ``cpu`` - CPU-bound function by count of cores workers
+* ``io`` - requests to a local server with fixed latency
+* ``dispatch`` - overhead per item of tiny functions
+* ``chunks`` - the same items sent by chunks of tuned size
+* ``payload`` - transfer of 1MB results
+* ``scaling`` - CPU-bound function by 1..count of cores workers
+* ``startup`` - start and completion of empty functions
+* ``contention`` - results streamed by all cores at once
+* ``stop`` - latency of ``stop()`` of endless functions
+* ``imports`` - import of the package and the engine by a new interpreter
+
+CPU-bound benchmarks show whether threads run in parallel, on free-threaded
+builds of CPython (``python3.13t``) ``scaling`` of thread engines gets
+speedup close to processes::
+
+    $ python3.13t -m benchmarks -e thread -e process -b cpu -b scaling
+
+Results are written as JSON with metadata of the environment. Runs of
+different releases can be compared::
+
+    $ python -m benchmarks -o new.json --compare old.json --threshold 1.2
+"""
@@ -0,0 +1,151 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+from typing import Dict, List, Tuple
+
+from concurrently.aux import free_threading_build, gil_enabled
+
+from .runner import ENGINES
+from .suite import BENCHMARKS, Options, Record
+
+parser = argparse.ArgumentParser(
+    prog='python -m benchmarks',
+    description='Benchmarks of concurrently engines',
+)
+parser.add_argument(
+    '-e',
+    '--engine',
+    dest='engines',
+    action='append',
+    choices=sorted(ENGINES),
+    help='Engine to benchmark, can be repeated (default: all)',
+)
+parser.add_argument(
+    '-b',
+    '--benchmark',
+    dest='benchmarks',
+    action='append',
+    choices=sorted(BENCHMARKS),
+    help='Benchmark to run, can be repeated (default: all)',
+)
+parser.add_argument(
+    '-r',
+    '--repeat',
+    type=int,
+    default=3,
+    help='Number of runs of every benchmark, the median is reported '
+    '(default: 3)',
+)
+parser.add_argument(
+    '-s',
+    '--scale',
+    type=float,
+    default=1.0,
+    help='Multiplier of number of items (default: 1.0)',
+)
+parser.add_argument(
+    '--quick',
+    action='store_true',
+    help='Smoke run with tiny workloads, same as --repeat 1 --scale 0.01',
+)
+parser.add_argument(
+    '-o',
+    '--output',
+    metavar='FILE',
+    help='Write results as JSON to the file (default: stdout)',
+)
+parser.add_argument(
+    '--compare',
+    metavar='FILE',
+    help='Compare with results of previous run, exit with code 1 on '
+    'regression',
+)
+parser.add_argument(
+    '--threshold',
+    type=float,
+    default=1.2,
+    help='Ratio of time to the previous run that is a regression '
+    '(default: 1.2)',
+)
+
+
+def run(arguments) -> dict:
+    options = Options(repeat=arguments.repeat, scale=arguments.scale)
+    if arguments.quick:
+        options = options._replace(repeat=1, scale=0.01)
+
+    results: List[Record] = []
+    for name in arguments.benchmarks or BENCHMARKS:
+        for engine_name in arguments.engines or ENGINES:
+            engine = ENGINES[engine_name]
+            print('{} {}...'.format(name, engine.name), file=sys.stderr)
+            results.extend(BENCHMARKS[name](engine, options))
+
+    return {
+        'meta': {
+            'started_at': datetime.datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'free_threading': free_threading_build(),
+            'gil_enabled': gil_enabled(),
+            'repeat': options.repeat,
+            'scale': options.scale,
+        },
+        'results': results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Returns descriptions of results slower than ``baseline``.
+    """
+
+    def _key(record: Record) -> Tuple:
+        return record['benchmark'], record['engine'], record['concurrency']
+
+    previous: Dict[Tuple, Record] = {_key(r): r for r in baseline['results']}
+    regressions = []
+    for record in report['results']:
+        before = previous.get(_key(record))
+        if not before or not before['seconds'] or not record['seconds']:
+            continue
+
+        ratio = record['seconds'] / before['seconds']
+        if ratio > threshold:
+            regressions.append(
+                '{} {} x{}: {:.4f}s -> {:.4f}s ({:.2f}x)'.format(
+                    *_key(record), before['seconds'], record['seconds'], ratio
+                )
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    arguments = parser.parse_args(argv)
+    report = run(arguments)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            regressions = compare(report, json.load(f), arguments.threshold)
+        for line in regressions:
+            print('regression:', line, file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
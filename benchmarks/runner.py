@@ -0,0 +1,173 @@
+"""
+Runs workloads by engines and measures time.
+"""
+import asyncio
+import subprocess
+import sys
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from concurrently import (
+    AsyncIOEngine,
+    AsyncIOThreadEngine,
+    ProcessEngine,
+    ProcessPoolEngine,
+    ThreadEngine,
+    ThreadPoolEngine,
+    concurrently,
+)
+
+from .workloads import WORKLOADS
+
+
+class Engine(NamedTuple):
+    name: str
+    cls: Any
+    # kind of functions run by the engine: 'sync', 'async' or 'gevent'
+    kind: str
+    # the waiter must be awaited
+    is_async: bool
+    # the engine can interrupt endless functions
+    stoppable: bool = True
+
+
+ENGINES: Dict[str, Engine] = {
+    e.name: e
+    for e in [
+        Engine('asyncio', AsyncIOEngine, 'async', True),
+        Engine(
+            'asyncio_thread',
+            AsyncIOThreadEngine,
+            'sync',
+            True,
+            stoppable=False,
+        ),
+        Engine('thread', ThreadEngine, 'sync', False),
+        Engine('thread_pool', ThreadPoolEngine, 'sync', False),
+        Engine('process', ProcessEngine, 'sync', False),
+        Engine('process_pool', ProcessPoolEngine, 'sync', False),
+    ]
+}
+
+try:
+    from concurrently import GeventEngine
+
+    ENGINES['gevent'] = Engine('gevent', GeventEngine, 'gevent', False)
+except ImportError:
+    pass
+
+
+def workload(engine: Engine, name: str) -> Callable:
+    variants = WORKLOADS[name]
+    # gevent runs regular functions unless it needs own variant
+    return variants.get(engine.kind) or variants['sync']
+
+
+def measure_map(
+    engine: Engine, name: str, items: Iterable, concurrency: int, **map_kw
+) -> float:
+    """
+    Returns seconds of processing ``items`` by workload ``name``, ``map_kw``
+    are options of :meth:`concurrently.map`.
+    """
+    fn = workload(engine, name)
+
+    if engine.is_async:
+
+        async def _measure() -> float:
+            started = time.perf_counter()
+            # waiters of async engines are awaitable
+            waiter: Any = concurrently.map(
+                fn, items, concurrency, engine=engine.cls, **map_kw
+            )
+            await waiter()
+            return time.perf_counter() - started
+
+        return asyncio.run(_measure())
+
+    started = time.perf_counter()
+    concurrently.map(fn, items, concurrency, engine=engine.cls, **map_kw)()
+    return time.perf_counter() - started
+
+
+def measure_start(
+    engine: Engine, concurrency: int, name: str = 'idle', *args: Any
+) -> float:
+    """
+    Returns seconds of start and completion of ``concurrency`` functions of
+    workload ``name``, empty by default.
+    """
+    fn = workload(engine, name)
+    if args:
+        fn = partial(fn, *args)
+
+    if engine.is_async:
+
+        async def _measure() -> float:
+            started = time.perf_counter()
+            waiter: Any = concurrently(concurrency, engine=engine.cls)(fn)
+            await waiter()
+            return time.perf_counter() - started
+
+        return asyncio.run(_measure())
+
+    started = time.perf_counter()
+    concurrently(concurrency, engine=engine.cls)(fn)()
+    return time.perf_counter() - started
+
+
+def measure_stop(
+    engine: Engine, concurrency: int, warmup: float = 0.1
+) -> Optional[float]:
+    """
+    Returns seconds of ``stop()`` of ``concurrency`` endless functions,
+    ``None`` when the engine can't interrupt them.
+    """
+    if not engine.stoppable:
+        return None
+
+    fn = workload(engine, 'spin')
+
+    if engine.is_async:
+
+        async def _measure() -> float:
+            waiter: Any = concurrently(concurrency, engine=engine.cls)(fn)
+            await asyncio.sleep(warmup)
+            started = time.perf_counter()
+            await waiter.stop()
+            return time.perf_counter() - started
+
+        return asyncio.run(_measure())
+
+    waiter = concurrently(concurrency, engine=engine.cls)(fn)
+    if engine.kind == 'gevent':
+        import gevent  # type: ignore
+
+        gevent.sleep(warmup)
+    else:
+        time.sleep(warmup)
+    started = time.perf_counter()
+    waiter.stop()
+    return time.perf_counter() - started
+
+
+def measure_import(engine: Optional[Engine] = None) -> float:
+    """
+    Returns seconds of import of the package and class of ``engine`` by a new
+    interpreter, so modules are not cached.
+    """
+    statement = 'import concurrently'
+    if engine:
+        statement = 'from concurrently import ' + engine.cls.__name__
+    code = (
+        'import time; started = time.perf_counter(); {}; '
+        'print(time.perf_counter() - started)'.format(statement)
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    return float(out)
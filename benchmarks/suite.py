@@ -0,0 +1,243 @@
+"""
+Benchmarks of the suite, every benchmark measures an engine and returns
+records of results.
+"""
+import os
+import statistics
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from concurrently import Chunks
+
+from .runner import (
+    Engine,
+    measure_import,
+    measure_map,
+    measure_start,
+    measure_stop,
+)
+from .workloads import StandInServer
+
+Record = Dict[str, Any]
+
+
+class Options(NamedTuple):
+    # count of runs, the median is reported
+    repeat: int = 3
+    # multiplier of count of items
+    scale: float = 1.0
+    cores: int = os.cpu_count() or 1
+
+
+def _record(
+    benchmark: str,
+    engine: Engine,
+    concurrency: int,
+    items: int,
+    seconds: Sequence[Optional[float]],
+    **extra
+) -> Record:
+    measured = [s for s in seconds if s is not None]
+    median = statistics.median(measured) if measured else None
+    return dict(
+        benchmark=benchmark,
+        engine=engine.name,
+        concurrency=concurrency,
+        items=items,
+        seconds=median,
+        runs=measured,
+        rate=items / median if median and items else None,
+        **extra
+    )
+
+
+def _count(base: int, options: Options) -> int:
+    return max(1, int(base * options.scale))
+
+
+def cpu(engine: Engine, options: Options) -> List[Record]:
+    """
+    CPU-bound function, processes are expected to scale, threads are not.
+    """
+    count = _count(200, options)
+    items = [20000] * count
+    seconds = [
+        measure_map(engine, 'cpu', items, options.cores)
+        for _ in range(options.repeat)
+    ]
+    return [_record('cpu', engine, options.cores, count, seconds)]
+
+
+def io(engine: Engine, options: Options) -> List[Record]:
+    """
+    Requests to local server answering after 10ms.
+    """
+    count = _count(500, options)
+    concurrency = 50
+    with StandInServer(delay=0.01) as address:
+        items = [address] * count
+        seconds = [
+            measure_map(engine, 'request', items, concurrency)
+            for _ in range(options.repeat)
+        ]
+    return [_record('io', engine, concurrency, count, seconds, delay=0.01)]
+
+
+def dispatch(engine: Engine, options: Options) -> List[Record]:
+    """
+    Overhead of delivery of tiny items to workers and their results back.
+    """
+    count = _count(20000, options)
+    concurrency = 4
+    seconds = [
+        measure_map(engine, 'noop', range(count), concurrency)
+        for _ in range(options.repeat)
+    ]
+    record = _record('dispatch', engine, concurrency, count, seconds)
+    if record['seconds']:
+        record['per_item_us'] = record['seconds'] / count * 1e6
+    return [record]
+
+
+def chunks(engine: Engine, options: Options) -> List[Record]:
+    """
+    Tiny items of ``dispatch`` sent by chunks of tuned size.
+    """
+    count = _count(20000, options)
+    concurrency = 4
+    seconds = [
+        measure_map(
+            engine, 'noop', range(count), concurrency, chunks=Chunks()
+        )
+        for _ in range(options.repeat)
+    ]
+    record = _record('chunks', engine, concurrency, count, seconds)
+    if record['seconds']:
+        record['per_item_us'] = record['seconds'] / count * 1e6
+    return [record]
+
+
+def payload(engine: Engine, options: Options) -> List[Record]:
+    """
+    Transfer of large results from workers.
+    """
+    size = 1024 * 1024
+    count = _count(200, options)
+    concurrency = 4
+    seconds = [
+        measure_map(engine, 'payload', [size] * count, concurrency)
+        for _ in range(options.repeat)
+    ]
+    record = _record(
+        'payload', engine, concurrency, count, seconds, payload_size=size
+    )
+    if record['seconds']:
+        record['bytes_per_second'] = size * count / record['seconds']
+    return [record]
+
+
+def scaling(engine: Engine, options: Options) -> List[Record]:
+    """
+    CPU-bound function by 1, 2, 4... up to count of cores workers.
+    """
+    count = _count(100, options)
+    items = [20000] * count
+    concurrencies = sorted(
+        {1 << i for i in range(options.cores.bit_length())} | {options.cores}
+    )
+
+    records = []
+    for concurrency in concurrencies:
+        seconds = [
+            measure_map(engine, 'cpu', items, concurrency)
+            for _ in range(options.repeat)
+        ]
+        records.append(
+            _record('scaling', engine, concurrency, count, seconds)
+        )
+
+    base = records[0]['seconds']
+    for record in records:
+        if base and record['seconds']:
+            record['speedup'] = base / record['seconds']
+    return records
+
+
+def startup(engine: Engine, options: Options) -> List[Record]:
+    """
+    Start and completion of empty functions.
+    """
+    records = []
+    for concurrency in (1, 10, 100):
+        seconds = [
+            measure_start(engine, concurrency) for _ in range(options.repeat)
+        ]
+        records.append(
+            _record('startup', engine, concurrency, concurrency, seconds)
+        )
+    return records
+
+
+def contention(engine: Engine, options: Options) -> List[Record]:
+    """
+    Results streamed by count of cores functions at once, which contend for
+    the result queue of the waiter.
+    """
+    concurrency = options.cores
+    per_function = _count(100000, options) // concurrency or 1
+    count = per_function * concurrency
+    seconds = [
+        measure_start(engine, concurrency, 'stream', per_function)
+        for _ in range(options.repeat)
+    ]
+    record = _record('contention', engine, concurrency, count, seconds)
+    if record['seconds']:
+        record['per_item_us'] = record['seconds'] / count * 1e6
+    return [record]
+
+
+def stop(engine: Engine, options: Options) -> List[Record]:
+    """
+    Latency of ``stop()`` of endless functions.
+    """
+    records = []
+    for concurrency in (1, 10, 100):
+        seconds = [
+            measure_stop(engine, concurrency) for _ in range(options.repeat)
+        ]
+        records.append(
+            _record('stop', engine, concurrency, concurrency, seconds)
+        )
+    return records
+
+
+def imports(engine: Engine, options: Options) -> List[Record]:
+    """
+    Import of the package and the engine by a new interpreter, engines are
+    imported on first access.
+    """
+    package = [measure_import() for _ in range(options.repeat)]
+    seconds = [measure_import(engine) for _ in range(options.repeat)]
+    return [
+        _record(
+            'imports',
+            engine,
+            1,
+            1,
+            seconds,
+            package_seconds=statistics.median(package),
+        )
+    ]
+
+
+BENCHMARKS: Dict[str, Callable[[Engine, Options], List[Record]]] = {
+    'cpu': cpu,
+    'io': io,
+    'dispatch': dispatch,
+    'chunks': chunks,
+    'payload': payload,
+    'scaling': scaling,
+    'startup': startup,
+    'contention': contention,
+    'stop': stop,
+    'imports': imports,
+}
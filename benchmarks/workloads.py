@@ -0,0 +1,151 @@
+"""
+Functions run by engines in benchmarks.
+
+Functions are defined at module level, so processes can unpickle them.
+Every workload has variants for regular functions, coroutines and gevent.
+"""
+import asyncio
+import socket
+import socketserver
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+Address = Tuple[str, int]
+
+
+def cpu(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+async def cpu_async(n: int) -> int:
+    return cpu(n)
+
+
+def noop(d):
+    return d
+
+
+async def noop_async(d):
+    return d
+
+
+def payload(size: int) -> bytes:
+    return bytes(size)
+
+
+async def payload_async(size: int) -> bytes:
+    return bytes(size)
+
+
+def stream(count: int):
+    yield from range(count)
+
+
+async def stream_async(count: int):
+    for d in range(count):
+        yield d
+
+
+def request(address: Address) -> bytes:
+    with socket.create_connection(address) as sock:
+        sock.sendall(b'ping\n')
+        return sock.makefile('rb').readline()
+
+
+async def request_async(address: Address) -> bytes:
+    reader, writer = await asyncio.open_connection(*address)
+    try:
+        writer.write(b'ping\n')
+        return await reader.readline()
+    finally:
+        writer.close()
+
+
+def request_gevent(address: Address) -> bytes:
+    import gevent.socket  # type: ignore
+
+    with gevent.socket.create_connection(address) as sock:
+        sock.sendall(b'ping\n')
+        return sock.makefile('rb').readline()
+
+
+def spin() -> None:
+    while True:
+        time.sleep(0.001)
+
+
+async def spin_async() -> None:
+    while True:
+        await asyncio.sleep(0.001)
+
+
+def spin_gevent() -> None:
+    import gevent  # type: ignore
+
+    while True:
+        gevent.sleep(0.001)
+
+
+def idle() -> None:
+    pass
+
+
+async def idle_async() -> None:
+    pass
+
+
+# variants of workloads by kind of engine
+WORKLOADS: Dict[str, Dict[str, Callable]] = {
+    'cpu': {'sync': cpu, 'async': cpu_async},
+    'noop': {'sync': noop, 'async': noop_async},
+    'payload': {'sync': payload, 'async': payload_async},
+    'stream': {'sync': stream, 'async': stream_async},
+    'request': {
+        'sync': request,
+        'async': request_async,
+        'gevent': request_gevent,
+    },
+    'spin': {'sync': spin, 'async': spin_async, 'gevent': spin_gevent},
+    'idle': {'sync': idle, 'async': idle_async},
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        self.rfile.readline()
+        time.sleep(self.server.delay)  # type: ignore[attr-defined]
+        self.wfile.write(b'pong\n')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StandInServer:
+    """
+    Local TCP server which answers every line after ``delay`` seconds, it
+    stands in for a remote service in I/O-bound benchmarks::
+
+        with StandInServer(delay=0.01) as address:
+            ...
+    """
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self._server: Optional[_Server] = None
+
+    def __enter__(self) -> Address:
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.delay = self.delay  # type: ignore[attr-defined]
+        threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        ).start()
+        return self._server.server_address  # type: ignore[return-value]
+
+    def __exit__(self, *exc_info) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
@@ -1,32 +1,91 @@
+import importlib
+import importlib.util
 import sys
 from types import ModuleType
-from typing import Sequence
+from typing import TYPE_CHECKING, Dict, Sequence
 
-from ._concurrently import concurrently, get_default_engine, set_default_engine
+from ._concurrently import (
+    concurrently,
+    get_default_engine,
+    set_default_engine,
+    use_engine,
+)
+from .adaptive import Limits
+from .buffer import Buffer
+from .chunks import Chunks
+from .context import WorkerContext
 from .engines import UnhandledExceptions
-from .engines.asyncio import AsyncIOEngine, AsyncIOThreadEngine
-from .engines.process import ProcessEngine
-from .engines.thread import ThreadEngine
+from .metrics import Metrics, Observer
+from .pipeline import Pipeline, StageStats
+from .priority import PriorityBuffer
+from .rate import RateLimit
+from .stealing import WorkStealing
+
+if TYPE_CHECKING:
+    from .engines.asyncio import AsyncIOEngine, AsyncIOThreadEngine
+    from .engines.asyncio_process import AsyncIOProcessEngine
+    from .engines.gevent import GeventEngine  # noqa:W0611
+    from .engines.interpreter import InterpreterEngine
+    from .engines.process import ProcessEngine, SharedMemoryChannel
+    from .engines.process_pool import ProcessPool, ProcessPoolEngine
+    from .engines.thread import (
+        CancelToken,
+        ThreadEngine,
+        ThreadPool,
+        ThreadPoolEngine,
+    )
 
 __all__ = [
     'concurrently',
     'get_default_engine',
     'set_default_engine',
+    'use_engine',
+    'Limits',
+    'Buffer',
+    'PriorityBuffer',
+    'RateLimit',
+    'Chunks',
+    'WorkStealing',
+    'Pipeline',
+    'StageStats',
+    'WorkerContext',
+    'Metrics',
+    'Observer',
     'UnhandledExceptions',
     'ThreadEngine',
+    'CancelToken',
+    'ThreadPool',
+    'ThreadPoolEngine',
     'ProcessEngine',
+    'ProcessPool',
+    'ProcessPoolEngine',
+    'SharedMemoryChannel',
+    'InterpreterEngine',
     'AsyncIOEngine',
     'AsyncIOThreadEngine',
+    'AsyncIOProcessEngine',
 ]
 
-set_default_engine(AsyncIOEngine)
-
-try:
-    from .engines.gevent import GeventEngine  # noqa:W0611
+# engines are imported on first access, so the package doesn't pay for
+# multiprocessing, asyncio and gevent which are not used
+_lazy: Dict[str, str] = {
+    'ThreadEngine': '.engines.thread',
+    'CancelToken': '.engines.thread',
+    'ThreadPool': '.engines.thread',
+    'ThreadPoolEngine': '.engines.thread',
+    'ProcessEngine': '.engines.process',
+    'SharedMemoryChannel': '.engines.process',
+    'ProcessPool': '.engines.process_pool',
+    'ProcessPoolEngine': '.engines.process_pool',
+    'InterpreterEngine': '.engines.interpreter',
+    'AsyncIOEngine': '.engines.asyncio',
+    'AsyncIOThreadEngine': '.engines.asyncio',
+    'AsyncIOProcessEngine': '.engines.asyncio_process',
+    'GeventEngine': '.engines.gevent',
+}
 
+if importlib.util.find_spec('gevent') is not None:
     __all__.append('GeventEngine')
-except ImportError:
-    pass
 
 
 class Module(ModuleType):
@@ -39,6 +98,19 @@ class Module(ModuleType):
 
         return attr
 
+    def __getattr__(self, name):
+        if name not in _lazy:
+            raise AttributeError(
+                'module {!r} has no attribute {!r}'.format(__name__, name)
+            )
+
+        attr = getattr(importlib.import_module(_lazy[name], __name__), name)
+        setattr(self, name, attr)
+        return attr
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_lazy))
+
 
 module = Module(__name__)
 module.__dict__.update(globals())
@@ -1,18 +1,83 @@
-from threading import local
-from typing import Callable, Optional, Type
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
+from concurrently.adaptive import Limits
+from concurrently.chunks import Chunks
+from concurrently.context import WorkerContext
 from concurrently.engines import AbstractEngine, AbstractWaiter
+from concurrently.metrics import Observer
+from concurrently.rate import RateLimit
 
-__default_engine = local()
-__default_engine.cls = None
+# class of engine or its instance shared by calls
+EngineSpec = Union[Type[AbstractEngine], AbstractEngine]
+EngineConfig = Tuple[EngineSpec, Dict[str, Any]]
 
+# the default of all threads, overridden by use_engine() in a context
+_default_engine: Optional[EngineSpec] = None
+_engine_var: 'ContextVar[Optional[EngineConfig]]' = ContextVar(
+    'engine', default=None
+)
 
-def set_default_engine(engine_cls: Type[AbstractEngine]):
-    __default_engine.cls = engine_cls
+
+def set_default_engine(engine_cls: EngineSpec):
+    global _default_engine
+    _default_engine = engine_cls
 
 
 def get_default_engine() -> Type[AbstractEngine]:
-    return __default_engine.cls
+    engine = _engine_config()[0]
+    if isinstance(engine, AbstractEngine):
+        return type(engine)
+    return engine
+
+
+@contextmanager
+def use_engine(engine_cls: EngineSpec, **engine_kw) -> Iterator[None]:
+    """
+    Sets engine of :func:`@concurrently` and :meth:`concurrently.map` without
+    the argument ``engine`` in the block::
+
+        with use_engine(ThreadEngine, pool=pool):
+            handle_request()  # fans out to threads of the pool
+
+    The engine is kept by a context variable, so it applies to the current
+    thread or asyncio task and to functions started by them, ``engine_kw``
+    are defaults of arguments of the engine. An engine instance is shared by
+    the calls instead of a new engine for every call::
+
+        with ThreadEngine() as engine, use_engine(engine):
+            serve()
+    """
+    token = _engine_var.set((engine_cls, engine_kw))
+    try:
+        yield
+    finally:
+        _engine_var.reset(token)
+
+
+def _engine_config() -> EngineConfig:
+    global _default_engine
+
+    config = _engine_var.get()
+    if config is not None:
+        return config
+    if _default_engine is None:
+        # imported on demand like other engines
+        from concurrently.engines.asyncio import AsyncIOEngine
+
+        _default_engine = AsyncIOEngine
+    return _default_engine, {}
 
 
 class Concurrently:
@@ -20,20 +85,125 @@ class Concurrently:
         self,
         concurrency: int = 1,
         *,
-        engine: Optional[Type[AbstractEngine]] = None,
+        engine: Optional[EngineSpec] = None,
+        adaptive: Optional[Limits] = None,
+        context: Union[WorkerContext, Callable[[], Any], None] = None,
+        observer: Optional[Observer] = None,
         **engine_kw
     ) -> None:
-        self.concurrency = concurrency
+        self.concurrency = adaptive.max if adaptive else concurrency
+        self.adaptive = adaptive
+        if context and not isinstance(context, WorkerContext):
+            context = WorkerContext(context)
+        self.context = context
+        self.observer = observer
         if not engine:
-            engine = get_default_engine()
-        self.engine = engine(**engine_kw)
+            engine, default_kw = _engine_config()
+            engine_kw = dict(default_kw, **engine_kw)
+        if isinstance(engine, AbstractEngine):
+            if engine_kw:
+                raise ValueError(
+                    'options of engine instance are set on its creation'
+                )
+            self.engine = engine.for_call()
+        else:
+            self.engine = engine(**engine_kw)
 
     def __call__(self, fn: Callable[[], None]) -> AbstractWaiter:
+        if self.adaptive:
+            raise ValueError(
+                'adaptive concurrency requires concurrently.map()'
+            )
+
+        return self._start(fn)
+
+    def _start(
+        self,
+        fn: Callable[[], None],
+        name: Optional[str] = None,
+        items: bool = False,
+    ) -> AbstractWaiter:
+        if name is None:
+            name = getattr(fn, '__name__', repr(fn))
+        if self.context:
+            fn = self.engine.context_worker(fn, self.context)
+        if self.observer:
+            fn = self.engine.observe_worker(fn, name, items)
+
         fs = []
         for _ in range(self.concurrency):
             fs.append(self.engine.create_task(fn))
 
-        return self.engine.waiter_factory(fs)
+        waiter = self.engine.waiter_factory(fs)
+        if self.observer:
+            waiter.observe(self.observer)
+        return waiter
+
+    use_engine = staticmethod(use_engine)
+
+    @classmethod
+    def map(
+        cls,
+        fn: Callable[[Any], Any],
+        iterable: Iterable,
+        concurrency: int = 1,
+        *,
+        engine: Optional[EngineSpec] = None,
+        adaptive: Optional[Limits] = None,
+        rate: Optional[RateLimit] = None,
+        context: Union[WorkerContext, Callable[[], Any], None] = None,
+        observer: Optional[Observer] = None,
+        chunks: Union[Chunks, int, None] = None,
+        item_timeout: Optional[float] = None,
+        **engine_kw
+    ) -> AbstractWaiter:
+        """
+        Starts ``concurrency`` workers which call ``fn`` for every item of
+        ``iterable``. Items are pulled lazily, so ``iterable`` may be endless.
+        An exception of ``fn`` for an item is reported by the waiter like
+        exceptions of functions, while the worker goes on with next items;
+        ``fail_hard`` of the waiter stops all workers on the first one.
+
+        :param adaptive: adjust concurrency in :class:`Limits` instead of
+            fixed ``concurrency``
+        :param rate: limit rate of items by :class:`RateLimit`
+        :param context: resource of every worker, see :class:`WorkerContext`
+        :param observer: receiver of events of workers and their items, see
+            :class:`Metrics`
+        :param chunks: send items to workers by :class:`Chunks`, a number
+            sets fixed size of chunks
+        :param item_timeout: seconds of processing of an item, a longer call
+            of ``fn`` raises :exc:`TimeoutError` in its worker, threads get
+            it after the end of a blocking call
+        """
+        if chunks is not None and not isinstance(chunks, Chunks):
+            chunks = Chunks(chunks)
+        if chunks and (adaptive or rate):
+            raise ValueError('chunks can not be combined with adaptive or rate')
+
+        self = cls(
+            concurrency,
+            engine=engine,
+            adaptive=adaptive,
+            context=context,
+            observer=observer,
+            **engine_kw
+        )
+        if adaptive:
+            adaptive.bind(self.engine.condition_factory())
+        name = getattr(fn, '__name__', repr(fn))
+        if item_timeout is not None:
+            fn = self.engine.timeout_worker(fn, item_timeout)
+        if chunks:
+            iterable = chunks.split(iterable)
+            fn = chunks.worker(fn)
+        channel = self.engine.channel_factory(iterable)
+        waiter = self._start(
+            self.engine.map_worker(fn, channel, adaptive, rate), name, True
+        )
+        if chunks:
+            waiter.tune(chunks)
+        return waiter
 
 
 concurrently = Concurrently
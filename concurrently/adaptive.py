@@ -0,0 +1,120 @@
+import threading
+from typing import Any, Optional
+
+
+class Limits:
+    """
+    Adaptive limit of concurrency for :meth:`concurrently.map`::
+
+        limits = Limits(min=2, max=200)
+        waiter = concurrently.map(fetch_url, urls, adaptive=limits)
+        ...
+        print(limits.limit)  # current limit
+
+    The map starts ``max`` workers, but only ``limit`` of them process items
+    at the same time, others wait. The limit is controlled by AIMD algorithm:
+    it grows by one on every item processed in time while workers are
+    saturated, and it is multiplied by ``backoff`` when item processing fails
+    or takes longer than ``tolerance`` times of the lowest observed latency.
+
+    Supported by :class:`AsyncIOEngine`, :class:`AsyncIOThreadEngine`,
+    :class:`ThreadEngine` and :class:`GeventEngine`.
+
+    :param min: the lowest limit
+    :param max: the highest limit
+    :param initial: limit on start, ``min`` by default
+    :param backoff: decrease factor of limit
+    :param tolerance: allowed ratio of latency to the lowest one
+    """
+
+    # the lowest latency slowly drifts up to follow changes of backend
+    _drift = 1.001
+
+    def __init__(
+        self,
+        min: int = 1,
+        max: int = 100,
+        *,
+        initial: Optional[int] = None,
+        backoff: float = 0.75,
+        tolerance: float = 2.0,
+    ) -> None:
+        assert 0 < min <= max, 'Limits must be 0 < min <= max'
+        self.min = min
+        self.max = max
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.limit = initial or min
+        self.inflight = 0
+        self._min_latency: Optional[float] = None
+        self._closed = False
+        self._cond: Any = threading.Condition()
+
+    def bind(self, condition) -> None:
+        """
+        Prepares the limit for a new run with ``condition`` of the engine.
+        """
+        self._cond = condition
+        self._closed = False
+        self.inflight = 0
+
+    def acquire(self) -> bool:
+        """
+        Blocks worker while the limit is reached, returns ``False`` when the
+        run is closed.
+        """
+        with self._cond:
+            while self.inflight >= self.limit and not self._closed:
+                self._cond.wait()
+            return self._enter()
+
+    def release(self, latency: float, failed: bool) -> None:
+        with self._cond:
+            self._cond.notify(self._leave(latency, failed))
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    async def acquire_async(self) -> bool:
+        async with self._cond:
+            while self.inflight >= self.limit and not self._closed:
+                await self._cond.wait()
+            return self._enter()
+
+    async def release_async(self, latency: float, failed: bool) -> None:
+        async with self._cond:
+            self._cond.notify(self._leave(latency, failed))
+
+    async def close_async(self) -> None:
+        async with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _enter(self) -> bool:
+        if self._closed:
+            return False
+        self.inflight += 1
+        return True
+
+    def _leave(self, latency: float, failed: bool) -> int:
+        """
+        Returns count of workers which can start.
+        """
+        saturated = self.inflight * 2 >= self.limit
+        self.inflight -= 1
+
+        if not failed:
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            else:
+                self._min_latency *= self._drift
+            failed = latency > self._min_latency * self.tolerance
+
+        if failed:
+            self.limit = max(self.min, int(self.limit * self.backoff))
+        elif saturated:
+            self.limit = min(self.max, self.limit + 1)
+
+        return max(0, self.limit - self.inflight)
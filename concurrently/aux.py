@@ -1,7 +1,8 @@
 import ctypes
+import sys
+import sysconfig
 import threading
-import time
-from typing import Type
+from typing import Optional, Type
 
 
 # inspired by
@@ -9,6 +10,7 @@ from typing import Type
 def kill_thread(
     thread: threading.Thread,
     exception: Type[BaseException] = KeyboardInterrupt,
+    timeout: Optional[float] = None,
 ) -> None:
     if not thread.ident:
         return None
@@ -16,15 +18,44 @@ def kill_thread(
     if not thread.is_alive():
         return None
 
+    raise_in_thread(thread.ident, exception)
+    thread.join(timeout)
+
+
+def raise_in_thread(ident: int, exception: Type[BaseException]) -> None:
+    """
+    Asynchronously raises ``exception`` in the thread with ``ident``.
+    """
     res = ctypes.pythonapi.PyThreadState_SetAsyncExc(
-        ctypes.c_long(thread.ident), ctypes.py_object(exception)
+        ctypes.c_long(ident), ctypes.py_object(exception)
     )
 
     if res == 0:
         raise ValueError('nonexistent thread id')
     if res > 1:
-        ctypes.pythonapi.PyThreadState_SetAsyncExc(thread.ident, None)
+        clear_thread_exception(ident)
         raise SystemError('PyThreadState_SetAsyncExc failed')
 
-    while thread.is_alive():
-        time.sleep(0.01)
+
+def clear_thread_exception(ident: int) -> None:
+    """
+    Discards exception pending by :func:`raise_in_thread`.
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_long(ident), None)
+
+
+def free_threading_build() -> bool:
+    """
+    Returns ``True`` for free-threaded build of CPython (3.13t and later).
+    """
+    return bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+
+
+def gil_enabled() -> bool:
+    """
+    Returns ``False`` when threads run Python code in parallel. The GIL may
+    be enabled at runtime even by free-threaded build, e.g. by
+    ``PYTHON_GIL=1`` or by import of incompatible extension.
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled() if is_gil_enabled else True
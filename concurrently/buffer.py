@@ -0,0 +1,219 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, List, Optional
+
+
+class Buffer:
+    """
+    Bounded buffer between producer and workers with flow control by
+    watermarks::
+
+        items = Buffer(high=1000, low=500)
+        waiter = concurrently.map(process, items, 10, engine=ThreadEngine)
+        for item in read_dataset():
+            items.put(item)  # blocks while workers fall behind
+        items.close()
+        waiter()
+
+    Producers are blocked when the buffer holds ``high`` items and continue
+    only when workers take items down to ``low``, so producers are woken by
+    batches instead of every item. Asyncio producers use :meth:`put_async`.
+
+    Engines accept a buffer for results by the argument ``result_buffer``,
+    so workers wait while results aren't consumed by
+    :meth:`AbstractWaiter.as_completed`.
+
+    Buffer works with threads and asyncio, :class:`GeventEngine` requires
+    monkey patching of :mod:`threading` by :mod:`gevent.monkey`.
+
+    :param high: max count of items, ``None`` for unbounded buffer
+    :param low: count of items to continue blocked producers,
+        ``high // 2`` by default
+    """
+
+    def __init__(
+        self, high: Optional[int] = None, low: Optional[int] = None
+    ) -> None:
+        if high is None:
+            low = None
+        else:
+            low = high // 2 if low is None else low
+            assert 0 <= low < high, 'Buffer must be 0 <= low < high'
+        self.high = high
+        self.low = low
+        self._items: Deque[Any] = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        # count of threads blocked in get(), which have to be notified
+        self._blocked_getters = 0
+        self._getters: List[_AsyncWaiter] = []
+        self._putters: List[_AsyncWaiter] = []
+        self._full = False
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any) -> None:
+        """
+        Adds ``item``, blocks while the buffer is full.
+        """
+        with self._lock:
+            while self._full:
+                self._not_full.wait()
+            self._append(item)
+
+    async def put_async(self, item: Any) -> None:
+        while True:
+            with self._lock:
+                if not self._full:
+                    self._append(item)
+                    return
+                waiter = _AsyncWaiter(self._putters)
+            await waiter.wait(self._lock, self._wake_putter)
+
+    def push(self, item: Any) -> None:
+        """
+        Adds ``item`` ignoring the limit, e.g. for control messages.
+        """
+        with self._lock:
+            self._append(item)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Takes item, blocks while the buffer is empty. Raises
+        :exc:`EOFError` when the buffer is closed and empty, and
+        :exc:`TimeoutError` when it is still empty after ``timeout`` seconds.
+        """
+        with self._lock:
+            if timeout is not None:
+                deadline = time.monotonic() + timeout
+            while not self._items:
+                if self._closed:
+                    raise EOFError('buffer is closed')
+                if timeout is not None:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        raise TimeoutError('buffer is empty')
+                self._blocked_getters += 1
+                try:
+                    self._not_empty.wait(timeout)
+                finally:
+                    self._blocked_getters -= 1
+            return self._popleft()
+
+    async def get_async(self) -> Any:
+        while True:
+            with self._lock:
+                if self._items:
+                    return self._popleft()
+                if self._closed:
+                    raise EOFError('buffer is closed')
+                waiter = _AsyncWaiter(self._getters)
+            await waiter.wait(self._lock, self._wake_getter)
+
+    def close(self) -> None:
+        """
+        Marks the end of items, iteration over the buffer stops when it is
+        empty.
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            _wake_all(self._getters)
+
+    def release(self) -> None:
+        """
+        Removes the limit and continues all blocked producers.
+        """
+        with self._lock:
+            self.high = self.low = None
+            self._full = False
+            self._not_full.notify_all()
+            _wake_all(self._putters)
+
+    def __iter__(self) -> 'Buffer':
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return self.get()
+        except EOFError:
+            raise StopIteration
+
+    def __aiter__(self) -> 'Buffer':
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self.get_async()
+        except EOFError:
+            raise StopAsyncIteration
+
+    def _append(self, item: Any) -> None:
+        self._items.append(item)
+        if self.high is not None and len(self._items) >= self.high:
+            self._full = True
+        self._wake_getter()
+
+    def _popleft(self) -> Any:
+        item = self._items.popleft()
+        if self._full and len(self._items) <= self.low:  # type: ignore
+            self._full = False
+            self._not_full.notify_all()
+            _wake_all(self._putters)
+        return item
+
+    def _wake_getter(self) -> None:
+        # notify() of idle condition costs a lot for every item
+        if self._blocked_getters:
+            self._not_empty.notify()
+        if self._getters:
+            self._getters.pop(0).wake()
+
+    def _wake_putter(self) -> None:
+        if not self._full and self._putters:
+            self._putters.pop(0).wake()
+
+
+class _AsyncWaiter:
+    """
+    Coroutine waiting for state of :class:`Buffer`, which may be changed by
+    other threads.
+    """
+
+    def __init__(self, queue: List['_AsyncWaiter']) -> None:
+        # asyncio is loaded by the running loop, not by import of the buffer
+        import asyncio
+
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+        self.queue = queue
+        queue.append(self)
+
+    def wake(self) -> None:
+        self.loop.call_soon_threadsafe(self._set)
+
+    async def wait(self, lock: threading.Lock, wake_next) -> None:
+        try:
+            await self.future
+        except BaseException:
+            with lock:
+                if self in self.queue:
+                    self.queue.remove(self)
+                else:
+                    # the wake up is lost with cancelled coroutine
+                    wake_next()
+            raise
+
+    def _set(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+def _wake_all(waiters: List[_AsyncWaiter]) -> None:
+    for waiter in waiters:
+        waiter.wake()
+    waiters.clear()
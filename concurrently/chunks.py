@@ -0,0 +1,115 @@
+import inspect
+import time
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from concurrently.engines import (
+    Batch,
+    map_item,
+    map_item_async,
+    unwrap_partial,
+)
+
+
+class Chunks:
+    """
+    Chunks of items for :meth:`concurrently.map`. Every chunk is sent to a
+    worker as one message and its results come back as one message, so the
+    cost of dispatch is shared by items of the chunk::
+
+        waiter = concurrently.map(
+            parse_line, lines, 4, engine=ProcessEngine, chunks=Chunks()
+        )
+
+    By default size of chunks is tuned by measured processing time of items,
+    so a chunk takes about ``target`` seconds. Fixed size is set by ``size``
+    or by a number instead of :class:`Chunks`::
+
+        waiter = concurrently.map(parse_line, lines, 4, chunks=100)
+
+    Results of a chunk are received after processing of all its items.
+    Chunks can't be combined with ``adaptive`` and ``rate``, which count
+    single items.
+
+    :param size: fixed size of chunks, ``None`` for tuned size
+    :param target: seconds of processing of tuned chunk
+    :param max_size: the highest tuned size
+    """
+
+    # the lowest time of item slowly drifts up to follow changes of items,
+    # higher times are mostly waits of workers, like for the GIL
+    _drift = 1.01
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        *,
+        target: float = 0.01,
+        max_size: int = 10000,
+    ) -> None:
+        assert size is None or size > 0, 'Chunks must be size > 0'
+        self.size = size or 1
+        self.tuned = size is None
+        self.target = target
+        self.max_size = max_size
+        self._item_time: Optional[float] = None
+
+    def split(self, iterable: Iterable) -> Iterator[List[Any]]:
+        """
+        Yields chunks of items of ``iterable``, every chunk has the current
+        size.
+        """
+        it = iter(iterable)
+        while True:
+            chunk = list(islice(it, self.size))
+            if not chunk:
+                return
+            yield chunk
+
+    def worker(self, fn: Callable[[Any], Any]) -> Callable:
+        """
+        Returns function which calls ``fn`` for every item of a chunk and
+        returns their results as :class:`Batch`.
+        """
+        worker: Callable
+        if inspect.iscoroutinefunction(unwrap_partial(fn)):
+            worker = partial(_map_chunk_async, fn)
+        else:
+            worker = partial(_map_chunk, fn)
+        # engines name their workers by the function
+        setattr(worker, '__name__', getattr(fn, '__name__', repr(fn)))
+        return worker
+
+    def tune(self, batch: Batch) -> None:
+        """
+        Adjusts size of next chunks by processing time of ``batch``.
+        """
+        if not self.tuned or not batch.results:
+            return
+
+        item_time = batch.elapsed / len(batch.results)
+        if self._item_time is None or item_time < self._item_time:
+            self._item_time = item_time
+        else:
+            self._item_time *= self._drift
+
+        if self._item_time:
+            size = int(self.target / self._item_time)
+        else:
+            size = self.max_size
+        self.size = max(1, min(size, self.max_size))
+
+
+def _map_chunk(fn: Callable[[Any], Any], chunk: List[Any]) -> Batch:
+    started = time.monotonic()
+    results = [map_item(fn, item) for item in chunk]
+    return Batch(results, time.monotonic() - started)
+
+
+async def _map_chunk_async(
+    fn: Callable[[Any], Any], chunk: List[Any]
+) -> Batch:
+    started = time.monotonic()
+    results = [await map_item_async(fn, item) for item in chunk]
+    return Batch(results, time.monotonic() - started)
@@ -0,0 +1,183 @@
+import inspect
+import os
+import threading
+import uuid
+import weakref
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from concurrently.engines import iter_results
+
+
+class WorkerContext:
+    """
+    Resource of worker, like connection or session, which is opened on start
+    of worker and closed on its end::
+
+        sessions = WorkerContext(aiohttp.ClientSession)
+
+        @concurrently(10, context=sessions)
+        async def crawler():
+            session = sessions.get()
+            ...
+
+    With ``keep=True`` resources aren't closed on the end of workers, but are
+    cached for workers of next calls, so connections stay warm between calls.
+    Cached resources are closed by :meth:`close` (or :meth:`close_async`).
+    Every process has own cache, processes of :class:`ProcessPool` keep
+    resources till their exit. Async resources must be used by the same event
+    loop.
+
+    :param factory: returns context manager (async one for
+        :class:`AsyncIOEngine`) which gives the resource
+    :param keep: cache resources between calls
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        keep: bool = False,
+        _id: Optional[str] = None,
+    ) -> None:
+        self.factory = factory
+        self.keep = keep
+        self._id = _id or uuid.uuid4().hex
+        self._var: ContextVar = ContextVar('WorkerContext')
+        _instances[self._id] = self
+
+    def get(self) -> Any:
+        """
+        Returns resource of the current worker, raises :exc:`LookupError`
+        outside of worker.
+        """
+        return self._var.get()
+
+    def run(self, fn: Callable) -> Iterator:
+        """
+        Runs ``fn`` with resource of the worker, yields its results.
+        """
+        entry = _pop_cached(self._id)
+        if entry is None:
+            cm = self.factory()
+            entry = (cm, cm.__enter__())
+
+        token = self._var.set(entry[1])
+        try:
+            yield from iter_results(fn())
+        except BaseException as e:
+            self._var.reset(token)
+            entry[0].__exit__(type(e), e, e.__traceback__)
+            raise
+
+        self._var.reset(token)
+        if self.keep:
+            _push_cached(self._id, entry)
+        else:
+            entry[0].__exit__(None, None, None)
+
+    async def run_async(self, fn: Callable) -> AsyncIterator:
+        entry = _pop_cached(self._id)
+        if entry is None:
+            cm = self.factory()
+            entry = (cm, await cm.__aenter__())
+
+        token = self._var.set(entry[1])
+        try:
+            value = fn()
+            if inspect.isasyncgen(value):
+                async for result in value:
+                    yield result
+            else:
+                yield await value
+        except BaseException as e:
+            self._var.reset(token)
+            await entry[0].__aexit__(type(e), e, e.__traceback__)
+            raise
+
+        self._var.reset(token)
+        if self.keep:
+            _push_cached(self._id, entry)
+        else:
+            await entry[0].__aexit__(None, None, None)
+
+    def close(self) -> None:
+        """
+        Closes resources cached in the current process.
+        """
+        for cm, _ in _take_cached(self._id):
+            cm.__exit__(None, None, None)
+
+    async def close_async(self) -> None:
+        for cm, _ in _take_cached(self._id):
+            await cm.__aexit__(None, None, None)
+
+    def __reduce__(self):
+        return _restore, (self.factory, self.keep, self._id)
+
+
+def _restore(factory: Callable[[], Any], keep: bool, _id: str):
+    # the process may know the context already, e.g. forked with it
+    context = _instances.get(_id)
+    if context is None:
+        context = WorkerContext(factory, keep=keep, _id=_id)
+    return context
+
+
+_instances: 'weakref.WeakValueDictionary[str, WorkerContext]' = (
+    weakref.WeakValueDictionary()
+)
+
+
+# resources cached by id of context, every process has own cache
+_cache: Dict[str, List[Tuple[Any, Any]]] = {}
+_cache_lock = threading.Lock()
+_cache_pid = os.getpid()
+
+
+def _check_pid() -> None:
+    global _cache, _cache_lock, _cache_pid
+    if _cache_pid != os.getpid():
+        # resources of the parent process must not be used by a fork
+        _cache, _cache_lock, _cache_pid = {}, threading.Lock(), os.getpid()
+
+
+def _pop_cached(context_id: str):
+    _check_pid()
+    with _cache_lock:
+        entries = _cache.get(context_id)
+        return entries.pop() if entries else None
+
+
+def _push_cached(context_id: str, entry: Tuple[Any, Any]) -> None:
+    _check_pid()
+    with _cache_lock:
+        _cache.setdefault(context_id, []).append(entry)
+
+
+def _take_cached(context_id: str) -> List[Tuple[Any, Any]]:
+    _check_pid()
+    with _cache_lock:
+        return _cache.pop(context_id, [])
+
+
+def close_cached() -> None:
+    """
+    Closes all resources cached in the current process.
+    """
+    _check_pid()
+    with _cache_lock:
+        entries = [e for es in _cache.values() for e in es]
+        _cache.clear()
+
+    for cm, _ in entries:
+        cm.__exit__(None, None, None)
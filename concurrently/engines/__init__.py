@@ -3,15 +3,70 @@ Supported engines
 =================
 
 .. automodule:: concurrently.engines.asyncio
+.. automodule:: concurrently.engines.asyncio_process
 .. automodule:: concurrently.engines.thread
 .. automodule:: concurrently.engines.process
+.. automodule:: concurrently.engines.process_pool
+.. automodule:: concurrently.engines.interpreter
 .. automodule:: concurrently.engines.gevent
+
+Default engine
+--------------
+
+Without the argument ``engine`` functions run by :class:`AsyncIOEngine`,
+the default of all threads is changed by
+:func:`concurrently.set_default_engine`, and the default of a block by
+:func:`concurrently.use_engine`.
+
+.. autofunction:: concurrently.use_engine
+
+Shared engines
+--------------
+
+An instance of engine is passed as ``engine`` instead of the class to keep
+resources between calls, like threads of :class:`ThreadEngine` or the
+executor of :class:`AsyncIOThreadEngine`. Every call gets own queues and
+waiter, so calls may run at the same time::
+
+    engine = ThreadEngine()
+    engine.start()
+    ...
+    waiter = concurrently.map(handle, items, 8, engine=engine)
+    ...
+    engine.close()
+
+.. autoclass:: concurrently.engines.AbstractEngine
+    :members: start, close, for_call
 """
 import abc
-from typing import Sequence
+import copy
+import time
+import types
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    Callable,
+    ContextManager,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from concurrently.adaptive import Limits
+    from concurrently.chunks import Chunks
+    from concurrently.context import WorkerContext
+    from concurrently.metrics import Observer
+    from concurrently.rate import RateLimit
 
 
 class AbstractEngine(metaclass=abc.ABCMeta):
+    _closed = False
+
     @abc.abstractmethod
     def create_task(self, fn):
         raise NotImplementedError
@@ -20,11 +75,197 @@ class AbstractEngine(metaclass=abc.ABCMeta):
     def waiter_factory(self, fs) -> 'AbstractWaiter':
         raise NotImplementedError
 
+    def channel_factory(
+        self, iterable: Iterable
+    ) -> Union[Iterable, AsyncIterable]:
+        """
+        Returns channel which delivers items of ``iterable`` to the workers
+        started by :meth:`Concurrently.map`.
+        """
+        raise NotImplementedError
+
+    def start(self) -> None:
+        """
+        Opens resources which are shared by calls of the engine instance, like
+        threads of a pool.
+        """
+
+    def close(self) -> None:
+        """
+        Releases resources of :meth:`start`, the engine can't take next calls.
+        """
+        self._closed = True
+
+    def __enter__(self) -> 'AbstractEngine':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def for_call(self) -> 'AbstractEngine':
+        """
+        Returns engine of one call, when the instance is passed as ``engine``
+        of :func:`@concurrently` or :meth:`concurrently.map`. The copy shares
+        options and resources of the instance and has own queues, so calls
+        running at the same time get independent waiters.
+        """
+        if self._closed:
+            raise RuntimeError(
+                'cannot call closed {}'.format(type(self).__name__)
+            )
+
+        engine = copy.copy(self)
+        engine._init_call()
+        return engine
+
+    def _init_call(self) -> None:
+        """
+        Replaces state of a call, like queues of results, in a copy of the
+        engine.
+        """
+
+    def condition_factory(self):
+        """
+        Returns condition variable suitable for the engine tasks, which is
+        used by :class:`Limits`.
+        """
+        raise NotImplementedError(
+            '{} does not support adaptive concurrency'.format(
+                type(self).__name__
+            )
+        )
+
+    def context_worker(
+        self, fn: Callable, context: 'WorkerContext'
+    ) -> Callable:
+        """
+        Returns function which runs ``fn`` with resource of ``context``.
+        """
+        return partial(context.run, fn)
+
+    def observe_worker(
+        self, fn: Callable, name: str, items: bool = False
+    ) -> Callable:
+        """
+        Returns function which runs ``fn`` and reports its progress by
+        :class:`TaskEvent` messages next to results, ``items`` adds ``item``
+        events of map workers.
+        """
+        return partial(run_observed, fn, name, items)
+
+    def timeout_worker(self, fn: Callable, seconds: float) -> Callable:
+        """
+        Returns function which calls ``fn`` with the same arguments and
+        raises :exc:`TimeoutError` when the call takes longer than
+        ``seconds``.
+        """
+        raise NotImplementedError(
+            '{} does not support timeouts of items'.format(type(self).__name__)
+        )
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Pauses the current task of the engine.
+        """
+        time.sleep(seconds)
+
+    def map_worker(
+        self,
+        fn: Callable[[Any], Any],
+        channel,
+        limits: Optional['Limits'] = None,
+        rate: Optional['RateLimit'] = None,
+    ) -> Callable:
+        """
+        Returns function which calls ``fn`` for every item of ``channel``.
+        """
+
+        def _worker():
+            for item in channel:
+                if rate:
+                    self._wait_rate(rate, item)
+                yield map_item(fn, item)
+
+        def _adaptive_worker():
+            it = iter(channel)
+            while limits.acquire():
+                failed = True
+                try:
+                    item = next(it)
+                except StopIteration:
+                    limits.close()
+                    return
+
+                started = time.monotonic()
+                try:
+                    if rate:
+                        self._wait_rate(rate, item)
+                        started = time.monotonic()
+                    result = map_item(fn, item)
+                    failed = isinstance(result, ItemError)
+                finally:
+                    limits.release(time.monotonic() - started, failed)
+                yield result
+
+        worker = _adaptive_worker if limits else _worker
+        worker.__name__ = getattr(fn, '__name__', worker.__name__)
+        return worker
+
+    def _wait_rate(self, rate: 'RateLimit', item: Any) -> None:
+        delay = rate.reserve(rate.key_of(item))
+        if delay:
+            self.sleep(delay)
+
 
 class AbstractWaiter(metaclass=abc.ABCMeta):
+    _observer: Optional['Observer'] = None
+    _chunks: Optional['Chunks'] = None
+
+    def observe(self, observer: 'Observer') -> None:
+        """
+        Passes events of concurrent functions to ``observer``.
+        """
+        self._observer = observer
+
+    def tune(self, chunks: 'Chunks') -> None:
+        """
+        Passes received batches of results to ``chunks`` for tuning of their
+        size.
+        """
+        self._chunks = chunks
+
+    def _unpack(self, msg: Any) -> Sequence[Any]:
+        """
+        Returns messages carried by message, like results and errors of items
+        of :class:`Batch`, reports results and events to the observer.
+        """
+        if isinstance(msg, TaskEvent):
+            self._observer.on_event(msg)  # type: ignore[union-attr]
+            return ()
+
+        if isinstance(msg, Batch):
+            if self._chunks is not None:
+                self._chunks.tune(msg)
+            msgs: Sequence[Any] = msg.results
+        else:
+            msgs = (msg,)
+
+        if self._observer is not None:
+            for result in msgs:
+                if not isinstance(result, (Completion, ItemError)):
+                    self._observer.on_result(result)
+        return msgs
+
     @abc.abstractmethod
     def __call__(
-        self, *, suppress_exceptions: bool = False, fail_hard: bool = False
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        keep_results: bool = True,
     ) -> None:
         """
         The call blocks until the completion of all concurrent functions.
@@ -37,6 +278,41 @@ class AbstractWaiter(metaclass=abc.ABCMeta):
         :param suppress_exceptions: don't raise :class:`UnhandledExceptions`
         :param fail_hard: stop all functions and raise error if one of
             function abort with error
+        :param timeout: seconds to wait, then the functions are stopped and
+            :exc:`TimeoutError` is raised, functions blocked in C calls
+            aren't waited longer than :data:`DEADLINE_GRACE`
+        :param deadline: the same by time of :func:`time.monotonic`, the
+            earlier of both applies
+        :param keep_results: collect results for :meth:`results`, with
+            ``False`` they're dropped, so memory of long
+            :meth:`concurrently.map` doesn't grow with count of items, a
+            bounded ``result_buffer`` of engine limits the rest
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def as_completed(
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Union[Iterator, AsyncIterable]:
+        """
+        Returns iterator over results of concurrent functions in order of
+        their producing. Result is a value returned by function or every value
+        yielded by generator function.
+
+        It's the streaming variant of the waiter call and accepts the same
+        options.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def results(self) -> Sequence[Any]:
+        """
+        Returns list of all results collected by the waiter call.
         """
         raise NotImplementedError
 
@@ -57,6 +333,219 @@ class AbstractWaiter(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
+def deadline_of(
+    timeout: Optional[float], deadline: Optional[float]
+) -> Optional[float]:
+    """
+    Returns the earlier of ``deadline`` and time after ``timeout``.
+    """
+    if timeout is not None:
+        expires = time.monotonic() + timeout
+        if deadline is None or expires < deadline:
+            deadline = expires
+    return deadline
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """
+    Returns seconds till ``deadline``, raises :exc:`TimeoutError` when it is
+    passed.
+    """
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError
+    return left
+
+
+# seconds to wait for functions stopped at the deadline of waiter, the ones
+# blocked in C calls keep running after it
+DEADLINE_GRACE = 0.1
+
+
+def deadline_error(running: int) -> TimeoutError:
+    return TimeoutError(
+        '{} functions are still running at the deadline'.format(running)
+    )
+
+
+class Channel(Iterator):
+    """
+    Lazily pulls items from ``iterable`` on behalf of the concurrent workers,
+    ``lock`` serializes access to the underlying iterator.
+    """
+
+    def __init__(self, iterable: Iterable, lock: ContextManager) -> None:
+        self._it = iter(iterable)
+        self._lock = lock
+
+    def __next__(self):
+        with self._lock:
+            return next(self._it)
+
+
+class Completion:
+    """
+    Message about completion of concurrent function, sent next to its results.
+    """
+
+    __slots__ = ('exception',)
+
+    def __init__(self, exception: Optional[Exception] = None) -> None:
+        self.exception = exception
+
+
+class ItemError:
+    """
+    Message about exception of the function of :meth:`concurrently.map` for
+    an item, the worker goes on with next items.
+    """
+
+    __slots__ = ('exception',)
+
+    def __init__(self, exception: Exception) -> None:
+        self.exception = exception
+
+
+def map_item(fn: Callable[[Any], Any], item: Any) -> Any:
+    """
+    Returns result of ``fn`` for ``item`` or :class:`ItemError`.
+    """
+    try:
+        return fn(item)
+    except Exception as e:
+        return ItemError(e)
+
+
+async def map_item_async(fn: Callable, item: Any) -> Any:
+    """
+    Returns result of coroutine function ``fn`` for ``item`` or
+    :class:`ItemError`.
+    """
+    try:
+        return await fn(item)
+    except Exception as e:
+        return ItemError(e)
+
+
+class TaskEvent:
+    """
+    Message about progress of concurrent function, sent by observed workers.
+
+    :param kind: ``start``, ``finish``, ``error``, ``cancel`` or ``item``
+    :param name: name of the function
+    :param started: time of start by :func:`time.monotonic`
+    :param duration: seconds from start till the event
+    :param exception: exception of ``error`` event or failed item
+    """
+
+    __slots__ = ('kind', 'name', 'started', 'duration', 'exception')
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        started: float,
+        duration: float = 0.0,
+        exception: Optional[BaseException] = None,
+    ) -> None:
+        self.kind = kind
+        self.name = name
+        self.started = started
+        self.duration = duration
+        self.exception = exception
+
+    def __reduce__(self):
+        return TaskEvent, (
+            self.kind,
+            self.name,
+            self.started,
+            self.duration,
+            self.exception,
+        )
+
+
+class Batch:
+    """
+    Message with results of a chunk of items, sent instead of every result.
+
+    :param results: results of items of the chunk
+    :param elapsed: seconds of processing of the chunk
+    """
+
+    __slots__ = ('results', 'elapsed')
+
+    def __init__(self, results: Sequence[Any], elapsed: float) -> None:
+        self.results = results
+        self.elapsed = elapsed
+
+    def __reduce__(self):
+        return Batch, (self.results, self.elapsed)
+
+
+def run_observed(fn: Callable, name: str, items: bool = False) -> Iterator:
+    """
+    Yields results of ``fn`` surrounded by its :class:`TaskEvent` messages.
+    """
+    started = time.monotonic()
+    yield TaskEvent('start', name, started)
+    try:
+        if items:
+            yield from observe_items(fn(), name)
+        else:
+            yield from iter_results(fn())
+    except Exception as e:
+        yield TaskEvent('error', name, started, time.monotonic() - started, e)
+        raise
+    except BaseException:
+        # interrupted by stop
+        yield TaskEvent('cancel', name, started, time.monotonic() - started)
+        raise
+    yield TaskEvent('finish', name, started, time.monotonic() - started)
+
+
+def observe_items(results: Iterator, name: str) -> Iterator:
+    """
+    Yields results of map worker, every one after its ``item`` event with
+    seconds from taking of the item till the result. Batches of chunks
+    aren't timed by items.
+    """
+    taken = time.monotonic()
+    for result in results:
+        if not isinstance(result, Batch):
+            yield item_event(name, taken, result)
+        yield result
+        taken = time.monotonic()
+
+
+def item_event(name: str, taken: float, result: Any) -> TaskEvent:
+    exception = result.exception if isinstance(result, ItemError) else None
+    return TaskEvent(
+        'item', name, taken, time.monotonic() - taken, exception
+    )
+
+
+def unwrap_partial(fn: Callable) -> Callable:
+    """
+    Returns function wrapped by :func:`functools.partial`, which
+    :mod:`inspect` doesn't recognize as coroutine before Python 3.8.
+    """
+    while isinstance(fn, partial):
+        fn = fn.func
+    return fn
+
+
+def iter_results(value: Any) -> Iterator:
+    """
+    Yields results of concurrent function by its returned ``value``.
+    """
+    if isinstance(value, types.GeneratorType):
+        yield from value
+    else:
+        yield value
+
+
 class UnhandledExceptions(Exception):
     """
     :param exceptions: list of exception
@@ -30,54 +30,159 @@ Runs code in threads with asyncio::
 
     await fetch_urls()
 
+Every call starts threads for all its functions. Threads can be reused by
+calls with the same named executor or in the same event loop, or be limited
+by own executor::
+
+    @concurrently(200, engine=AsyncIOThreadEngine, executor='db')
+    def load_rows():
+        ...
+
+    @concurrently(4, engine=AsyncIOThreadEngine, per_loop=True)
+    def resize_images():
+        ...
+
 .. autoclass:: concurrently.AsyncIOThreadEngine
 """
 import asyncio
+import contextvars
+import inspect
 import sys
+import threading
+import time
 from collections.abc import Coroutine
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
-from typing import Callable, List, Sequence
-
-from . import AbstractEngine, AbstractWaiter, UnhandledExceptions
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from weakref import WeakKeyDictionary
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from concurrently.buffer import Buffer
+from . import (
+    AbstractEngine,
+    AbstractWaiter,
+    Batch,
+    Channel,
+    Completion,
+    ItemError,
+    TaskEvent,
+    UnhandledExceptions,
+    deadline_error,
+    deadline_of,
+    item_event,
+    iter_results,
+    map_item_async,
+    time_left,
+    unwrap_partial,
+)
+from .thread import call_with_timeout
 
 _PY_VERSION = float(sys.version_info[0]) + sys.version_info[1] / 10
 
 
 class AsyncIOWaiter(AbstractWaiter):
-    def __init__(self, fs: List[asyncio.Future]) -> None:
+    def __init__(self, fs: List[asyncio.Future], result_q: Buffer) -> None:
         self._fs = fs
+        self._result_q = result_q
+        self._running = len(fs)
+        self._results: List[Any] = []
+        # exceptions of items of map, the tasks keep own ones
+        self._exceptions: List[Exception] = []
 
     async def __call__(  # type: ignore[override]
-        self, *, suppress_exceptions: bool = False, fail_hard: bool = False
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        keep_results: bool = True,
     ) -> None:
-        when = asyncio.FIRST_EXCEPTION if fail_hard else asyncio.ALL_COMPLETED
-        done, pending = await asyncio.wait(self._fs, return_when=when)
-
-        if fail_hard:
-            for f in done:
-                e = f.exception()
-                if not e:
+        async for result in self.as_completed(
+            suppress_exceptions=suppress_exceptions,
+            fail_hard=fail_hard,
+            timeout=timeout,
+            deadline=deadline,
+        ):
+            if keep_results:
+                self._results.append(result)
+
+    async def as_completed(  # type: ignore[override]
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator:
+        deadline = deadline_of(timeout, deadline)
+        while self._running:
+            msg = await self._receive(deadline)
+            if self._observer is None and not isinstance(msg, Batch):
+                msgs: Sequence[Any] = (msg,)
+            else:
+                msgs = self._unpack(msg)
+
+            for msg in msgs:
+                if isinstance(msg, Completion):
+                    self._running -= 1
+                elif isinstance(msg, ItemError):
+                    self._exceptions.append(msg.exception)
+                else:
+                    yield msg
                     continue
 
-                for p in pending:
-                    p.cancel()
-
-                await asyncio.wait(pending)
-
-                raise e
+                if msg.exception and fail_hard:
+                    await self._stop_hard()
+                    raise msg.exception
 
         if not suppress_exceptions and self.exceptions():
             raise UnhandledExceptions(self.exceptions())
 
+    async def _receive(self, deadline: Optional[float]) -> Any:
+        if deadline is None:
+            return await self._result_q.get_async()
+        try:
+            return await asyncio.wait_for(
+                self._result_q.get_async(), time_left(deadline)
+            )
+        except (TimeoutError, asyncio.TimeoutError):
+            # stragglers are stopped, their results are kept
+            error = deadline_error(self._running)
+            await self.stop()
+            raise error
+
+    async def _stop_hard(self) -> None:
+        self._result_q.release()
+        pending = [f for f in self._fs if not f.done()]
+        for p in pending:
+            p.cancel()
+        if pending:
+            await asyncio.wait(pending)
+        self._running = 0
+
+    def results(self) -> Sequence[Any]:
+        return tuple(self._results)
+
     async def stop(self) -> None:  # type: ignore[override]
+        self._result_q.release()
         for f in self._fs:
             f.cancel()
         await self(suppress_exceptions=True)
 
     @lru_cache()
     def exceptions(self) -> Sequence[Exception]:
-        return tuple(
+        return tuple(self._exceptions) + tuple(
             f.exception()  # type: ignore[misc]
             for f in self._fs
             if not f.cancelled()
@@ -85,33 +190,344 @@ class AsyncIOWaiter(AbstractWaiter):
         )
 
 
+class AsyncIOChannel:
+    """
+    Delivers items of regular or asynchronous iterable to the coroutines.
+    """
+
+    def __init__(self, iterable: Union[Iterable, Any]) -> None:
+        self._it: Optional[Iterable] = None
+        if hasattr(iterable, '__aiter__'):
+            self._ait = iterable.__aiter__()
+            self._lock = asyncio.Lock()
+        else:
+            self._it = iter(iterable)
+
+    def __aiter__(self) -> 'AsyncIOChannel':
+        return self
+
+    async def __anext__(self):
+        if self._it is not None:
+            try:
+                return next(self._it)  # type: ignore[call-overload]
+            except StopIteration:
+                raise StopAsyncIteration
+
+        async with self._lock:
+            return await self._ait.__anext__()
+
+
 class AsyncIOEngine(AbstractEngine):
-    def __init__(self) -> None:
+    """
+    :param result_buffer: bounded :class:`Buffer` for results
+    """
+
+    def __init__(self, *, result_buffer: Optional[Buffer] = None) -> None:
         super().__init__()
         self.loop = _get_running_loop()
+        if result_buffer is None:
+            result_buffer = Buffer()
+        self._result_q = result_buffer
 
-    def create_task(self, fn: Coroutine) -> asyncio.Future:
-        assert asyncio.iscoroutinefunction(
-            fn
-        ), 'Decorated function `{}` must be coroutine'.format(fn.__name__)
+    def _init_call(self) -> None:
+        self.loop = _get_running_loop()
+        self._result_q = Buffer(self._result_q.high, self._result_q.low)
 
-        return _create_task(fn())
+    def create_task(self, fn: Callable[[], Coroutine]) -> asyncio.Future:
+        self._check_fn(fn)
+
+        f = _create_task(self._run(fn))
+        f.add_done_callback(self._on_done)
+        return f
 
     def waiter_factory(self, fs: List[asyncio.Future]) -> AsyncIOWaiter:
-        return AsyncIOWaiter(fs=fs)
+        return AsyncIOWaiter(fs=fs, result_q=self._result_q)
+
+    def channel_factory(self, iterable: Iterable) -> AsyncIOChannel:
+        return AsyncIOChannel(iterable)
+
+    def condition_factory(self) -> asyncio.Condition:
+        return asyncio.Condition()
+
+    def timeout_worker(self, fn, seconds):
+        self._check_fn(fn)
+
+        async def _worker(*args):
+            try:
+                return await asyncio.wait_for(fn(*args), seconds)
+            except asyncio.TimeoutError:
+                # it's not TimeoutError before Python 3.11
+                raise TimeoutError() from None
+
+        _worker.__name__ = getattr(fn, '__name__', _worker.__name__)
+        return _worker
+
+    def context_worker(self, fn, context):
+        self._check_fn(fn)
+
+        async def _worker():
+            async for result in context.run_async(fn):
+                yield result
+
+        _worker.__name__ = getattr(fn, '__name__', _worker.__name__)
+        return _worker
+
+    def observe_worker(self, fn, name, items=False):
+        self._check_fn(fn)
+
+        async def _worker():
+            started = time.monotonic()
+            yield TaskEvent('start', name, started)
+            try:
+                if items:
+                    async for result in observe_items_async(fn(), name):
+                        yield result
+                elif inspect.isasyncgenfunction(unwrap_partial(fn)):
+                    async for result in fn():
+                        yield result
+                else:
+                    yield await fn()
+            except asyncio.CancelledError:
+                # it's Exception before Python 3.8
+                duration = time.monotonic() - started
+                yield TaskEvent('cancel', name, started, duration)
+                raise
+            except Exception as e:
+                duration = time.monotonic() - started
+                yield TaskEvent('error', name, started, duration, e)
+                raise
+            except BaseException:
+                duration = time.monotonic() - started
+                yield TaskEvent('cancel', name, started, duration)
+                raise
+            yield TaskEvent('finish', name, started, time.monotonic() - started)
+
+        _worker.__name__ = name
+        return _worker
+
+    def map_worker(self, fn, channel, limits=None, rate=None):
+        self._check_fn(fn)
+
+        async def _wait_rate(item):
+            if rate:
+                await rate.wait_async(rate.key_of(item))
+
+        async def _worker():
+            async for item in channel:
+                await _wait_rate(item)
+                yield await map_item_async(fn, item)
+
+        async def _adaptive_worker():
+            it = channel.__aiter__()
+            while await limits.acquire_async():
+                failed = True
+                try:
+                    item = await it.__anext__()
+                except StopAsyncIteration:
+                    await limits.close_async()
+                    return
+
+                started = time.monotonic()
+                try:
+                    await _wait_rate(item)
+                    started = time.monotonic()
+                    result = await map_item_async(fn, item)
+                    failed = isinstance(result, ItemError)
+                finally:
+                    await limits.release_async(
+                        time.monotonic() - started, failed
+                    )
+                yield result
+
+        worker = _adaptive_worker if limits else _worker
+        worker.__name__ = getattr(fn, '__name__', worker.__name__)
+        return worker
+
+    async def _run(self, fn: Callable) -> None:
+        if inspect.isasyncgenfunction(unwrap_partial(fn)):
+            async for result in fn():
+                await self._result_q.put_async(result)
+        else:
+            await self._result_q.put_async(await fn())
+
+    def _on_done(self, f: asyncio.Future) -> None:
+        exc = None if f.cancelled() else f.exception()
+        self._result_q.push(Completion(exc))  # type: ignore[arg-type]
+
+    def _check_fn(self, fn) -> None:
+        unwrapped = unwrap_partial(fn)
+        assert asyncio.iscoroutinefunction(unwrapped) or (
+            inspect.isasyncgenfunction(unwrapped)
+        ), 'Decorated function `{}` must be coroutine'.format(
+            getattr(fn, '__name__', repr(fn))
+        )
+
+
+async def observe_items_async(
+    results: AsyncIterator, name: str
+) -> AsyncIterator:
+    """
+    Asynchronous :func:`observe_items`.
+    """
+    taken = time.monotonic()
+    async for result in results:
+        if not isinstance(result, Batch):
+            yield item_event(name, taken, result)
+        yield result
+        taken = time.monotonic()
 
 
 class AsyncIOThreadEngine(AsyncIOEngine):
-    _pool = ThreadPoolExecutor()
+    """
+    :param executor: :class:`~concurrent.futures.Executor` of functions or
+        name of executor shared by engines with the same name, by default
+        every call has own threads, one per function
+    :param per_loop: share executor by calls in the same event loop
+    :param result_buffer: bounded :class:`Buffer` for results
+    """
+
+    _named: Dict[str, ThreadPoolExecutor] = {}
+    _loops: MutableMapping[asyncio.AbstractEventLoop, ThreadPoolExecutor] = (
+        WeakKeyDictionary()
+    )
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        *,
+        executor: Union[Executor, str, None] = None,
+        per_loop: bool = False,
+        result_buffer: Optional[Buffer] = None
+    ) -> None:
+        super().__init__(result_buffer=result_buffer)
+        if executor is not None and per_loop:
+            raise ValueError('executor and per_loop are mutually exclusive')
+
+        self._owned = executor is None and not per_loop
+        if isinstance(executor, str):
+            executor = self._shared(self._named, executor, executor)
+        elif per_loop:
+            executor = self._shared(self._loops, self.loop, 'concurrently')
+        self._executor: Optional[Executor] = executor
+        self._started: Optional[ThreadPoolExecutor] = None
+        self._running = 0
+
+    def start(self) -> None:
+        # calls of the instance share the executor
+        if self._owned:
+            self._executor = self._started = _Executor('concurrently')
+            self._owned = False
+
+    def close(self) -> None:
+        super().close()
+        if self._started:
+            self._started.shutdown(wait=False)
+
+    def _init_call(self) -> None:
+        super()._init_call()
+        self._running = 0
 
     def create_task(self, fn: Callable[[], None]) -> asyncio.Future:  # type: ignore[override]
-        assert not asyncio.iscoroutinefunction(
-            fn
+        self._check_fn(fn)
+
+        if self._executor is None:
+            self._executor = _Executor('concurrently')
+        # unlike tasks, executors don't pass context variables
+        context = contextvars.copy_context()
+        f = self.loop.run_in_executor(
+            self._executor, context.run, self._run_sync, fn
+        )
+        f.add_done_callback(self._on_done)
+        self._running += 1
+        return f
+
+    def channel_factory(self, iterable: Iterable) -> Channel:  # type: ignore[override]
+        return Channel(iterable, threading.Lock())
+
+    def condition_factory(self) -> threading.Condition:  # type: ignore
+        return threading.Condition()
+
+    def timeout_worker(self, fn, seconds):
+        self._check_fn(fn)
+
+        worker = partial(call_with_timeout, fn, seconds)
+        setattr(worker, '__name__', getattr(fn, '__name__', repr(fn)))
+        return worker
+
+    def context_worker(self, fn, context):
+        self._check_fn(fn)
+
+        return AbstractEngine.context_worker(self, fn, context)
+
+    def observe_worker(self, fn, name, items=False):
+        self._check_fn(fn)
+
+        return AbstractEngine.observe_worker(self, fn, name, items)
+
+    def map_worker(self, fn, channel, limits=None, rate=None):
+        self._check_fn(fn)
+
+        return AbstractEngine.map_worker(self, fn, channel, limits, rate)
+
+    def _run_sync(self, fn: Callable) -> None:
+        for result in iter_results(fn()):
+            self._result_q.put(result)
+
+    def _on_done(self, f: asyncio.Future) -> None:
+        super()._on_done(f)
+        self._running -= 1
+        if self._owned and not self._running and self._executor:
+            # threads of the call exit, next call starts new ones
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @classmethod
+    def _shared(cls, executors, key, name: str) -> ThreadPoolExecutor:
+        with cls._lock:
+            executor = executors.get(key)
+            if executor is None:
+                executor = executors[key] = _Executor(name)
+            return executor
+
+    def _check_fn(self, fn) -> None:
+        unwrapped = unwrap_partial(fn)
+        assert not (
+            asyncio.iscoroutinefunction(unwrapped)
+            or inspect.isasyncgenfunction(unwrapped)
         ), 'Decorated function `{}` must be regular not a coroutine'.format(
-            fn.__name__
+            getattr(fn, '__name__', repr(fn))
         )
 
-        return self.loop.run_in_executor(self._pool, fn)
+
+class _Executor(ThreadPoolExecutor):
+    """
+    Executor which starts threads while there are no idle ones, so every
+    function has a thread, but no more threads than functions running at
+    once, which are the concurrency of calls sharing it.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(max_workers=1, thread_name_prefix=name)
+        self._count_lock = threading.Lock()
+        self._count = 0
+
+    def submit(self, fn, *args, **kwargs):  # type: ignore[override]
+        with self._count_lock:
+            self._count += 1
+            # before Python 3.8 the executor doesn't reuse idle threads
+            # and starts a new one for every submit below max_workers
+            self._max_workers = max(self._max_workers, self._count)
+        try:
+            f = super().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._on_done(None)
+            raise
+        f.add_done_callback(self._on_done)
+        return f
+
+    def _on_done(self, f) -> None:
+        with self._count_lock:
+            self._count -= 1
 
 
 def _create_task(coro: Coroutine) -> asyncio.Task:
@@ -0,0 +1,383 @@
+"""
+AsyncIOProcessEngine
+--------------------
+
+Runs coroutines in event loops of several processes, so asynchronous code
+with CPU-heavy parts uses all cores::
+
+    from concurrently import concurrently, AsyncIOProcessEngine
+
+    ...
+    @concurrently(20, engine=AsyncIOProcessEngine, processes=4)
+    async def fetch_urls():  # 4 processes run 5 coroutines each
+        ...
+
+    await fetch_urls()
+
+Coroutines are spread over the processes evenly, and their results and
+exceptions are sent back to the waiter, which must be awaited like the
+waiter of :class:`AsyncIOEngine`. As for :class:`ProcessEngine`, results
+and exceptions must be picklable.
+
+.. autoclass:: concurrently.AsyncIOProcessEngine
+"""
+import asyncio
+import inspect
+import os
+import queue
+import signal
+import threading
+from contextlib import suppress
+from functools import lru_cache
+from multiprocessing import Process, Queue
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence
+
+from concurrently.buffer import Buffer
+from . import (
+    DEADLINE_GRACE,
+    AbstractWaiter,
+    Batch,
+    Completion,
+    ItemError,
+    UnhandledExceptions,
+    deadline_error,
+    deadline_of,
+    time_left,
+    unwrap_partial,
+)
+from .asyncio import AsyncIOEngine
+from .process import ProcessChannel, _ChannelError, _EndOfChannel, _loads
+
+# set in processes when their event loops stop
+_stopping = threading.Event()
+
+
+class EventLoopProcess(Process):
+    """
+    Process running coroutines of ``fns`` in own event loop.
+    """
+
+    def __init__(self, result_q: Queue) -> None:
+        super().__init__(daemon=True)
+        self.fns: List[Callable] = []
+        self._result_q = result_q
+        self._completed = 0
+
+    def run(self) -> None:
+        try:
+            asyncio.run(self._main())
+        except BaseException as e:
+            # the process is interrupted before start of the coroutines
+            exc = e if isinstance(e, Exception) else None
+            for _ in range(len(self.fns) - self._completed):
+                self._put_completion(exc)
+
+    def interrupt(self) -> None:
+        if self.pid and self.is_alive():
+            os.kill(self.pid, signal.SIGINT)
+
+    async def _main(self) -> None:
+        loop = asyncio.get_running_loop()
+        tasks = [loop.create_task(self._run(fn)) for fn in self.fns]
+        for task in tasks:
+            task.add_done_callback(self._on_done)
+        loop.add_signal_handler(signal.SIGINT, self._cancel, tasks)
+        try:
+            await asyncio.wait(tasks)
+        finally:
+            _stopping.set()
+
+    async def _run(self, fn: Callable) -> None:
+        if inspect.isasyncgenfunction(unwrap_partial(fn)):
+            async for result in fn():
+                self._put(result)
+        else:
+            self._put(await fn())
+
+    def _on_done(self, f: asyncio.Future) -> None:
+        self._completed += 1
+        exc = None if f.cancelled() else f.exception()
+        self._put_completion(exc)  # type: ignore[arg-type]
+
+    def _put(self, msg: Any) -> None:
+        # messages are unpickled by the forwarding thread of the parent, so
+        # a message failing there doesn't stop the forwarding
+        self._result_q.put(bytes(ForkingPickler.dumps(msg)))
+
+    def _put_completion(self, exc: Optional[Exception]) -> None:
+        try:
+            self._put(Completion(exc))
+        except Exception:
+            # the exception can't be pickled
+            self._put(Completion(RuntimeError(repr(exc))))
+
+    def _cancel(self, tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            task.cancel()
+
+
+class AsyncIOProcessChannel(ProcessChannel):
+    """
+    :class:`ProcessChannel` iterated by coroutines, items are received by
+    threads of the process.
+    """
+
+    async def __aiter__(self) -> AsyncIterator:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._receive)
+            if item is _EndOfChannel:
+                return
+            yield item
+
+    def _receive(self) -> Any:
+        while not _stopping.is_set():
+            try:
+                item = self._q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _EndOfChannel:
+                # pass the marker to the next coroutine
+                self._q.put(_EndOfChannel)
+            elif isinstance(item, _ChannelError):
+                self._q.put(_EndOfChannel)
+                raise item.exception
+            return item
+        return _EndOfChannel
+
+
+class AsyncIOProcessWaiter(AbstractWaiter):
+    def __init__(
+        self,
+        processes: List[EventLoopProcess],
+        result_q: Buffer,
+        running: int,
+        channel: Optional[ProcessChannel] = None,
+    ) -> None:
+        self._processes = processes
+        self._result_q = result_q
+        self._running = running
+        self._channel = channel
+        self._results: List[Any] = []
+        self._exceptions: List[Exception] = []
+        self._expired = False
+
+    async def __call__(  # type: ignore[override]
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        keep_results: bool = True,
+    ) -> None:
+        async for result in self.as_completed(
+            suppress_exceptions=suppress_exceptions,
+            fail_hard=fail_hard,
+            timeout=timeout,
+            deadline=deadline,
+        ):
+            if keep_results:
+                self._results.append(result)
+
+    async def as_completed(  # type: ignore[override]
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator:
+        deadline = deadline_of(timeout, deadline)
+        while self._running:
+            msg = await self._receive(deadline)
+            if self._observer is None and not isinstance(msg, Batch):
+                msgs: Sequence[Any] = (msg,)
+            else:
+                msgs = self._unpack(msg)
+
+            for msg in msgs:
+                if isinstance(msg, Completion):
+                    self._running -= 1
+                elif not isinstance(msg, ItemError):
+                    yield msg
+                    continue
+
+                exc = msg.exception
+                if exc and fail_hard:
+                    await self._stop_hard()
+                    raise exc
+                if exc:
+                    self._exceptions.append(exc)
+
+        self._close_channel()
+
+        if not suppress_exceptions and self.exceptions():
+            raise UnhandledExceptions(self.exceptions())
+
+    async def _receive(self, deadline: Optional[float]) -> Any:
+        if deadline is None:
+            return await self._result_q.get_async()
+        try:
+            return await asyncio.wait_for(
+                self._result_q.get_async(), time_left(deadline)
+            )
+        except (TimeoutError, asyncio.TimeoutError):
+            error = deadline_error(self._running)
+            if not self._expired:
+                self._expired = True
+                await self._stop_expired()
+            raise error
+
+    def results(self) -> Sequence[Any]:
+        return tuple(self._results)
+
+    async def stop(self) -> None:  # type: ignore[override]
+        self._interrupt()
+        await self(suppress_exceptions=True)
+
+    @lru_cache()
+    def exceptions(self) -> Sequence[Exception]:
+        return tuple(self._exceptions)
+
+    async def _stop_expired(self) -> None:
+        """
+        Stops stragglers at the deadline and keeps results of the ones
+        stopped within :data:`DEADLINE_GRACE`.
+        """
+        self._interrupt()
+        with suppress(TimeoutError, asyncio.TimeoutError):
+            await self(suppress_exceptions=True, timeout=DEADLINE_GRACE)
+
+    async def _stop_hard(self) -> None:
+        self._interrupt()
+        while self._running:
+            msg = await self._result_q.get_async()
+            if isinstance(msg, Completion):
+                self._running -= 1
+
+    def _interrupt(self) -> None:
+        self._result_q.release()
+        self._close_channel()
+        for p in self._processes:
+            p.interrupt()
+
+    def _close_channel(self) -> None:
+        if self._channel:
+            self._channel.close()
+
+
+class AsyncIOProcessEngine(AsyncIOEngine):
+    """
+    :param processes: count of processes, by default count of cores;
+        concurrency of the call is split between them
+    :param channel_size: max count of items of :meth:`concurrently.map`
+        waiting for processes
+    :param result_buffer: bounded :class:`Buffer` for results
+    """
+
+    def __init__(
+        self,
+        *,
+        processes: Optional[int] = None,
+        channel_size: int = 100,
+        result_buffer: Optional[Buffer] = None
+    ) -> None:
+        super().__init__(result_buffer=result_buffer)
+        self._process_count = processes or os.cpu_count() or 1
+        self._processes: List[EventLoopProcess] = []
+        self._created = 0
+        self._mp_result_q: Queue = Queue()
+        self._channel: Optional[AsyncIOProcessChannel] = None
+        self._channel_size = channel_size
+
+    def _init_call(self) -> None:
+        super()._init_call()
+        self._processes = []
+        self._created = 0
+        self._mp_result_q = Queue()
+        self._channel = None
+
+    def create_task(  # type: ignore[override]
+        self, fn: Callable
+    ) -> EventLoopProcess:
+        self._check_fn(fn)
+
+        index = self._created % self._process_count
+        if index == len(self._processes):
+            self._processes.append(EventLoopProcess(self._mp_result_q))
+        self._created += 1
+
+        # processes start with all their coroutines in the waiter_factory
+        p = self._processes[index]
+        p.fns.append(fn)
+        return p
+
+    def waiter_factory(  # type: ignore[override]
+        self, fs: List[EventLoopProcess]
+    ) -> AsyncIOProcessWaiter:
+        for p in self._processes:
+            p.start()
+        threading.Thread(
+            target=self._forward, args=(self._created,), daemon=True
+        ).start()
+        return AsyncIOProcessWaiter(
+            self._processes,
+            self._result_q,
+            self._created,
+            channel=self._channel,
+        )
+
+    def channel_factory(  # type: ignore[override]
+        self, iterable
+    ) -> AsyncIOProcessChannel:
+        self._channel = AsyncIOProcessChannel(iterable, self._channel_size)
+        return self._channel
+
+    def condition_factory(self) -> threading.Condition:  # type: ignore
+        return threading.Condition()
+
+    def map_worker(self, fn, channel, limits=None, rate=None):
+        if limits:
+            raise ValueError(
+                'adaptive concurrency is not supported by '
+                'AsyncIOProcessEngine'
+            )
+        if rate:
+            # processes inherit the shared buckets on start
+            rate.share()
+        return super().map_worker(fn, channel, limits, rate)
+
+    def _forward(self, running: int) -> None:
+        """
+        Moves messages of the processes to the buffer of the waiter.
+        """
+        exited = False
+        while running:
+            try:
+                data = self._mp_result_q.get(timeout=0.1)
+            except queue.Empty:
+                if any(p.is_alive() for p in self._processes):
+                    continue
+                if not exited:
+                    # messages sent before exit may be on the way
+                    exited = True
+                    continue
+                # processes are killed without sending completions
+                exc = RuntimeError(
+                    'processes exited with codes {}'.format(
+                        [p.exitcode for p in self._processes]
+                    )
+                )
+                while running:
+                    running -= 1
+                    self._result_q.push(Completion(exc))
+                return
+
+            msg = _loads(data, Completion, 'event loop process')
+            if isinstance(msg, Completion):
+                running -= 1
+                self._result_q.push(msg)
+            else:
+                self._result_q.put(msg)
@@ -21,44 +21,206 @@ Runs code as ``gevent`` greenlets::
 
 .. autoclass:: concurrently.GeventEngine
 """
+import contextvars
+from collections import deque
 from functools import lru_cache
-from typing import Callable, List, Sequence
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
 
 try:
     import gevent  # type: ignore
+    import gevent.event  # type: ignore
+    import gevent.lock  # type: ignore
+    import gevent.queue  # type: ignore
 except ImportError:
     raise ImportError('gevent is not installed')
 
-from . import AbstractEngine, AbstractWaiter, UnhandledExceptions
+from . import (
+    AbstractEngine,
+    AbstractWaiter,
+    Batch,
+    Channel,
+    Completion,
+    ItemError,
+    UnhandledExceptions,
+    deadline_error,
+    deadline_of,
+    iter_results,
+    time_left,
+)
 
 
 class GeventEngine(AbstractEngine):
+    """
+    :param result_size: max count of results waiting for the waiter,
+        greenlets block while the queue is full, ``None`` for unbounded
+    """
+
+    def __init__(self, *, result_size: Optional[int] = None) -> None:
+        self._result_size = result_size
+        self._init_call()
+
+    def _init_call(self) -> None:
+        self._result_q = gevent.queue.Queue()
+        # completions are put without slots, so the hub never blocks
+        self._slots = (
+            gevent.lock.BoundedSemaphore(self._result_size)
+            if self._result_size
+            else None
+        )
+
     def create_task(self, fn: Callable) -> gevent.Greenlet:
-        return gevent.spawn(fn)
+        g = gevent.spawn(contextvars.copy_context().run, self._run, fn)
+        g.rawlink(self._on_done)
+        return g
 
     def waiter_factory(self, fs) -> 'GeventWaiter':
-        return GeventWaiter(fs)
+        return GeventWaiter(fs, self._result_q, self._slots)
+
+    def channel_factory(self, iterable: Iterable) -> Channel:
+        return Channel(iterable, gevent.lock.Semaphore())
+
+    def sleep(self, seconds: float) -> None:
+        gevent.sleep(seconds)
+
+    def condition_factory(self) -> 'GeventCondition':
+        return GeventCondition()
+
+    def timeout_worker(self, fn: Callable, seconds: float) -> Callable:
+        def _worker(*args):
+            with gevent.Timeout(seconds, TimeoutError):
+                return fn(*args)
+
+        _worker.__name__ = getattr(fn, '__name__', _worker.__name__)
+        return _worker
+
+    def _run(self, fn: Callable) -> None:
+        for result in iter_results(fn()):
+            if self._slots:
+                self._slots.acquire()
+            self._result_q.put(result)
+
+    def _on_done(self, g: gevent.Greenlet) -> None:
+        self._result_q.put_nowait(Completion(g.exception))
+
+
+class GeventCondition:
+    """
+    Condition variable for greenlets, which switch only on waiting, so the
+    lock is not needed.
+    """
+
+    def __init__(self) -> None:
+        self._event = gevent.event.Event()
+
+    def __enter__(self) -> 'GeventCondition':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def wait(self) -> None:
+        self._event.wait()
+
+    def notify(self, n: int = 1) -> None:
+        if n:
+            self.notify_all()
+
+    def notify_all(self) -> None:
+        event, self._event = self._event, gevent.event.Event()
+        event.set()
 
 
 class GeventWaiter(AbstractWaiter):
-    def __init__(self, fs: List[gevent.Greenlet]) -> None:
+    def __init__(
+        self,
+        fs: List[gevent.Greenlet],
+        result_q: gevent.queue.Queue,
+        slots: Optional[gevent.lock.BoundedSemaphore] = None,
+    ) -> None:
         self._fs = fs
+        self._result_q = result_q
+        self._slots = slots
+        self._running = len(fs)
+        self._results: List[Any] = []
+        # exceptions of items of map, the greenlets keep own ones
+        self._exceptions: List[Exception] = []
 
     def __call__(
-        self, *, suppress_exceptions: bool = False, fail_hard: bool = False
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        keep_results: bool = True,
     ) -> None:
-        if not fail_hard:
-            gevent.joinall(self._fs)
-            if not suppress_exceptions:
-                excs = self.exceptions()
-                if excs:
-                    raise UnhandledExceptions(excs)
+        results = self.as_completed(
+            suppress_exceptions=suppress_exceptions,
+            fail_hard=fail_hard,
+            timeout=timeout,
+            deadline=deadline,
+        )
+        if keep_results:
+            self._results.extend(results)
         else:
-            gevent.joinall(self._fs, raise_error=True)
+            deque(results, maxlen=0)
+
+    def as_completed(
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator:
+        deadline = deadline_of(timeout, deadline)
+        while self._running:
+            msg = self._receive(deadline)
+            if self._observer is None and not isinstance(msg, Batch):
+                msgs: Sequence[Any] = (msg,)
+            else:
+                msgs = self._unpack(msg)
+
+            for msg in msgs:
+                if isinstance(msg, Completion):
+                    self._running -= 1
+                elif isinstance(msg, ItemError):
+                    self._exceptions.append(msg.exception)
+                else:
+                    yield msg
+                    continue
+
+                if msg.exception and fail_hard:
+                    gevent.killall(self._fs)
+                    self._running = 0
+                    raise msg.exception
+
+        if not suppress_exceptions:
+            excs = self.exceptions()
+            if excs:
+                raise UnhandledExceptions(excs)
+
+    def _receive(self, deadline: Optional[float]) -> Any:
+        try:
+            msg = self._result_q.get(timeout=time_left(deadline))
+        except (TimeoutError, gevent.queue.Empty):
+            # stragglers are stopped, their results are kept
+            error = deadline_error(self._running)
+            self.stop()
+            raise error
+
+        if self._slots and not isinstance(msg, Completion):
+            self._slots.release()
+        return msg
+
+    def results(self) -> Sequence[Any]:
+        return tuple(self._results)
 
     def stop(self) -> None:
         gevent.killall(self._fs)
 
     @lru_cache()
     def exceptions(self) -> Sequence[Exception]:
-        return tuple(f.exception for f in self._fs if f.exception)
+        return tuple(self._exceptions) + tuple(
+            f.exception for f in self._fs if f.exception
+        )
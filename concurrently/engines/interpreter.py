@@ -0,0 +1,284 @@
+"""
+InterpreterEngine
+-----------------
+
+Runs code in subinterpreters of the current process (:pep:`734`). Every
+subinterpreter has own GIL, so functions use all cores like processes, while
+subinterpreters start faster and take less memory::
+
+    from concurrently import concurrently, InterpreterEngine
+
+    ...
+    def render_tiles():  # must be defined at module level
+        ...
+
+    concurrently(4, engine=InterpreterEngine)(render_tiles)()
+
+As for :class:`ProcessPoolEngine`, functions are sent to subinterpreters by
+:mod:`pickle`, so they must be defined at module level of importable module
+(or be :func:`functools.partial` of such functions), as well as their results
+and exceptions must be picklable. Subinterpreters are kept by the process and
+reused by next calls.
+
+Running functions can't be interrupted, so the stop and ``fail_hard`` end
+items of :meth:`concurrently.map` and wait for completion of the functions.
+
+On Python without :mod:`concurrent.interpreters` (before 3.14) the engine
+falls back to :class:`ProcessPoolEngine`.
+
+.. autoclass:: concurrently.InterpreterEngine
+"""
+import atexit
+import pickle
+import queue
+import sys
+import threading
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from . import AbstractEngine, Completion, iter_results
+from .process import ProcessWaiter, _ChannelError, _EndOfChannel
+from .process_pool import ProcessPoolEngine, _map_items
+
+try:
+    from concurrent import interpreters  # type: ignore
+except ImportError:
+    interpreters = None
+
+
+class _Queue:
+    """
+    Queue of :mod:`concurrent.interpreters` for picklable objects.
+    """
+
+    def __init__(self, maxsize: int = 0, raw: Any = None) -> None:
+        if raw is not None:
+            self._raw = raw
+        elif maxsize:
+            self._raw = interpreters.create_queue(maxsize)
+        else:
+            self._raw = interpreters.create_queue()
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> None:
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        self._raw.put(data, timeout=timeout)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        return pickle.loads(self._raw.get(timeout=timeout))
+
+    def get_nowait(self) -> Any:
+        return pickle.loads(self._raw.get_nowait())
+
+    def __reduce__(self):
+        return _Queue, (0, self._raw)
+
+
+class _InterpreterPool:
+    """
+    Keeps idle subinterpreters for next functions.
+    """
+
+    def __init__(self) -> None:
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Any:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        interp = interpreters.create()
+        # functions are imported by the same paths as in the main interpreter
+        interp.exec('import sys; sys.path[:] = {!r}'.format(sys.path))
+        return interp
+
+    def release(self, interp: Any) -> None:
+        with self._lock:
+            self._idle.append(interp)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for interp in idle:
+            interp.close()
+
+
+_pool = _InterpreterPool()
+if interpreters is not None:
+    atexit.register(_pool.close)
+
+
+class InterpreterTask:
+    """
+    Function of :class:`InterpreterEngine`, which is called in a
+    subinterpreter from own thread of the main interpreter.
+    """
+
+    def __init__(self, fn: Callable, result_q: _Queue) -> None:
+        self.payload = pickle.dumps(fn, pickle.HIGHEST_PROTOCOL)
+        self._result_q = result_q
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self) -> None:
+        interp = None
+        try:
+            interp = _pool.acquire()
+            interp.call(_call, self.payload, self._result_q._raw)
+        except Exception as e:
+            # the function didn't start, the subinterpreter may be broken
+            if interp is not None:
+                interp.close()
+            self._result_q.put(Completion(e))
+        else:
+            _pool.release(interp)
+
+    def interrupt(self) -> None:
+        """
+        Functions in subinterpreters can't be interrupted.
+        """
+
+
+class InterpreterChannel:
+    """
+    Delivers items of iterable to subinterpreters through a queue of
+    :mod:`concurrent.interpreters`, which is filled lazily by a thread of the
+    main interpreter.
+    """
+
+    def __init__(self, iterable: Iterable, maxsize: int = 100) -> None:
+        self._it = iter(iterable)
+        self._q = _Queue(maxsize)
+        self._closed = threading.Event()
+        self._feeder: Optional[threading.Thread] = None
+
+    def start(self, rate=None) -> None:
+        self._feeder = threading.Thread(
+            target=self._feed, args=(rate,), daemon=True
+        )
+        self._feeder.start()
+
+    def close(self) -> None:
+        """
+        Drops items waiting in the queue and ends iteration in
+        subinterpreters.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._feeder:
+            self._feeder.join()
+
+        while True:
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                break
+        self._q.put(_EndOfChannel)
+
+    def __reduce__(self):
+        return _ChildChannel, (self._q,)
+
+    def _feed(self, rate) -> None:
+        try:
+            for item in self._it:
+                if rate:
+                    # the feeder waits for token, subinterpreters don't
+                    rate.wait(rate.key_of(item))
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(_ChannelError(e))
+        self._put(_EndOfChannel)
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+
+class InterpreterWaiter(ProcessWaiter):
+    def stop(self) -> None:
+        # functions of map complete after their current items
+        self._close_channel()
+        super().stop()
+
+
+class InterpreterEngine(AbstractEngine):
+    """
+    :param channel_size: max count of items of :meth:`concurrently.map`
+        waiting for subinterpreters
+    """
+
+    def __new__(cls, **kw):
+        if interpreters is None:
+            return ProcessPoolEngine()
+        return super().__new__(cls)
+
+    def __init__(self, *, channel_size: int = 100) -> None:
+        self._result_q = _Queue()
+        self._channel: Optional[InterpreterChannel] = None
+        self._channel_size = channel_size
+
+    def _init_call(self) -> None:
+        self._result_q = _Queue()
+        self._channel = None
+
+    def create_task(self, fn: Callable[[], None]) -> InterpreterTask:
+        return InterpreterTask(fn, self._result_q)
+
+    def waiter_factory(self, fs) -> InterpreterWaiter:
+        return InterpreterWaiter(
+            fs, self._result_q, channel=self._channel  # type: ignore
+        )
+
+    def channel_factory(  # type: ignore[override]
+        self, iterable: Iterable
+    ) -> InterpreterChannel:
+        self._channel = InterpreterChannel(iterable, self._channel_size)
+        return self._channel
+
+    def map_worker(
+        self, fn: Callable[[Any], Any], channel, limits=None, rate=None
+    ) -> Callable:
+        channel.start(rate)
+        return partial(_map_items, fn, channel)
+
+
+# code below runs in subinterpreters
+
+
+def _call(payload: bytes, raw_q: Any) -> None:
+    result_q = _Queue(raw=raw_q)
+    exc = None
+    try:
+        fn = pickle.loads(payload)
+        for result in iter_results(fn()):
+            result_q.put(result)
+    except Exception as e:
+        exc = e
+
+    try:
+        result_q.put(Completion(exc))
+    except Exception:
+        result_q.put(Completion(RuntimeError(repr(exc))))
+
+
+class _ChildChannel:
+    def __init__(self, q: _Queue) -> None:
+        self._q = q
+
+    def __iter__(self) -> Iterator:
+        while True:
+            item = self._q.get()
+            if item is _EndOfChannel:
+                # pass the marker to the next function
+                self._q.put(_EndOfChannel)
+                return
+            if isinstance(item, _ChannelError):
+                self._q.put(_EndOfChannel)
+                raise item.exception
+            yield item
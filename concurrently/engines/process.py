@@ -14,76 +14,600 @@ Runs code in system process::
     fetch_urls()
 
 .. autoclass::  concurrently.ProcessEngine
+
+
+SharedMemoryChannel
+-------------------
+
+Moves bulk binary data between processes through shared memory without
+pickling. Data is placed in one of fixed size slots, and only the number of
+the slot is sent to the other side::
+
+    from concurrently import concurrently, ProcessEngine, SharedMemoryChannel
+
+    frames = SharedMemoryChannel(slot_size=4 * 1024 * 1024, slots=8)
+
+    def process_frame(view):  # memoryview of the slot
+        array = numpy.frombuffer(view, dtype=numpy.uint8)
+        ...
+
+    waiter = concurrently.map(process_frame, frames, 4, engine=ProcessEngine)
+    for frame in read_frames():
+        frames.send(frame)  # blocks while all slots are busy
+    frames.close()
+    waiter()
+
+The channel can also be read in the parent process, for example as output of
+workers. The channel must be created before start of the processes, which
+inherit it by ``fork``, so other start methods of :mod:`multiprocessing`
+aren't supported, for example defaults of macOS and Windows.
+
+.. autoclass:: concurrently.SharedMemoryChannel
+    :members: send, reserve, close
 """
+import mmap
+import multiprocessing
 import os
+import pickletools
+import queue
 import signal
-from functools import lru_cache
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, suppress
+from functools import lru_cache, partial
+from itertools import islice
 from multiprocessing import Process as _Process
-from multiprocessing import Queue
-from typing import Callable, List, Sequence
+from multiprocessing import BoundedSemaphore, Pipe, Queue, SimpleQueue
+from multiprocessing.connection import Connection, wait
+from multiprocessing.reduction import ForkingPickler
+from queue import Full
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
-from . import AbstractEngine, AbstractWaiter, UnhandledExceptions
+from . import (
+    AbstractEngine,
+    AbstractWaiter,
+    Batch,
+    Completion,
+    ItemError,
+    UnhandledExceptions,
+    deadline_error,
+    deadline_of,
+    iter_results,
+    time_left,
+)
 
 
 class Process(_Process):
-    def __init__(self, *a, result_q: Queue, **kw) -> None:
+    def __init__(self, *a, result_q: Any, **kw) -> None:
         super().__init__(*a, **kw)
         self._result_q = result_q
 
     def run(self) -> None:
         try:
-            super().run()
+            for result in iter_results(self._target()):  # type: ignore
+                self._result_q.put(result)
         except Exception as e:
-            self._result_q.put(e)
+            completion = Completion(e)
         except KeyboardInterrupt:
-            self._result_q.put(None)
+            completion = Completion()
         else:
-            self._result_q.put(None)
+            completion = Completion()
+
+        # the stop mustn't interrupt sending of the completion
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            self._result_q.put(completion)
+        except Exception:
+            # the exception can't be pickled
+            error = RuntimeError(repr(completion.exception))
+            self._result_q.put(Completion(error))
+
+    def interrupt(self) -> None:
+        # the exited process may be already reaped by the waiter
+        if self.pid and self.exitcode is None:
+            with suppress(ProcessLookupError):
+                os.kill(self.pid, signal.SIGINT)
+
+
+class _Exited:
+    """
+    Completion sent by the process before its exit.
+    """
+
+    __slots__ = ('exception',)
+
+    def __init__(self, exception: Optional[Exception]) -> None:
+        self.exception = exception
+
+
+def _loads(data: bytes, completion: type, source: str) -> Any:
+    """
+    Returns message unpickled from ``data`` of ``source``, a message which
+    can't be unpickled in the parent is replaced by ``completion`` or
+    :class:`ItemError` with :exc:`RuntimeError`.
+    """
+    try:
+        return ForkingPickler.loads(data)
+    except Exception as e:
+        error = RuntimeError(
+            'Message of {} can not be unpickled: {!r}'.format(source, e)
+        )
+        # the module and the class of the message are its first strings,
+        # which are read without unpickling of objects
+        names = islice(
+            (a for _, a, _ in pickletools.genops(data) if isinstance(a, str)),
+            2,
+        )
+        if list(names)[-1:] == [completion.__name__]:
+            return completion(error)
+        return ItemError(error)
+
+
+class ResultPipes:
+    """
+    Results and completions of processes of :class:`ProcessEngine`. Every
+    process writes messages to own pipe without feeder threads, and the
+    waiter watches all pipes at once. The end of a pipe is the exit of its
+    process, so a process killed before its completion is noticed at once.
+
+    :param maxsize: max count of results in pipes, processes block while
+        they're full, ``0`` for unbounded
+    """
+
+    # a process forked meanwhile would keep the writing end of another one
+    _start_lock = threading.Lock()
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._slots = BoundedSemaphore(maxsize) if maxsize else None
+        # writing end of the process
+        self._writer: Optional[Connection] = None
+        # the rest is used by the waiter only
+        self._readers: Dict[Connection, Process] = {}
+        self._completions: Dict[Connection, Completion] = {}
+        self._messages: Deque[Any] = deque()
+
+    def start(self, process: Process) -> None:
+        """
+        Starts ``process`` with own pipe.
+        """
+        reader, writer = Pipe(duplex=False)
+        with self._start_lock:
+            self._writer = writer
+            try:
+                process.start()
+            finally:
+                self._writer = None
+                # only the process keeps the writing end
+                writer.close()
+        self._readers[reader] = process
+
+    def put(self, msg: Any) -> None:
+        if isinstance(msg, Completion):
+            msg = _Exited(msg.exception)
+        elif self._slots:
+            self._slots.acquire()
+
+        try:
+            data = ForkingPickler.dumps(msg)
+        except Exception:
+            if self._slots and not isinstance(msg, _Exited):
+                self._slots.release()
+            raise
+        # the stop mustn't cut the message off
+        with _deferred_interrupt():
+            self._writer.send_bytes(data)  # type: ignore[union-attr]
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Returns the next message, :class:`Completion` with
+        :exc:`RuntimeError` for a killed process. Raises :exc:`queue.Empty`
+        after ``timeout``.
+        """
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        while not self._messages:
+            if timeout is not None:
+                timeout = max(deadline - time.monotonic(), 0)
+            ready = wait(list(self._readers), timeout)
+            if not ready:
+                raise queue.Empty
+            # one message of every ready process, so all of them progress
+            for reader in ready:
+                msg = self._recv(reader)  # type: ignore[arg-type]
+                if msg is not None:
+                    self._messages.append(msg)
+        return self._messages.popleft()
+
+    def _recv(self, reader: Connection) -> Any:
+        try:
+            data = reader.recv_bytes()
+        except (EOFError, OSError):
+            # the process exited, a message cut off by its death is dropped
+            return self._exit_completion(reader)
+
+        pid = self._readers[reader].pid
+        msg = _loads(data, _Exited, 'process {}'.format(pid))
+        if isinstance(msg, _Exited):
+            # the completion is returned on exit of the process, after its
+            # queues are flushed
+            self._completions[reader] = Completion(msg.exception)
+            return None
+        if self._slots:
+            self._slots.release()
+        return msg
+
+    def _exit_completion(self, reader: Connection) -> Completion:
+        process = self._readers.pop(reader)
+        reader.close()
+        completion = self._completions.pop(reader, None)
+        if completion is None:
+            process.join()
+            completion = Completion(
+                RuntimeError(
+                    'Process {} exited unexpectedly with code {}'.format(
+                        process.pid, process.exitcode
+                    )
+                )
+            )
+        return completion
+
+    def __getstate__(self):
+        # processes get only own writing end
+        state = dict(self.__dict__)
+        state.update(_readers={}, _completions={}, _messages=deque())
+        return state
+
+
+@contextmanager
+def _deferred_interrupt() -> Iterator[None]:
+    """
+    Delays ``SIGINT`` of the stop till the end of the block.
+    """
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT})
+    try:
+        yield
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGINT})
+
+
+class _EndOfChannel:
+    """
+    Marks the end of items in :class:`ProcessChannel`.
+    """
+
+
+class _ChannelError:
+    def __init__(self, exception: Exception) -> None:
+        self.exception = exception
+
+
+class ProcessChannel:
+    """
+    Delivers items of iterable to the processes through
+    :class:`multiprocessing.Queue`, which is filled lazily by a thread of the
+    parent process.
+    """
+
+    def __init__(self, iterable: Iterable, maxsize: int = 100) -> None:
+        self._q: Queue = Queue(maxsize=maxsize)
+        self._q.cancel_join_thread()
+        self._closed = threading.Event()
+        self._feeder = threading.Thread(
+            target=self._feed, args=(iter(iterable),), daemon=True
+        )
+        self._feeder.start()
+
+    def __iter__(self) -> Iterator:
+        while True:
+            item = self._q.get()
+            if item is _EndOfChannel:
+                # pass the marker to the next process
+                self._q.put(_EndOfChannel)
+                return
+            if isinstance(item, _ChannelError):
+                self._q.put(_EndOfChannel)
+                raise item.exception
+            yield item
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def _feed(self, it: Iterator) -> None:
+        try:
+            for item in it:
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(_ChannelError(e))
+        self._put(_EndOfChannel)
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._q.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+
+class SharedMemoryChannel:
+    """
+    Channel of binary data in shared memory.
+
+    Iteration over the channel yields :class:`memoryview` of received slot,
+    which is valid until the next item is requested.
+
+    :param slot_size: max size of data in bytes
+    :param slots: count of slots, limits count of data being in the channel
+        at the same time
+    :raises RuntimeError: when processes aren't started by ``fork``
+    """
+
+    def __init__(self, slot_size: int, slots: int = 8) -> None:
+        method = multiprocessing.get_start_method(allow_none=True)
+        if method is None:
+            # the default method, which isn't fixed before start of processes
+            method = multiprocessing.get_all_start_methods()[0]
+        if method != 'fork':
+            # anonymous memory is shared only with forked processes
+            raise RuntimeError(
+                'SharedMemoryChannel requires fork start method, '
+                'not {}'.format(method)
+            )
+
+        ctx = multiprocessing.get_context('fork')
+        self.slot_size = slot_size
+        self._buf = mmap.mmap(-1, slot_size * slots)
+        self._free: SimpleQueue = ctx.SimpleQueue()
+        self._ready: SimpleQueue = ctx.SimpleQueue()
+        for index in range(slots):
+            self._free.put(index)
+
+    def send(self, data) -> None:
+        """
+        Copies ``data`` (any bytes-like object) to a free slot and sends it.
+        """
+        view = memoryview(data).cast('B')
+        with self.reserve(view.nbytes) as slot:
+            slot[:] = view
+
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[memoryview]:
+        """
+        Reserves a free slot for filling in-place, the slot is sent on exit
+        from the context::
+
+            with channel.reserve(len(data)) as slot:
+                sock.recv_into(slot)
+        """
+        if size > self.slot_size:
+            raise ValueError(
+                'data size {} exceeds slot size {}'.format(size, self.slot_size)
+            )
+
+        index = self._free.get()
+        try:
+            yield self._slot(index, size)
+        except BaseException:
+            self._free.put(index)
+            raise
+
+        self._ready.put((index, size))
+
+    def close(self) -> None:
+        """
+        Marks the end of data in the channel.
+        """
+        self._ready.put(None)
+
+    def __iter__(self) -> Iterator[memoryview]:
+        while True:
+            msg = self._ready.get()
+            if msg is None:
+                # pass the marker to the next reader
+                self._ready.put(None)
+                return
+
+            index, size = msg
+            try:
+                yield self._slot(index, size)
+            finally:
+                self._free.put(index)
+
+    def _slot(self, index: int, size: int) -> memoryview:
+        offset = index * self.slot_size
+        return memoryview(self._buf)[offset:offset + size]
+
+    def __reduce__(self):
+        raise TypeError(
+            'SharedMemoryChannel is inherited by forked processes only'
+        )
 
 
 class ProcessWaiter(AbstractWaiter):
-    def __init__(self, fs: List[Process], result_q: Queue) -> None:
+    def __init__(
+        self,
+        fs: List[Any],
+        result_q: Union[ResultPipes, queue.Queue],
+        channel: Optional[ProcessChannel] = None,
+    ) -> None:
         self._fs = fs
         self._result_q = result_q
+        self._channel = channel
+        self._running = len(fs)
+        self._results: List[Any] = []
         self._exceptions: List[Exception] = []
 
     def __call__(
-        self, *, suppress_exceptions: bool = False, fail_hard: bool = False
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        keep_results: bool = True,
     ) -> None:
-        for _ in range(len(self._fs)):
-            exc = self._result_q.get()
-            if exc and fail_hard:
-                for f in self._fs:
-                    if f.pid:
-                        os.kill(f.pid, signal.SIGINT)
-                for f in self._fs:
-                    f.join()
-                raise exc
-            if exc:
-                self._exceptions.append(exc)
+        results = self.as_completed(
+            suppress_exceptions=suppress_exceptions,
+            fail_hard=fail_hard,
+            timeout=timeout,
+            deadline=deadline,
+        )
+        if keep_results:
+            self._results.extend(results)
+        else:
+            deque(results, maxlen=0)
+
+    def as_completed(
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator:
+        deadline = deadline_of(timeout, deadline)
+        while self._running:
+            msg = self._receive(deadline)
+            if self._observer is None and not isinstance(msg, Batch):
+                msgs: Sequence[Any] = (msg,)
+            else:
+                msgs = self._unpack(msg)
+
+            for msg in msgs:
+                if isinstance(msg, Completion):
+                    self._running -= 1
+                elif not isinstance(msg, ItemError):
+                    yield msg
+                    continue
+
+                exc = msg.exception
+                if exc and fail_hard:
+                    self._stop_hard()
+                    raise exc
+                if exc:
+                    self._exceptions.append(exc)
+
+        self._close_channel()
 
         if not suppress_exceptions and self.exceptions():
             raise UnhandledExceptions(self.exceptions())
 
+    def _receive(self, deadline: Optional[float]) -> Any:
+        try:
+            return self._result_q.get(timeout=time_left(deadline))
+        except (TimeoutError, queue.Empty):
+            # stragglers are stopped, their results are kept
+            error = deadline_error(self._running)
+            self.stop()
+            raise error
+
+    def results(self) -> Sequence[Any]:
+        return tuple(self._results)
+
     def stop(self) -> None:
         for f in self._fs:
-            if f.pid:
-                os.kill(f.pid, signal.SIGINT)
+            f.interrupt()
         self(suppress_exceptions=True)
 
     @lru_cache()
     def exceptions(self) -> Sequence[Exception]:
         return tuple(self._exceptions)
 
+    def _stop_hard(self) -> None:
+        for f in self._fs:
+            f.interrupt()
+        self._close_channel()
+        # processes may wait for free space in the queue
+        while self._running:
+            if isinstance(self._result_q.get(), Completion):
+                self._running -= 1
+
+    def _close_channel(self) -> None:
+        if self._channel:
+            self._channel.close()
+
+
+def call_with_alarm(fn: Callable, seconds: float, *args: Any) -> Any:
+    """
+    Calls ``fn`` in the main thread of a process and raises
+    :exc:`TimeoutError` in it by ``SIGALRM`` after ``seconds``.
+    """
+
+    def _on_alarm(signum, frame):
+        raise TimeoutError()
+
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def alarm_worker(fn: Callable, seconds: float) -> Callable:
+    worker = partial(call_with_alarm, fn, seconds)
+    setattr(worker, '__name__', getattr(fn, '__name__', repr(fn)))
+    return worker
+
 
 class ProcessEngine(AbstractEngine):
-    def __init__(self) -> None:
-        self._result_q: Queue = Queue()
+    """
+    :param channel_size: max count of items of :meth:`concurrently.map`
+        waiting for processes
+    :param result_size: max count of results waiting for the waiter,
+        processes block while the queue is full, ``None`` for unbounded
+    """
+
+    def __init__(
+        self, *, channel_size: int = 100, result_size: Optional[int] = None
+    ) -> None:
+        self._result_size = result_size or 0
+        self._result_q = ResultPipes(self._result_size)
+        self._channel: Optional[ProcessChannel] = None
+        self._channel_size = channel_size
+
+    def _init_call(self) -> None:
+        self._result_q = ResultPipes(self._result_size)
+        self._channel = None
 
     def create_task(self, fn: Callable[[], None]) -> Process:
         p = Process(target=fn, result_q=self._result_q)
-        p.start()
+        self._result_q.start(p)
         return p
 
     def waiter_factory(self, fs) -> ProcessWaiter:
-        return ProcessWaiter(fs, self._result_q)
+        return ProcessWaiter(fs, self._result_q, channel=self._channel)
+
+    def channel_factory(
+        self, iterable: Iterable
+    ) -> Union[ProcessChannel, SharedMemoryChannel]:
+        if isinstance(iterable, SharedMemoryChannel):
+            # processes read shared memory by themselves
+            return iterable
+
+        self._channel = ProcessChannel(iterable, self._channel_size)
+        return self._channel
+
+    def timeout_worker(self, fn: Callable, seconds: float) -> Callable:
+        return alarm_worker(fn, seconds)
+
+    def map_worker(self, fn, channel, limits=None, rate=None) -> Callable:
+        if rate:
+            # processes inherit the shared buckets on start
+            rate.share()
+        return super().map_worker(fn, channel, limits, rate)
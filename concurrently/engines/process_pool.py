@@ -0,0 +1,582 @@
+"""
+ProcessPoolEngine
+-----------------
+
+Runs code in warm processes of :class:`ProcessPool`, which saves start of
+processes on every call::
+
+    from concurrently import concurrently, ProcessPoolEngine
+
+    ...
+    def fetch_urls():  # must be defined at module level
+        ...
+
+    concurrently(2, engine=ProcessPoolEngine)(fetch_urls)()
+
+Functions are sent to the processes by :mod:`pickle`, so they must be defined
+at module level (or be :func:`functools.partial` of such functions), as well
+as their results and exceptions must be picklable.
+
+By default the engine uses a pool shared by the whole process, custom pool
+can be specified by the argument ``pool``::
+
+    pool = ProcessPool(4, start_method='spawn', preload=['numpy'])
+
+    concurrently(2, engine=ProcessPoolEngine, pool=pool)(fetch_urls)()
+
+.. note::
+
+    Unlike :class:`ThreadPool` the count of processes is fixed, so functions
+    over the count wait for a free process.
+
+Pools are shut down on exit of the interpreter, running functions are
+terminated.
+
+.. autoclass:: concurrently.ProcessPoolEngine
+.. autoclass:: concurrently.ProcessPool
+    :members: start, shutdown
+"""
+import atexit
+import importlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import pickletools
+import signal
+import threading
+import time
+import weakref
+from collections import deque
+from functools import partial
+from multiprocessing.connection import Connection, wait
+from multiprocessing.reduction import ForkingPickler
+from queue import Queue
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from concurrently.context import close_cached
+from concurrently.stealing import WorkStealing
+from . import AbstractEngine, Completion, ItemError, iter_results, map_item
+from .process import ProcessWaiter, alarm_worker
+
+if TYPE_CHECKING:
+    from concurrently.rate import RateLimit
+
+
+class ProcessPoolTask:
+    """
+    Function of :class:`ProcessPoolEngine` submitted to :class:`ProcessPool`.
+    """
+
+    def __init__(
+        self, pool: 'ProcessPool', task_id: int, fn: Callable, result_q: Queue
+    ) -> None:
+        self.id = task_id
+        # keeps alive objects referenced by the function, like channels
+        self.fn = fn
+        self.payload = pickle.dumps(fn, pickle.HIGHEST_PROTOCOL)
+        self.result_q = result_q
+        self.worker: Optional[_Worker] = None
+        self._pool = pool
+        self._done = threading.Event()
+
+    def interrupt(self) -> None:
+        self._pool._interrupt(self)
+
+    def join(self) -> None:
+        self._done.wait()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def finish(self, completion: Completion) -> None:
+        self.worker = None
+        self.result_q.put(completion)
+        self._done.set()
+
+
+class PoolChannel(Iterator):
+    """
+    Delivers items of iterable to the processes of :class:`ProcessPool`,
+    items are pulled lazily by request of process.
+    """
+
+    def __init__(self, channel_id: int, iterable: Iterable) -> None:
+        self.id = channel_id
+        self.rate: Optional['RateLimit'] = None
+        self._stealing: Optional[WorkStealing] = None
+        if isinstance(iterable, WorkStealing):
+            # iterators of workers are taken on their first requests
+            self._stealing = iterable
+            iterable = ()
+        self._it = iter(iterable)
+        self._worker_its: Dict[Any, Iterator] = {}
+
+    def __next__(self):
+        return next(self._it)
+
+    def next_for(self, worker: Any) -> Any:
+        """
+        Returns the next item requested by ``worker``.
+        """
+        if self._stealing is None:
+            return next(self._it)
+
+        # every worker has own partition of items
+        it = self._worker_its.get(worker)
+        if it is None:
+            it = self._worker_its[worker] = iter(self._stealing)
+        return next(it)
+
+    def __reduce__(self):
+        return _ChildChannel, (self.id,)
+
+
+class _Worker:
+    def __init__(
+        self, process: multiprocessing.Process, conn: Connection, cancel
+    ) -> None:
+        self.process = process
+        self.conn = conn
+        self.cancel = cancel
+        self.task: Optional[ProcessPoolTask] = None
+        self.tasks_done = 0
+        self.ready = False
+
+
+class ProcessPool:
+    """
+    Keeps warm processes for running functions of :class:`ProcessPoolEngine`.
+
+    Processes are started by :meth:`start` or on the first submitted
+    function.
+
+    :param processes: count of processes, by default count of CPUs
+    :param start_method: method to start processes, see
+        :func:`multiprocessing.get_context`
+    :param max_tasks_per_child: count of functions after that process is
+        replaced by a new one, ``None`` keeps processes forever
+    :param preload: names of modules to import in processes on start
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        *,
+        start_method: Optional[str] = None,
+        max_tasks_per_child: Optional[int] = None,
+        preload: Sequence[str] = (),
+    ) -> None:
+        # the default context fixes the start method, so it's resolved on
+        # start, not on import of the default pool
+        self._start_method = start_method
+        self._ctx: Any = None
+        self._size = processes or os.cpu_count() or 1
+        self._max_tasks = max_tasks_per_child
+        self._preload = tuple(preload)
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+        self._idle: Deque[_Worker] = deque()
+        self._backlog: Deque[ProcessPoolTask] = deque()
+        self._channels: 'weakref.WeakValueDictionary[int, PoolChannel]' = (
+            weakref.WeakValueDictionary()
+        )
+        self._ids = itertools.count()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closed = False
+        # the interpreter exits, processes aren't replaced anymore
+        self._exiting = False
+        _pools.add(self)
+
+    def start(self) -> None:
+        """
+        Starts processes of the pool.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('cannot start closed pool')
+            if self._dispatcher:
+                return
+
+            self._ctx = multiprocessing.get_context(self._start_method)
+            for _ in range(self._size):
+                self._workers.append(self._spawn())
+
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, daemon=True
+            )
+            self._dispatcher.start()
+
+    def submit(self, fn: Callable, result_q: Queue) -> ProcessPoolTask:
+        task = ProcessPoolTask(self, next(self._ids), fn, result_q)
+        self.start()
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('cannot submit to closed pool')
+            if self._idle:
+                self._assign(self._idle.popleft(), task)
+            else:
+                self._backlog.append(task)
+
+        return task
+
+    def channel(self, iterable: Iterable) -> PoolChannel:
+        with self._lock:
+            channel = PoolChannel(next(self._ids), iterable)
+            self._channels[channel.id] = channel
+        return channel
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops processes of the pool after completion of submitted functions.
+        """
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                self._idle.popleft().conn.send(None)
+            dispatcher = self._dispatcher
+
+        if wait and dispatcher:
+            dispatcher.join()
+
+    def _spawn(self) -> _Worker:
+        conn, child_conn = self._ctx.Pipe()
+        cancel = self._ctx.RawValue('q', -1)  # type: ignore[attr-defined]
+        inherited: List[Connection] = []
+        if self._ctx.get_start_method() == 'fork':
+            # the forked process gets ends of pipes of the parent, which
+            # keep them open after exit of the parent
+            inherited = [conn] + _parent_conns()
+        process = self._ctx.Process(  # type: ignore[attr-defined]
+            target=_work,
+            args=(
+                child_conn,
+                cancel,
+                self._preload,
+                self._max_tasks,
+                inherited,
+            ),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, conn, cancel)
+
+    def _assign(self, worker: _Worker, task: ProcessPoolTask) -> None:
+        worker.task = task
+        task.worker = worker
+        worker.conn.send(('run', task.id, task.payload))
+
+    def _release(self, worker: _Worker) -> None:
+        if self._max_tasks and worker.tasks_done >= self._max_tasks:
+            # the process exits by itself and will be replaced
+            return
+        if self._backlog:
+            self._assign(worker, self._backlog.popleft())
+        elif self._closed:
+            worker.conn.send(None)
+        else:
+            self._idle.append(worker)
+
+    def _interrupt(self, task: ProcessPoolTask) -> None:
+        with self._lock:
+            if task.done():
+                return
+            if task.worker:
+                task.worker.cancel.value = task.id
+                os.kill(task.worker.process.pid, signal.SIGINT)  # type: ignore
+            else:
+                self._backlog.remove(task)
+                task.finish(Completion())
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                workers = {w.conn: w for w in self._workers}
+            if not workers:
+                return
+
+            for conn in wait(list(workers)):
+                worker = workers[conn]  # type: ignore[index]
+                try:
+                    msg = _recv(worker)
+                except (EOFError, ConnectionResetError):
+                    self._on_exit(worker)
+                    continue
+
+                kind = msg[0]
+                if kind == 'result':
+                    worker.task.result_q.put(msg[1])  # type: ignore
+                elif kind == 'done':
+                    with self._lock:
+                        task, worker.task = worker.task, None
+                        task.finish(Completion(msg[1]))  # type: ignore
+                        worker.tasks_done += 1
+                        self._release(worker)
+                elif kind == 'next':
+                    self._send_item(worker, msg[1])
+                elif kind == 'ready':
+                    with self._lock:
+                        worker.ready = True
+                        self._release(worker)
+
+    def _send_item(self, worker: _Worker, channel_id: int) -> None:
+        channel = self._channels.get(channel_id)
+        try:
+            if channel is None:
+                raise StopIteration
+            item = channel.next_for(worker)
+            delay = 0.0
+            if channel.rate:
+                # the process sleeps till its token, the dispatcher doesn't
+                delay = channel.rate.reserve(channel.rate.key_of(item))
+            reply: tuple = ('item', item, delay)
+        except StopIteration:
+            reply = ('end',)
+        except Exception as e:
+            reply = ('error', e)
+
+        try:
+            worker.conn.send(reply)
+        except Exception as e:
+            worker.conn.send(('error', e))
+
+    def _on_exit(self, worker: _Worker) -> None:
+        worker.process.join()
+        worker.conn.close()
+
+        with self._lock:
+            self._workers.remove(worker)
+            if worker in self._idle:
+                self._idle.remove(worker)
+
+            task, worker.task = worker.task, None
+            if task:
+                task.finish(
+                    Completion(
+                        RuntimeError(
+                            'Process {} exited unexpectedly with code {}'.format(
+                                worker.process.pid, worker.process.exitcode
+                            )
+                        )
+                    )
+                )
+
+            if self._exiting or (self._closed and not self._backlog):
+                return
+
+        replacement = self._spawn()
+        with self._lock:
+            self._workers.append(replacement)
+
+
+def _recv(worker: _Worker) -> tuple:
+    """
+    Returns message of ``worker``, a message which can't be unpickled in the
+    parent is replaced by error of its result or function.
+    """
+    buf = worker.conn.recv_bytes()
+    try:
+        return ForkingPickler.loads(buf)
+    except Exception as e:
+        error = RuntimeError(
+            'Message of process {} can not be unpickled: {!r}'.format(
+                worker.process.pid, e
+            )
+        )
+        # the kind is the first string of the message, which is read
+        # without unpickling of objects
+        kind = next(
+            arg for _, arg, _ in pickletools.genops(buf) if isinstance(arg, str)
+        )
+        if kind == 'done':
+            return ('done', error)
+        return ('result', ItemError(error))
+
+
+_pools: 'weakref.WeakSet[ProcessPool]' = weakref.WeakSet()
+
+
+def _parent_conns() -> List[Connection]:
+    return [w.conn for pool in list(_pools) for w in list(pool._workers)]
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    for pool in list(_pools):
+        pool._exiting = True
+        pool.shutdown(wait=False)
+
+
+class ProcessPoolEngine(AbstractEngine):
+    """
+    :param pool: custom pool instead of shared one
+    """
+
+    _default_pool: Optional[ProcessPool] = None
+    _lock = threading.Lock()
+
+    def __init__(self, pool: Optional[ProcessPool] = None) -> None:
+        self._pool = pool or self._shared_pool()
+        self._result_q: Queue = Queue()
+
+    def start(self) -> None:
+        self._pool.start()
+
+    @classmethod
+    def _shared_pool(cls) -> ProcessPool:
+        with cls._lock:
+            if cls._default_pool is None:
+                cls._default_pool = ProcessPool()
+            return cls._default_pool
+
+    def _init_call(self) -> None:
+        self._result_q = Queue()
+
+    def create_task(self, fn: Callable[[], None]) -> ProcessPoolTask:
+        return self._pool.submit(fn, self._result_q)
+
+    def waiter_factory(self, fs) -> ProcessWaiter:
+        return ProcessWaiter(fs, self._result_q)
+
+    def channel_factory(self, iterable: Iterable) -> PoolChannel:
+        return self._pool.channel(iterable)
+
+    def timeout_worker(self, fn: Callable, seconds: float) -> Callable:
+        return alarm_worker(fn, seconds)
+
+    def map_worker(
+        self, fn: Callable[[Any], Any], channel, limits=None, rate=None
+    ) -> Callable:
+        channel.rate = rate
+        return partial(_map_items, fn, channel)
+
+
+def _map_items(fn: Callable[[Any], Any], channel: Iterable) -> Iterator:
+    for item in channel:
+        yield map_item(fn, item)
+
+
+# code below runs in processes of the pool
+
+
+class _WorkerState:
+    conn: Connection
+    cancel: Any
+    task_id: Optional[int] = None
+    io = False
+    interrupted = False
+
+
+_state = _WorkerState()
+
+
+def _work(
+    conn: Connection,
+    cancel,
+    preload: Sequence[str],
+    max_tasks: Optional[int],
+    inherited: Sequence[Connection],
+) -> None:
+    # the process must see the end of own pipe on exit of the parent
+    for parent_conn in inherited:
+        parent_conn.close()
+
+    for name in preload:
+        importlib.import_module(name)
+
+    _state.conn = conn
+    _state.cancel = cancel
+    signal.signal(signal.SIGINT, _on_interrupt)
+    conn.send(('ready',))
+
+    try:
+        for _ in itertools.count() if max_tasks is None else range(max_tasks):
+            msg = conn.recv()
+            if msg is None:
+                return
+
+            _, task_id, payload = msg
+            exc = _run(task_id, payload)
+            try:
+                conn.send(('done', exc))
+            except Exception:
+                conn.send(('done', RuntimeError(repr(exc))))
+    finally:
+        # resources kept by WorkerContext live till exit of the process
+        close_cached()
+
+
+def _run(task_id: int, payload: bytes) -> Optional[Exception]:
+    exc = None
+    try:
+        try:
+            _state.task_id = task_id
+            fn = pickle.loads(payload)
+            for result in iter_results(fn()):
+                _io(_state.conn.send, ('result', result))
+        except Exception as e:
+            exc = e
+        finally:
+            _state.task_id = None
+    except KeyboardInterrupt:
+        _state.task_id = None
+
+    _state.interrupted = False
+    return exc
+
+
+def _on_interrupt(signum, frame) -> None:
+    if _state.task_id is None or _state.cancel.value != _state.task_id:
+        return
+    if _state.io:
+        # don't break the pipe in the middle of message
+        _state.interrupted = True
+        return
+    raise KeyboardInterrupt
+
+
+def _io(fn: Callable, *a) -> Any:
+    _state.io = True
+    try:
+        return fn(*a)
+    finally:
+        _state.io = False
+        if _state.interrupted and _state.task_id is not None:
+            _state.interrupted = False
+            raise KeyboardInterrupt
+
+
+def _request(msg) -> Any:
+    _state.conn.send(msg)
+    return _state.conn.recv()
+
+
+class _ChildChannel:
+    def __init__(self, channel_id: int) -> None:
+        self._id = channel_id
+
+    def __iter__(self) -> Iterator:
+        while True:
+            msg = _io(_request, ('next', self._id))
+            if msg[0] == 'end':
+                return
+            if msg[0] == 'error':
+                raise msg[1]
+
+            _, item, delay = msg
+            if delay:
+                time.sleep(delay)
+            yield item
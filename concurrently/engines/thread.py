@@ -14,58 +14,513 @@ Runs code in system threads::
     fetch_urls()  # not await
 
 .. autoclass:: concurrently.ThreadEngine
+
+The stop of functions raises :exc:`KeyboardInterrupt` in all threads at once
+and then waits for their completion. Functions can also check
+:class:`CancelToken` for finishing work by themselves::
+
+    @concurrently(2, engine=ThreadEngine, stop_timeout=5)
+    def poll_queue():
+        token = CancelToken.current()
+        while not token.cancelled:
+            ...
+
+.. autoclass:: concurrently.CancelToken
+    :members: current, cancelled, wait
+
+With the GIL threads suit I/O-bound code. Free-threaded CPython (3.13t and
+later) runs threads in parallel, so CPU-bound functions scale by cores
+without pickling of :class:`ProcessEngine`. Results and completions of
+threads pass the waiter through a single :class:`Buffer`, which wakes the
+consumer only when it waits. :func:`concurrently.aux.gil_enabled` tells
+whether the runtime has the GIL::
+
+    from concurrently.aux import gil_enabled
+
+    engine = ProcessEngine if gil_enabled() else ThreadEngine
+
+    @concurrently(os.cpu_count(), engine=engine)
+    def render_tiles():
+        ...
+
+
+ThreadPoolEngine
+----------------
+
+Runs code in reusable threads of :class:`ThreadPool`, which saves creation of
+threads on every call::
+
+    from concurrently import concurrently, ThreadPoolEngine
+
+    ...
+    @concurrently(2, engine=ThreadPoolEngine)
+    def fetch_urls():  # not async def
+        ...
+
+    fetch_urls()  # not await
+
+By default the engine uses a pool shared by the whole process, custom pool
+can be specified by the argument ``pool`` (also supported by
+:class:`ThreadEngine`)::
+
+    pool = ThreadPool(idle_timeout=10)
+
+    @concurrently(2, engine=ThreadPoolEngine, pool=pool)
+    ...
+
+.. autoclass:: concurrently.ThreadPoolEngine
+.. autoclass:: concurrently.ThreadPool
+    :members: shutdown
 """
+import contextvars
+import heapq
+import itertools
+import logging
 import threading
-from functools import lru_cache
-from queue import Queue
-from typing import Callable, List, Sequence
+import time
+from collections import deque
+from contextlib import suppress
+from functools import lru_cache, partial
+from queue import Empty, Queue
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from concurrently.aux import clear_thread_exception, raise_in_thread
+from concurrently.buffer import Buffer
+from concurrently.stealing import WorkStealing
+from . import (
+    DEADLINE_GRACE,
+    AbstractEngine,
+    AbstractWaiter,
+    Batch,
+    Channel,
+    Completion,
+    ItemError,
+    UnhandledExceptions,
+    deadline_error,
+    deadline_of,
+    iter_results,
+    time_left,
+)
+
+logger = logging.getLogger(__name__)
 
-from concurrently.aux import kill_thread
-from . import AbstractEngine, AbstractWaiter, UnhandledExceptions
 
+class CancelToken:
+    """
+    Cooperative cancellation of function of :class:`ThreadEngine`. The token
+    is cancelled by stop of the function, so the function can finish its work
+    by itself::
 
-class Thread(threading.Thread):
-    def __init__(self, *a, result_q: Queue, **kw) -> None:
-        super().__init__(*a, **kw)
+        @concurrently(2, engine=ThreadEngine)
+        def poll_queue():
+            token = CancelToken.current()
+            while not token.cancelled:
+                ...
+                token.wait(5)  # unlike time.sleep() is interrupted by stop
+
+    Note that the stop still raises :exc:`KeyboardInterrupt` in the function
+    as soon as the thread runs Python code.
+    """
+
+    _local = threading.local()
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    @classmethod
+    def current(cls) -> 'CancelToken':
+        """
+        Returns token of the function running in the current thread.
+        """
+        return getattr(cls._local, 'token', None) or cls()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until cancellation or ``timeout``, returns ``True`` when the
+        token is cancelled.
+        """
+        return self._event.wait(timeout)
+
+
+class Task:
+    """
+    Function of :class:`ThreadEngine` running in own thread or in a thread of
+    :class:`ThreadPool`.
+    """
+
+    def __init__(self, fn: Callable, result_q: Buffer) -> None:
+        self.token = CancelToken()
+        self._fn = fn
+        # the function sees context variables of its caller, like asyncio
+        # tasks do
+        self._context = contextvars.copy_context()
         self._result_q = result_q
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
 
     def run(self) -> None:
+        self._context.run(self._run)
+
+    def _run(self) -> None:
+        completion = Completion()
         try:
-            super().run()
-        except Exception as e:
-            self._result_q.put(e)
+            try:
+                self._begin()
+                for result in iter_results(self._fn()):
+                    self._result_q.put(result)
+            except Exception as e:
+                completion = Completion(e)
+            finally:
+                self._end()
         except KeyboardInterrupt:
-            self._result_q.put(None)
-        else:
-            self._result_q.put(None)
+            # killed before the task closed itself for killing
+            self._end()
+
+        self._result_q.push(completion)
+        self._done.set()
+
+    def kill(self) -> None:
+        """
+        Cancels the token and raises :exc:`KeyboardInterrupt` in the running
+        function, doesn't wait for its completion.
+        """
+        with self._lock:
+            if self.token.cancelled:
+                return
+            self.token.cancel()
+            if self._thread and self._thread.ident:
+                raise_in_thread(self._thread.ident, KeyboardInterrupt)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _begin(self) -> None:
+        with self._lock:
+            if self.token.cancelled:
+                raise KeyboardInterrupt
+            self._thread = threading.current_thread()
+            CancelToken._local.token = self.token
+
+    def _end(self) -> None:
+        with self._lock:
+            if not self._thread:
+                return
+            thread, self._thread = self._thread, None
+            CancelToken._local.token = None
+            # the thread must not receive exception intended for the task
+            if self.token.cancelled and thread.ident:
+                clear_thread_exception(thread.ident)
+
+
+def cancel_tasks(tasks: Sequence[Task], timeout: Optional[float]) -> None:
+    """
+    Kills all ``tasks`` at once and then waits for their completion, raises
+    :exc:`TimeoutError` when tasks are still running after ``timeout``.
+    """
+    for task in tasks:
+        task.kill()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for task in tasks:
+        left = None
+        if deadline is not None:
+            left = max(0.0, deadline - time.monotonic())
+        if not task.join(left):
+            running = sum(not t.done() for t in tasks)
+            raise TimeoutError(
+                '{} threads are still running after {} seconds'.format(
+                    running, timeout
+                )
+            )
+
+
+class Timers:
+    """
+    Calls functions at their deadlines from a single thread, which keeps the
+    deadlines in a heap.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[list] = []
+        self._cancelled = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay: float, fn: Callable[[], None]) -> list:
+        """
+        Calls ``fn`` after ``delay`` seconds, returns entry for
+        :meth:`cancel`.
+        """
+        entry = [time.monotonic() + delay, next(self._seq), fn]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            elif self._heap[0] is entry:
+                self._cond.notify()
+        return entry
+
+    def cancel(self, entry: list) -> None:
+        with self._cond:
+            if entry[2] is None:
+                return
+            # cancelled entries leave the heap at their deadlines
+            entry[2] = None
+            self._cancelled += 1
+            if self._cancelled > len(self._heap) // 2:
+                self._heap = [e for e in self._heap if e[2] is not None]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                fn = self._next()
+            # the thread serves all later deadlines
+            try:
+                fn()
+            except Exception:
+                logger.exception('Timer function %r failed', fn)
+
+    def _next(self) -> Callable[[], None]:
+        while True:
+            if not self._heap:
+                self._cond.wait()
+                continue
+            entry = self._heap[0]
+            if entry[2] is None:
+                heapq.heappop(self._heap)
+                self._cancelled -= 1
+                continue
+            delay = entry[0] - time.monotonic()
+            if delay > 0:
+                self._cond.wait(delay)
+                continue
+            heapq.heappop(self._heap)
+            fn, entry[2] = entry[2], None
+            return fn
+
+
+_timers = Timers()
+
+
+class _TimedCall:
+    def __init__(self) -> None:
+        self.ident = threading.get_ident()
+        self.lock = threading.Lock()
+        self.done = False
+        self.expired = False
+
+    def expire(self) -> None:
+        with self.lock:
+            if not self.done:
+                self.expired = True
+                raise_in_thread(self.ident, TimeoutError)
+
+    def finish(self) -> None:
+        with self.lock:
+            self.done = True
+            if self.expired:
+                # the function returned before the exception was raised
+                clear_thread_exception(self.ident)
+
+
+def call_with_timeout(fn: Callable, seconds: float, *args: Any) -> Any:
+    """
+    Calls ``fn`` and raises :exc:`TimeoutError` in it after ``seconds``, the
+    timeout is kept by the shared :class:`Timers`.
+    """
+    call = _TimedCall()
+    entry = _timers.schedule(seconds, call.expire)
+    try:
+        return fn(*args)
+    finally:
+        call.finish()
+        _timers.cancel(entry)
+
+
+class ThreadPool:
+    """
+    Keeps threads for running functions of :class:`ThreadEngine`.
+
+    The pool starts a new thread only when all its threads are busy, so
+    every submitted function runs immediately.
+
+    :param idle_timeout: seconds after that unused thread exits, ``None``
+        keeps threads forever
+    """
+
+    def __init__(self, idle_timeout: Optional[float] = 60.0) -> None:
+        self._idle_timeout = idle_timeout
+        self._tasks: Queue = Queue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._idle = 0
+        self._closed = False
+
+    def submit(self, fn: Callable, result_q: Buffer) -> Task:
+        task = Task(fn, result_q)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('cannot submit to closed pool')
+            if self._idle:
+                self._idle -= 1
+            else:
+                self._size += 1
+                threading.Thread(target=self._work, daemon=True).start()
+        self._tasks.put(task)
+        return task
+
+    def shutdown(self) -> None:
+        """
+        Stops all threads of the pool after completion of submitted functions.
+        """
+        with self._lock:
+            self._closed = True
+            for _ in range(self._size):
+                self._tasks.put(None)
+
+    def _work(self) -> None:
+        while True:
+            try:
+                task = self._tasks.get(timeout=self._idle_timeout)
+            except Empty:
+                with self._lock:
+                    if not self._idle:
+                        # the thread is reserved for submitted task
+                        continue
+                    self._idle -= 1
+                    self._size -= 1
+                    return
+
+            if task is None:
+                return
+
+            task.run()
+
+            with self._lock:
+                self._idle += 1
 
 
 class ThreadWaiter(AbstractWaiter):
-    def __init__(self, fs: List[Thread], result_q: Queue) -> None:
+    def __init__(
+        self,
+        fs: List[Task],
+        result_q: Buffer,
+        stop_timeout: Optional[float] = None,
+    ) -> None:
         self._fs = fs
         self._result_q = result_q
+        self._stop_timeout = stop_timeout
+        self._running = len(fs)
+        self._results: List[Any] = []
         self._exceptions: List[Exception] = []
+        self._expired = False
 
     def __call__(
-        self, *, suppress_exceptions: bool = False, fail_hard: bool = False
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        keep_results: bool = True,
     ) -> None:
-        for _ in range(len(self._fs)):
-            exc = self._result_q.get()
-            if exc and fail_hard:
-                for f in self._fs:
-                    kill_thread(f)
-                for f in self._fs:
-                    f.join()
-                raise exc
-            if exc:
-                self._exceptions.append(exc)
+        results = self.as_completed(
+            suppress_exceptions=suppress_exceptions,
+            fail_hard=fail_hard,
+            timeout=timeout,
+            deadline=deadline,
+        )
+        if keep_results:
+            self._results.extend(results)
+        else:
+            deque(results, maxlen=0)
+
+    def as_completed(
+        self,
+        *,
+        suppress_exceptions: bool = False,
+        fail_hard: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator:
+        deadline = deadline_of(timeout, deadline)
+        while self._running:
+            msg = self._receive(deadline)
+            if self._observer is None and not isinstance(msg, Batch):
+                msgs: Sequence[Any] = (msg,)
+            else:
+                msgs = self._unpack(msg)
+
+            for msg in msgs:
+                if isinstance(msg, Completion):
+                    self._running -= 1
+                elif not isinstance(msg, ItemError):
+                    yield msg
+                    continue
+
+                exc = msg.exception
+                if exc and fail_hard:
+                    self._running = 0
+                    self._result_q.release()
+                    cancel_tasks(self._fs, self._stop_timeout)
+                    raise exc
+                if exc:
+                    self._exceptions.append(exc)
 
         if not suppress_exceptions and self.exceptions():
             raise UnhandledExceptions(self.exceptions())
 
+    def _receive(self, deadline: Optional[float]) -> Any:
+        try:
+            return self._result_q.get(timeout=time_left(deadline))
+        except TimeoutError:
+            error = deadline_error(self._running)
+            if not self._expired:
+                self._expired = True
+                self._stop_expired()
+            raise error
+
+    def _stop_expired(self) -> None:
+        """
+        Stops stragglers at the deadline and keeps results of the ones
+        stopped within :data:`DEADLINE_GRACE`.
+        """
+        self._result_q.release()
+        for task in self._fs:
+            task.kill()
+        with suppress(TimeoutError):
+            self(suppress_exceptions=True, timeout=DEADLINE_GRACE)
+
+    def results(self) -> Sequence[Any]:
+        return tuple(self._results)
+
     def stop(self) -> None:
-        for f in self._fs:
-            kill_thread(f)
+        self._result_q.release()
+        cancel_tasks(self._fs, self._stop_timeout)
         self(suppress_exceptions=True)
 
     @lru_cache()
@@ -74,13 +529,93 @@ class ThreadWaiter(AbstractWaiter):
 
 
 class ThreadEngine(AbstractEngine):
-    def __init__(self) -> None:
-        self._result_q: Queue = Queue()
+    """
+    :param pool: run functions in threads of the pool instead of new threads
+    :param stop_timeout: max seconds to wait for functions on stop, after
+        that the stop raises :exc:`TimeoutError`
+    :param result_buffer: bounded :class:`Buffer` for results
+    """
+
+    def __init__(
+        self,
+        pool: Optional[ThreadPool] = None,
+        *,
+        stop_timeout: Optional[float] = None,
+        result_buffer: Optional[Buffer] = None,
+    ) -> None:
+        if result_buffer is None:
+            result_buffer = Buffer()
+        self._result_q = result_buffer
+        self._pool = pool
+        self._owned_pool: Optional[ThreadPool] = None
+        self._stop_timeout = stop_timeout
+
+    def start(self) -> None:
+        # calls of the instance reuse threads
+        if self._pool is None:
+            self._pool = self._owned_pool = ThreadPool()
 
-    def create_task(self, fn: Callable[[], None]) -> Thread:
-        tr = Thread(target=fn, result_q=self._result_q)
-        tr.start()
-        return tr
+    def close(self) -> None:
+        super().close()
+        if self._owned_pool:
+            self._owned_pool.shutdown()
+
+    def _init_call(self) -> None:
+        self._result_q = Buffer(self._result_q.high, self._result_q.low)
+
+    def create_task(self, fn: Callable[[], None]) -> Task:
+        if self._pool:
+            return self._pool.submit(fn, self._result_q)
+
+        task = Task(fn, self._result_q)
+        threading.Thread(target=task.run).start()
+        return task
 
     def waiter_factory(self, fs) -> ThreadWaiter:
-        return ThreadWaiter(fs, result_q=self._result_q)
+        return ThreadWaiter(
+            fs, result_q=self._result_q, stop_timeout=self._stop_timeout
+        )
+
+    def sleep(self, seconds: float) -> None:
+        # the stop doesn't wait for the end of sleep
+        CancelToken.current().wait(seconds)
+
+    def channel_factory(
+        self, iterable: Iterable
+    ) -> Union[Channel, WorkStealing]:
+        if isinstance(iterable, WorkStealing):
+            # workers take items of own partitions without the shared lock
+            return iterable
+        return Channel(iterable, threading.Lock())
+
+    def condition_factory(self) -> threading.Condition:
+        return threading.Condition()
+
+    def timeout_worker(self, fn: Callable, seconds: float) -> Callable:
+        worker = partial(call_with_timeout, fn, seconds)
+        setattr(worker, '__name__', getattr(fn, '__name__', repr(fn)))
+        return worker
+
+
+class ThreadPoolEngine(ThreadEngine):
+    """
+    :param pool: custom pool instead of shared one
+    :param stop_timeout: max seconds to wait for functions on stop, after
+        that the stop raises :exc:`TimeoutError`
+    :param result_buffer: bounded :class:`Buffer` for results
+    """
+
+    _default_pool = ThreadPool()
+
+    def __init__(
+        self,
+        pool: Optional[ThreadPool] = None,
+        *,
+        stop_timeout: Optional[float] = None,
+        result_buffer: Optional[Buffer] = None,
+    ) -> None:
+        super().__init__(
+            pool=pool or self._default_pool,
+            stop_timeout=stop_timeout,
+            result_buffer=result_buffer,
+        )
@@ -0,0 +1,324 @@
+"""
+Events of concurrent functions and their metrics::
+
+    metrics = Metrics()
+
+    @concurrently(4, observer=metrics)
+    def fetch():
+        ...
+
+    fetch()
+    metrics['fetch'].finished
+    metrics['fetch'].latency.quantile(0.99)
+    metrics.exposition()  # Prometheus text format
+
+Workers report events next to results, so the observer is called by the
+waiter while results are consumed, in processes as well. Functions without
+observer aren't wrapped and have no overhead.
+
+Workers of :meth:`concurrently.map` report every item, lengths of queues are
+added as gauges::
+
+    items = Buffer(high=1000)
+    metrics.gauge('buffered_items', lambda: len(items), 'Waiting items.')
+    waiter = concurrently.map(process, items, 8, observer=metrics)
+    ...
+    metrics['process'].item_latency.quantile(0.99)
+"""
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from concurrently.engines import TaskEvent
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = (
+    'application/openmetrics-text; version=1.0.0; charset=utf-8'
+)
+
+
+class Observer:
+    """
+    Receiver of events of concurrent functions, methods are called by the
+    waiter. Every :class:`TaskEvent` has ``name`` of the function, its
+    ``started`` time by :func:`time.monotonic` and ``duration`` in seconds.
+    """
+
+    def on_event(self, event: TaskEvent) -> None:
+        getattr(self, 'on_' + event.kind)(event)
+
+    def on_start(self, event: TaskEvent) -> None:
+        pass
+
+    def on_finish(self, event: TaskEvent) -> None:
+        pass
+
+    def on_error(self, event: TaskEvent) -> None:
+        """
+        The function raised ``event.exception``.
+        """
+
+    def on_cancel(self, event: TaskEvent) -> None:
+        """
+        The function was interrupted by ``stop()``.
+        """
+
+    def on_item(self, event: TaskEvent) -> None:
+        """
+        The map worker took ``event.duration`` for an item, ``exception`` of
+        failed one is set.
+        """
+
+    def on_result(self, result: Any) -> None:
+        """
+        The waiter got a result.
+        """
+
+
+class Histogram:
+    """
+    Log-linear histogram of durations like HDR histogram: every power of
+    two of microseconds is split to ``2 ** precision`` buckets, so quantiles
+    are within ``1 / 2 ** precision`` of real values.
+    """
+
+    def __init__(self, precision: int = 3) -> None:
+        self._bits = precision
+        self._counts = [0] * (64 << precision)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        value = int(seconds * 1e6) if seconds > 0 else 0
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns upper bound of seconds of ``q`` part of durations.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self._upper(index) / 1e6, self.max)
+        return self.max
+
+    def cumulative(self, bounds: List[float]) -> Iterator[Tuple[float, int]]:
+        """
+        Yields ascending ``bounds`` of seconds with count of durations below.
+        """
+        seen = 0
+        index = 0
+        for bound in bounds:
+            limit = bound * 1e6
+            while index < len(self._counts) and self._upper(index) <= limit:
+                seen += self._counts[index]
+                index += 1
+            yield bound, seen
+
+    def _index(self, value: int) -> int:
+        sub = 1 << self._bits
+        if value < sub:
+            return value
+        shift = min(value.bit_length(), 63) - self._bits - 1
+        return ((shift + 1) << self._bits) + (value >> shift) - sub
+
+    def _upper(self, index: int) -> int:
+        sub = 1 << self._bits
+        if index < sub:
+            return index + 1
+        shift = (index >> self._bits) - 1
+        return (sub + (index & (sub - 1)) + 1) << shift
+
+
+class Counters:
+    """
+    Counts of events of a function.
+    """
+
+    def __init__(self, precision: int = 3) -> None:
+        self.started = 0
+        self.finished = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.latency = Histogram(precision)
+        self.items = 0
+        self.failed_items = 0
+        self.item_latency = Histogram(precision)
+
+    @property
+    def running(self) -> int:
+        return self.started - self.finished - self.failed - self.cancelled
+
+
+# powers of four from 1us to ~18min
+_BUCKETS = [4 ** i / 1e6 for i in range(16)]
+
+# attributes of Counters by families of metrics
+_FAMILIES = [
+    ('started', 'started', 'counter', 'Started functions.'),
+    ('finished', 'finished', 'counter', 'Finished functions.'),
+    ('failed', 'failed', 'counter', 'Functions failed by exception.'),
+    ('cancelled', 'cancelled', 'counter', 'Functions interrupted by stop.'),
+    ('items', 'items', 'counter', 'Items processed by map workers.'),
+    ('failed_items', 'failed_items', 'counter', 'Items failed by exception.'),
+    ('running', 'running', 'gauge', 'Running functions.'),
+    (
+        'latency',
+        'duration_seconds',
+        'histogram',
+        'Durations of finished and failed functions.',
+    ),
+    (
+        'item_latency',
+        'item_duration_seconds',
+        'histogram',
+        'Durations of items of map workers.',
+    ),
+]
+
+
+class Metrics(Observer):
+    """
+    Collects counters and latency histograms of functions by their names.
+
+    :param prefix: prefix of names of metrics in :meth:`exposition`
+    :param precision: see :class:`Histogram`
+    """
+
+    def __init__(self, prefix: str = 'concurrently', precision: int = 3):
+        self.prefix = prefix
+        self.results = 0
+        self._precision = precision
+        self._functions: Dict[str, Counters] = {}
+        self._gauges: Dict[str, Tuple[Callable[[], float], str]] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Counters:
+        return self._functions[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._functions))
+
+    def on_start(self, event: TaskEvent) -> None:
+        with self._lock:
+            self._counters(event.name).started += 1
+
+    def on_finish(self, event: TaskEvent) -> None:
+        with self._lock:
+            counters = self._counters(event.name)
+            counters.finished += 1
+            counters.latency.record(event.duration)
+
+    def on_error(self, event: TaskEvent) -> None:
+        with self._lock:
+            counters = self._counters(event.name)
+            counters.failed += 1
+            counters.latency.record(event.duration)
+
+    def on_cancel(self, event: TaskEvent) -> None:
+        with self._lock:
+            self._counters(event.name).cancelled += 1
+
+    def on_item(self, event: TaskEvent) -> None:
+        with self._lock:
+            counters = self._counters(event.name)
+            counters.items += 1
+            if event.exception is not None:
+                counters.failed_items += 1
+            counters.item_latency.record(event.duration)
+
+    def on_result(self, result: Any) -> None:
+        with self._lock:
+            self.results += 1
+
+    def gauge(
+        self, name: str, fn: Callable[[], float], doc: str = ''
+    ) -> None:
+        """
+        Adds gauge ``name`` with value of ``fn()`` at :meth:`exposition`,
+        e.g. length of :class:`Buffer` of items or results.
+        """
+        with self._lock:
+            self._gauges[name] = (fn, doc or name)
+
+    def exposition(self, openmetrics: bool = False) -> str:
+        """
+        Returns metrics in Prometheus text format or OpenMetrics, see
+        ``CONTENT_TYPE`` and ``OPENMETRICS_CONTENT_TYPE``.
+        """
+        lines: List[str] = []
+
+        def _family(name: str, kind: str, doc: str) -> str:
+            family = metric = '{}_{}'.format(self.prefix, name)
+            if kind == 'counter':
+                # OpenMetrics names families of counters without suffix
+                metric += '_total'
+                if not openmetrics:
+                    family = metric
+            lines.append('# HELP {} {}'.format(family, doc))
+            lines.append('# TYPE {} {}'.format(family, kind))
+            return metric
+
+        with self._lock:
+            functions = sorted(self._functions.items())
+            results = self.results
+
+            for attr, family, kind, doc in _FAMILIES:
+                metric = _family(family, kind, doc)
+                for name, counters in functions:
+                    value = getattr(counters, attr)
+                    if kind == 'histogram':
+                        lines.extend(_histogram(metric, value, name))
+                    else:
+                        lines.append(_sample(metric, value, name))
+
+            gauges = sorted(self._gauges.items())
+
+        metric = _family('results', 'counter', 'Results got by waiters.')
+        lines.append('{} {}'.format(metric, results))
+
+        for name, (fn, doc) in gauges:
+            metric = _family(name, 'gauge', doc)
+            lines.append('{} {}'.format(metric, fn()))
+
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def _counters(self, name: str) -> Counters:
+        counters = self._functions.get(name)
+        if counters is None:
+            counters = Counters(self._precision)
+            self._functions[name] = counters
+        return counters
+
+
+def _histogram(metric: str, latency: Histogram, function: str) -> List[str]:
+    lines = [
+        _sample(metric + '_bucket', count, function, repr(bound))
+        for bound, count in latency.cumulative(_BUCKETS)
+    ]
+    lines.append(_sample(metric + '_bucket', latency.count, function, '+Inf'))
+    lines.append(_sample(metric + '_sum', latency.sum, function))
+    lines.append(_sample(metric + '_count', latency.count, function))
+    return lines
+
+
+def _sample(
+    metric: str, value: Any, function: str, le: Optional[str] = None
+) -> str:
+    labels = 'function="{}"'.format(
+        function.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    )
+    if le is not None:
+        labels += ',le="{}"'.format(le)
+    return '{}{{{}}} {}'.format(metric, labels, value)
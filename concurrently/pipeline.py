@@ -0,0 +1,362 @@
+import inspect
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from concurrently._concurrently import EngineSpec, concurrently
+from concurrently.buffer import Buffer
+from concurrently.engines import AbstractWaiter
+
+
+class Stage(NamedTuple):
+    fn: Callable[[Any], Any]
+    concurrency: int
+    engine: Optional[EngineSpec]
+    map_kw: Dict[str, Any]
+
+    @property
+    def name(self) -> str:
+        return getattr(self.fn, '__name__', repr(self.fn))
+
+
+class StageStats(NamedTuple):
+    """
+    Throughput of a stage of :class:`Pipeline`.
+    """
+
+    name: str
+    concurrency: int
+    # count of results passed to the next stage
+    results: int
+    # seconds from the start till the end of the stage or till now
+    seconds: float
+    # results per second
+    rate: float
+    # count of items waiting for the stage
+    backlog: int
+    # seconds the stage waited for the next one to take its results
+    stalled: float
+
+
+class Pipeline:
+    """
+    Chain of stages, every stage is :meth:`concurrently.map` of results of the
+    previous one with own concurrency and engine::
+
+        pipeline = (
+            Pipeline(urls)
+            .stage(fetch, 50, engine=AsyncIOEngine)
+            .stage(parse, 4, engine=AsyncIOProcessEngine)
+            .stage(store, 1, engine=AsyncIOThreadEngine, chunks=100)
+        )
+        waiter = pipeline.start()
+        await waiter()
+
+    Stages are connected by bounded :class:`Buffer`, so a slow stage holds
+    back previous ones instead of piling up their results. The end of items
+    passes from stage to stage. The first error of a stage stops all stages
+    and is raised by the waiter.
+
+    Engines of stages are either all async (:class:`AsyncIOEngine`,
+    :class:`AsyncIOThreadEngine`, :class:`AsyncIOProcessEngine`), then the
+    pipeline is started in a running event loop and its waiter is awaited,
+    or all regular ones. :class:`GeventEngine` requires monkey patching of
+    :mod:`threading` like :class:`Buffer`.
+
+    :param iterable: items of the first stage, async iterable for async
+        pipeline
+    :param buffer_size: max count of results of a stage waiting for the next
+        stage
+    """
+
+    def __init__(self, iterable: Any, *, buffer_size: int = 100) -> None:
+        self.iterable = iterable
+        self.buffer_size = buffer_size
+        self.stages: List[Stage] = []
+
+    def stage(
+        self,
+        fn: Callable[[Any], Any],
+        concurrency: int = 1,
+        *,
+        engine: Optional[EngineSpec] = None,
+        **map_kw
+    ) -> 'Pipeline':
+        """
+        Adds stage which calls ``fn`` for results of the previous stage,
+        ``map_kw`` are options of :meth:`concurrently.map`.
+        """
+        self.stages.append(Stage(fn, concurrency, engine, map_kw))
+        return self
+
+    def start(self) -> 'PipelineWaiter':
+        """
+        Starts all stages, returns waiter of the pipeline, which is
+        :class:`AsyncPipelineWaiter` for async engines.
+        """
+        assert self.stages, 'Pipeline must have stages'
+
+        source = _Source(self.iterable)
+        items: Any = source.items()
+        runs: List[_StageRun] = []
+        try:
+            for stage in self.stages:
+                waiter = concurrently.map(
+                    stage.fn,
+                    items,
+                    stage.concurrency,
+                    engine=stage.engine,
+                    **stage.map_kw
+                )
+                run = _StageRun(
+                    stage, waiter, items if runs else None, self.buffer_size
+                )
+                runs.append(run)
+                items = run.output
+
+            modes = {_is_async(run.waiter) for run in runs}
+            if len(modes) > 1:
+                raise ValueError(
+                    'Pipeline can not combine async and regular engines'
+                )
+        except BaseException:
+            _abort(runs, source)
+            raise
+
+        waiter_cls = AsyncPipelineWaiter if modes.pop() else PipelineWaiter
+        return waiter_cls(runs, source)
+
+
+class _Source:
+    """
+    Items of the first stage, which end on abort of the pipeline.
+    """
+
+    def __init__(self, iterable: Any) -> None:
+        self.iterable = iterable
+        self.aborted = False
+
+    def items(self) -> Any:
+        if hasattr(self.iterable, '__aiter__'):
+            return self._aitems()
+        return self._items()
+
+    def _items(self) -> Iterator:
+        for item in self.iterable:
+            if self.aborted:
+                return
+            yield item
+
+    async def _aitems(self) -> AsyncIterator:
+        async for item in self.iterable:
+            if self.aborted:
+                return
+            yield item
+
+
+class _StageRun:
+    def __init__(
+        self,
+        stage: Stage,
+        waiter: AbstractWaiter,
+        input: Optional[Buffer],
+        buffer_size: int,
+    ) -> None:
+        self.stage = stage
+        self.waiter = waiter
+        self.input = input
+        self.output = Buffer(buffer_size)
+        self.results = 0
+        self.stalled = 0.0
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def stats(self) -> StageStats:
+        seconds = (self.finished or time.monotonic()) - self.started
+        return StageStats(
+            name=self.stage.name,
+            concurrency=self.stage.concurrency,
+            results=self.results,
+            seconds=seconds,
+            rate=self.results / seconds if seconds else 0.0,
+            backlog=len(self.input) if self.input is not None else 0,
+            stalled=self.stalled,
+        )
+
+
+class PipelineWaiter:
+    """
+    Controls running :class:`Pipeline`, results of the last stage are
+    returned like by waiters of :func:`concurrently`.
+    """
+
+    def __init__(self, runs: List[_StageRun], source: '_Source') -> None:
+        self._runs = runs
+        self._source = source
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+        self._lock = threading.Lock()
+        self._results: List[Any] = []
+        self._start()
+
+    def __call__(self, *, keep_results: bool = True) -> None:
+        """
+        Blocks until the end of all stages, raises the first error of them.
+
+        :param keep_results: collect results for :meth:`results`, ``False``
+            drops them
+        """
+        if keep_results:
+            self._results.extend(self.as_completed())
+        else:
+            deque(self.as_completed(), maxlen=0)
+
+    def as_completed(self) -> Iterator:
+        """
+        Returns iterator over results of the last stage.
+        """
+        yield from self._runs[-1].output
+        self._join()
+        if self._error is not None:
+            raise self._error
+
+    def results(self) -> Sequence[Any]:
+        return tuple(self._results)
+
+    def stop(self) -> None:
+        """
+        Stops taking items, stages end after their current items.
+        """
+        self._abort(None)
+        for _ in self.as_completed():
+            pass
+
+    def stats(self) -> List[StageStats]:
+        """
+        Returns :class:`StageStats` of every stage. A stage is slow when the
+        previous one is ``stalled`` and its ``backlog`` is full.
+        """
+        return [run.stats() for run in self._runs]
+
+    def _start(self) -> None:
+        self._threads = [
+            threading.Thread(target=self._forward, args=(run,), daemon=True)
+            for run in self._runs
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _forward(self, run: _StageRun) -> None:
+        try:
+            results = run.waiter.as_completed(fail_hard=True)
+            for result in results:  # type: ignore[union-attr]
+                if self._aborted:
+                    continue
+                started = time.monotonic()
+                run.output.put(result)
+                run.stalled += time.monotonic() - started
+                run.results += 1
+        except BaseException as e:
+            self._abort(e)
+        finally:
+            run.finished = time.monotonic()
+            run.output.close()
+
+    def _abort(self, error: Optional[BaseException]) -> None:
+        with self._lock:
+            if self._aborted:
+                return
+            self._aborted = True
+            self._error = error
+        _abort(self._runs, self._source)
+
+
+class AsyncPipelineWaiter(PipelineWaiter):
+    """
+    Waiter of :class:`Pipeline` of async engines.
+    """
+
+    async def __call__(  # type: ignore[override]
+        self, *, keep_results: bool = True
+    ) -> None:
+        async for result in self.as_completed():
+            if keep_results:
+                self._results.append(result)
+
+    async def as_completed(self) -> AsyncIterator:  # type: ignore[override]
+        async for result in self._runs[-1].output:
+            yield result
+        await self._join_async()
+        if self._error is not None:
+            raise self._error
+
+    async def stop(self) -> None:  # type: ignore[override]
+        self._abort(None)
+        async for _ in self.as_completed():
+            pass
+
+    def _start(self) -> None:
+        import asyncio
+
+        self._tasks = [
+            asyncio.ensure_future(self._forward_async(run))
+            for run in self._runs
+        ]
+
+    async def _join_async(self) -> None:
+        for task in self._tasks:
+            await task
+
+    async def _forward_async(self, run: _StageRun) -> None:
+        try:
+            async for result in run.waiter.as_completed(  # type: ignore
+                fail_hard=True
+            ):
+                if self._aborted:
+                    continue
+                started = time.monotonic()
+                await run.output.put_async(result)
+                run.stalled += time.monotonic() - started
+                run.results += 1
+        except BaseException as e:
+            self._abort(e)
+        finally:
+            run.finished = time.monotonic()
+            run.output.close()
+
+
+def _is_async(waiter: AbstractWaiter) -> bool:
+    return inspect.iscoroutinefunction(waiter.__call__)
+
+
+def _abort(runs: List[_StageRun], source: _Source) -> None:
+    """
+    Ends items of all stages, so workers exit after their current items.
+    """
+    source.aborted = True
+    if runs:
+        # results of the last stage may be not consumed
+        runs[-1].output.release()
+    for run in runs:
+        if run.input is None:
+            continue
+        run.input.release()
+        run.input.close()
+        # items left in the closed buffer are dropped
+        for _ in run.input:
+            pass
@@ -0,0 +1,141 @@
+import heapq
+import itertools
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from concurrently.buffer import Buffer
+
+
+class PriorityBuffer(Buffer):
+    """
+    :class:`Buffer` which passes items to workers by priority, the lowest
+    ``priority`` first and items of the same priority in order of arrival::
+
+        jobs = PriorityBuffer(high=1000)
+        waiter = concurrently.map(run_job, jobs, 8, engine=ThreadEngine)
+        for job in batch_jobs:
+            jobs.put(job, priority=10)
+        jobs.put(interactive_job)  # taken before waiting batch jobs
+        ...
+        jobs.close()
+        waiter()
+
+    With ``weights`` priorities are classes served by weighted round-robin:
+    every class with waiting items gets a share of items proportional to
+    its weight, so items of low priority aren't starved::
+
+        # 8 interactive jobs per batch job while both are waiting
+        jobs = PriorityBuffer(weights={0: 8, 10: 1})
+
+    Like :class:`Buffer` it's accepted as items of :meth:`concurrently.map`
+    by :class:`ThreadEngine`, :class:`AsyncIOEngine` and
+    :class:`AsyncIOThreadEngine`. :class:`GeventEngine` requires monkey
+    patching of :mod:`threading` by :mod:`gevent.monkey`, otherwise a
+    greenlet waiting for items or free space blocks all greenlets.
+
+    :param high: max count of items, ``None`` for unbounded buffer
+    :param low: count of items to continue blocked producers,
+        ``high // 2`` by default
+    :param weights: weights of priorities, missing priorities have weight 1
+    """
+
+    def __init__(
+        self,
+        high: Optional[int] = None,
+        low: Optional[int] = None,
+        *,
+        weights: Optional[Dict[Any, int]] = None
+    ) -> None:
+        super().__init__(high, low)
+        if weights:
+            assert all(w > 0 for w in weights.values()), (
+                'PriorityBuffer weights must be positive'
+            )
+            self._items = _WeightedItems(weights)  # type: ignore[assignment]
+        else:
+            self._items = _HeapItems()  # type: ignore[assignment]
+
+    def put(self, item: Any, priority: Any = 0) -> None:
+        """
+        Adds ``item`` with ``priority``, blocks while the buffer is full.
+        """
+        super().put((priority, item))
+
+    async def put_async(self, item: Any, priority: Any = 0) -> None:
+        await super().put_async((priority, item))
+
+    def push(self, item: Any, priority: Any = 0) -> None:
+        """
+        Adds ``item`` with ``priority`` ignoring the limit.
+        """
+        super().push((priority, item))
+
+
+class _HeapItems:
+    """
+    Items ordered by priority, the counter keeps order of arrival of equal
+    priorities and never compares items.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[Any, int, Any]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def append(self, entry: Tuple[Any, Any]) -> None:
+        priority, item = entry
+        heapq.heappush(self._heap, (priority, next(self._counter), item))
+
+    def popleft(self) -> Any:
+        return heapq.heappop(self._heap)[-1]
+
+
+class _WeightedItems:
+    """
+    FIFO queues of priorities served by smooth weighted round-robin.
+    """
+
+    def __init__(self, weights: Dict[Any, int]) -> None:
+        self._weights = dict(weights)
+        # only priorities with items, so idle ones don't save credit
+        self._queues: Dict[Any, Deque] = {}
+        self._credits: Dict[Any, int] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, entry: Tuple[Any, Any]) -> None:
+        priority, item = entry
+        queue = self._queues.get(priority)
+        if queue is None:
+            queue = self._queues[priority] = deque()
+            self._credits[priority] = 0
+        queue.append(item)
+        self._count += 1
+
+    def popleft(self) -> Any:
+        if not self._count:
+            raise IndexError('pop from empty buffer')
+
+        total = 0
+        chosen = None
+        # ties are taken by the lowest priority
+        for priority in sorted(self._queues):
+            weight = self._weights.get(priority, 1)
+            self._credits[priority] += weight
+            total += weight
+            credit = self._credits[priority]
+            if chosen is None or credit > self._credits[chosen]:
+                chosen = priority
+        self._credits[chosen] -= total
+
+        queue = self._queues[chosen]
+        item = queue.popleft()
+        if not queue:
+            del self._queues[chosen]
+            del self._credits[chosen]
+        self._count -= 1
+        return item
@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class RateLimit:
+    """
+    Token bucket limit of rate of items processed by
+    :meth:`concurrently.map`::
+
+        per_host = RateLimit(10, burst=5, key=lambda url: urlparse(url).netloc)
+        waiter = concurrently.map(fetch_url, urls, 20, rate=per_host)
+
+    Every item takes a token from the bucket before ``fn`` is called, the
+    bucket holds up to ``burst`` tokens and is refilled by ``rate`` tokens per
+    ``period`` seconds. With ``key`` every key of items has its own bucket.
+
+    Tokens are reserved in order of requests, so a worker knows the time of
+    its token at once and just sleeps till it, asyncio tasks sleep by
+    :func:`asyncio.sleep`. Processes of :class:`ProcessEngine` share buckets
+    in shared memory, :class:`ProcessPoolEngine` reserves tokens in the parent
+    process.
+
+    The limit can be used by concurrent functions directly too::
+
+        @concurrently(10)
+        async def crawler():
+            while True:
+                url = await queue.get()
+                await per_host.wait_async(urlparse(url).netloc)
+                ...
+
+    :param rate: count of tokens per ``period``
+    :param period: period in seconds
+    :param burst: capacity of bucket
+    :param key: function which returns key of bucket for item
+    :param keys: max count of keys shared by processes
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        period: float = 1.0,
+        *,
+        burst: int = 1,
+        key: Optional[Callable[[Any], Hashable]] = None,
+        keys: int = 1024,
+    ) -> None:
+        assert rate > 0 and period > 0, 'RateLimit must be positive'
+        assert burst >= 1, 'RateLimit burst must be at least 1'
+        self.rate = rate
+        self.period = period
+        self.burst = burst
+        self.key = key
+        self.keys = keys
+        self._interval = period / rate
+        self._lock: Any = threading.Lock()
+        # theoretical arrival time of the next token by key
+        self._tat: Dict[Hashable, float] = {}
+        self._shared: Optional[_SharedTable] = None
+
+    def key_of(self, item: Any) -> Hashable:
+        """
+        Returns key of bucket for ``item``.
+        """
+        return self.key(item) if self.key else None
+
+    def reserve(self, key: Hashable = None) -> float:
+        """
+        Takes a token from the bucket of ``key``, returns count of seconds to
+        wait for the token.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._shared:
+                index = self._shared.index(key)
+                tat = max(self._shared.tats[index], now)
+                self._shared.tats[index] = tat + self._interval
+            else:
+                tat = max(self._tat.get(key, now), now)
+                self._tat[key] = tat + self._interval
+
+        return max(0.0, tat - (self.burst - 1) * self._interval - now)
+
+    def wait(self, key: Hashable = None) -> None:
+        """
+        Blocks until a token of ``key`` is available.
+        """
+        delay = self.reserve(key)
+        if delay:
+            time.sleep(delay)
+
+    async def wait_async(self, key: Hashable = None) -> None:
+        import asyncio
+
+        delay = self.reserve(key)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def share(self) -> None:
+        """
+        Moves buckets to shared memory, so processes forked after the call
+        share the limit with the current process.
+        """
+        import multiprocessing
+
+        with self._lock:
+            if self._shared:
+                return
+            self._shared = _SharedTable(self.keys)
+            for key, tat in self._tat.items():
+                self._shared.tats[self._shared.index(key)] = tat
+            self._tat.clear()
+            self._lock = multiprocessing.Lock()
+
+
+class _SharedTable:
+    """
+    Hash table of buckets in shared memory with open addressing.
+    """
+
+    def __init__(self, size: int) -> None:
+        import multiprocessing
+
+        self.size = size
+        self.hashes = multiprocessing.RawArray('q', size)
+        self.tats = multiprocessing.RawArray('d', size)
+
+    def index(self, key: Hashable) -> int:
+        # zero marks an empty slot
+        h = hash(key) or 1
+        for i in range(self.size):
+            index = (h + i) % self.size
+            if self.hashes[index] == h:
+                return index
+            if not self.hashes[index]:
+                self.hashes[index] = h
+                return index
+
+        raise RuntimeError(
+            'RateLimit has more than {} keys'.format(self.size)
+        )
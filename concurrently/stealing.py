@@ -0,0 +1,74 @@
+import itertools
+import math
+from collections import deque
+from typing import Any, Deque, Iterable, Iterator, List
+
+
+class WorkStealing:
+    """
+    Items of :meth:`concurrently.map` split into partitions. Every worker
+    takes items of own partition, and when it's empty, steals items from the
+    end of the largest partition::
+
+        jobs = WorkStealing.partition(jobs, 8)
+        concurrently.map(run_job, jobs, 8, engine=ThreadEngine)()
+
+    Workers don't share a lock like the default channel of the map, and long
+    jobs of one partition are completed by all workers. Partitions are filled
+    on creation, so items can't be endless.
+
+    Supported by :class:`ThreadEngine`, :class:`ThreadPoolEngine` and
+    :class:`ProcessPoolEngine`.
+
+    :param partitions: iterables of items, the n-th worker owns the n-th
+        partition, extra workers share partitions from the first one
+    """
+
+    def __init__(self, partitions: Iterable[Iterable]) -> None:
+        self._deques: List[Deque] = [deque(p) for p in partitions]
+        assert self._deques, 'WorkStealing must have partitions'
+        self._workers = itertools.count()
+
+    @classmethod
+    def partition(cls, items: Iterable, parts: int) -> 'WorkStealing':
+        """
+        Splits ``items`` into ``parts`` contiguous partitions of equal size.
+        """
+        items = list(items)
+        size = math.ceil(len(items) / parts) or 1
+        return cls(items[i * size:(i + 1) * size] for i in range(parts))
+
+    def __len__(self) -> int:
+        return sum(len(d) for d in self._deques)
+
+    def __iter__(self) -> Iterator:
+        """
+        Returns iterator of the next worker.
+        """
+        index = next(self._workers) % len(self._deques)
+        return self._work(self._deques[index])
+
+    def _work(self, own: Deque) -> Iterator:
+        # operations of deque are atomic, so they need no locks
+        while True:
+            try:
+                item = own.popleft()
+            except IndexError:
+                item = self._steal()
+                if item is _EMPTY:
+                    return
+            yield item
+
+    def _steal(self) -> Any:
+        while True:
+            victim = max(self._deques, key=len)
+            if not victim:
+                return _EMPTY
+            try:
+                return victim.pop()
+            except IndexError:
+                # taken by the owner or another thief
+                continue
+
+
+_EMPTY = object()
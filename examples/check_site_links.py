@@ -7,7 +7,12 @@ from contextlib import ExitStack
 import aiohttp
 from lxml import etree
 
-from concurrently import concurrently
+from concurrently import (
+    AsyncIOProcessEngine,
+    RateLimit,
+    WorkerContext,
+    concurrently,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +32,31 @@ parser.add_argument(
     default=10,
     help='Number of multiple requests to make at a time (default: 10)',
 )
+parser.add_argument(
+    '-r',
+    '--rate',
+    metavar='RPS',
+    type=float,
+    default=None,
+    help='Max number of requests per second (default: unlimited)',
+)
+parser.add_argument(
+    '-p',
+    '--processes',
+    metavar='COUNT',
+    type=int,
+    default=None,
+    help='Parse pages in processes, concurrency is split between them '
+    '(default: in the current process)',
+)
 
 
-async def _parse_page_related_urls(url, base_url, session):
+async def _parse_page_related_urls(url, base_url, session, rate):
     log = logger.getChild(url)
 
+    if rate:
+        await rate.wait_async()
+
     log.debug('Start parsing')
     async with session.get(url) as resp:
         log.info(
@@ -58,37 +83,83 @@ async def _parse_page_related_urls(url, base_url, session):
             yield next_url
 
 
-async def amain(base_url, concurrency):
+async def amain(base_url, concurrency, rate):
+    rate = RateLimit(rate) if rate else None
     pages = {base_url}
 
     pending_pages = asyncio.Queue()
     for page in pages:
         await pending_pages.put(page)
 
-    @concurrently(concurrency)
+    sessions = WorkerContext(aiohttp.ClientSession)
+
+    @concurrently(concurrency, context=sessions)
     async def _page_parser():
-        async with aiohttp.ClientSession() as session:
-            while True:
-                with ExitStack() as stack:
-                    url = await pending_pages.get()
-                    stack.callback(pending_pages.task_done)
+        session = sessions.get()
+        while True:
+            with ExitStack() as stack:
+                url = await pending_pages.get()
+                stack.callback(pending_pages.task_done)
 
-                    async for next_url in _parse_page_related_urls(
-                        url, base_url, session
-                    ):
-                        if next_url in pages:
-                            continue
+                async for next_url in _parse_page_related_urls(
+                    url, base_url, session, rate
+                ):
+                    if next_url in pages:
+                        continue
 
-                        pages.add(next_url)
-                        await pending_pages.put(next_url)
+                    pages.add(next_url)
+                    await pending_pages.put(next_url)
 
     await pending_pages.join()
     await _page_parser.stop()
 
 
+async def amain_processes(base_url, concurrency, rate, processes):
+    rate = RateLimit(rate) if rate else None
+    pages = {base_url}
+    sessions = WorkerContext(aiohttp.ClientSession)
+
+    async def _page_urls(url):
+        return [
+            next_url
+            async for next_url in _parse_page_related_urls(
+                url, base_url, sessions.get(), None
+            )
+        ]
+
+    # pages are crawled by levels, every level is parsed by all processes
+    level = [base_url]
+    while level:
+        waiter = concurrently.map(
+            _page_urls,
+            level,
+            concurrency,
+            engine=AsyncIOProcessEngine,
+            processes=processes,
+            rate=rate,
+            context=sessions,
+        )
+        level = []
+        async for next_urls in waiter.as_completed():
+            for next_url in next_urls:
+                if next_url not in pages:
+                    pages.add(next_url)
+                    level.append(next_url)
+
+
 def main(arguments):
+    if arguments.processes:
+        coro = amain_processes(
+            arguments.base_url,
+            arguments.concurrency,
+            arguments.rate,
+            arguments.processes,
+        )
+    else:
+        coro = amain(arguments.base_url, arguments.concurrency, arguments.rate)
+
     loop = asyncio.get_event_loop()
-    loop.run_until_complete(amain(arguments.base_url, arguments.concurrency))
+    loop.run_until_complete(coro)
 
 
 if __name__ == '__main__':
@@ -1,9 +1,11 @@
 import asyncio
 import time
+from functools import partial
 
 import pytest  # type: ignore
 
 from concurrently import AsyncIOEngine, UnhandledExceptions, concurrently
+from concurrently.engines import unwrap_partial
 
 from . import EngineTest, paramz_conc_count, paramz_data_count
 
@@ -14,6 +16,7 @@ async def process(data):
 
 
 class TestAsyncIOEngine(EngineTest):
+
     @pytest.mark.asyncio(forbid_global_loop=True)
     @paramz_conc_count
     @paramz_data_count
@@ -122,6 +125,62 @@ class TestAsyncIOEngine(EngineTest):
         assert len(results) == 1
         assert results[0]
 
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_map(self):
+        results = {}
+        start_time = time.monotonic()
+
+        async def _process(d):
+            results[d] = await process(0.1)
+
+        waiter = concurrently.map(_process, range(4), 2, engine=AsyncIOEngine)
+        await waiter()
+
+        assert sorted(results) == [0, 1, 2, 3]
+        assert 0.2 <= time.monotonic() - start_time < 0.3
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_map_async_iterable(self):
+        results = []
+
+        async def _gen():
+            for d in range(4):
+                await asyncio.sleep(0)
+                yield d
+
+        async def _process(d):
+            results.append(d)
+
+        await concurrently.map(_process, _gen(), 2, engine=AsyncIOEngine)()
+
+        assert sorted(results) == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_as_completed(self):
+        @concurrently(2, engine=AsyncIOEngine)
+        async def _parallel():
+            for d in range(2):
+                await asyncio.sleep(0.5)
+                yield d
+
+        start_time = time.monotonic()
+        results = []
+        async for d in _parallel.as_completed():
+            results.append((d, time.monotonic() - start_time))
+
+        assert sorted(d for d, _ in results) == [0, 0, 1, 1]
+        assert all(0.5 <= t < 0.9 for d, t in results if d == 0)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_results(self):
+        async def _double(d):
+            return d * 2
+
+        waiter = concurrently.map(_double, range(4), 2, engine=AsyncIOEngine)
+        await waiter()
+
+        assert sorted(waiter.results()) == [0, 2, 4, 6]
+
     @pytest.mark.asyncio(forbid_global_loop=True)
     async def test_decorated_fn_is_coroutine(self):
         with pytest.raises(AssertionError) as e:
@@ -134,3 +193,63 @@ class TestAsyncIOEngine(EngineTest):
             str(e.value)
             == 'Decorated function `_no_coroutine` must be coroutine'
         )
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_partial(self):
+        async def _multiply(factor, d):
+            return factor * d
+
+        async def _repeat(count, d):
+            for _ in range(count):
+                yield d
+
+        # inspect doesn't see through partial before Python 3.8
+        assert unwrap_partial(partial(partial(_repeat, 2), 1)) is _repeat
+
+        waiter = concurrently.map(
+            partial(_multiply, 2), range(4), 2, engine=AsyncIOEngine
+        )
+        await waiter()
+
+        assert sorted(waiter.results()) == [0, 2, 4, 6]
+
+        waiter = concurrently(2, engine=AsyncIOEngine)(partial(_repeat, 2, 1))
+        await waiter()
+
+        assert waiter.results() == (1, 1, 1, 1)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_timeout(self):
+        waiter = concurrently.map(process, [0.1, 1], 2, engine=AsyncIOEngine)
+
+        with pytest.raises(TimeoutError):
+            await waiter(timeout=0.5)
+
+        assert len(waiter.results()) == 1
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_item_timeout(self):
+        waiter = concurrently.map(
+            process, [0, 1, 0], 1, engine=AsyncIOEngine, item_timeout=0.2
+        )
+
+        with pytest.raises(UnhandledExceptions) as e:
+            await waiter()
+
+        assert type(e.value.exceptions[0]) is TimeoutError
+        # the worker goes on with next items
+        assert len(waiter.results()) == 2
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_shared_instance(self):
+        async def _double(d):
+            await asyncio.sleep(0.01)
+            return d * 2
+
+        engine = AsyncIOEngine()
+        first = concurrently.map(_double, range(5), 2, engine=engine)
+        second = concurrently.map(_double, range(5, 10), 2, engine=engine)
+        await asyncio.gather(first(), second())
+
+        assert sorted(first.results()) == [0, 2, 4, 6, 8]
+        assert sorted(second.results()) == [10, 12, 14, 16, 18]
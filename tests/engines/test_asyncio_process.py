@@ -0,0 +1,198 @@
+import asyncio
+import os
+import signal
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOProcessEngine,
+    Limits,
+    UnhandledExceptions,
+    concurrently,
+)
+
+from . import EngineTest, paramz_conc_count
+
+
+class TestAsyncIOProcessEngine(EngineTest):
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    @paramz_conc_count
+    async def test_concurrently(self, conc_count):
+        start_time = time.monotonic()
+
+        @concurrently(conc_count, engine=AsyncIOProcessEngine, processes=2)
+        async def _parallel():
+            await asyncio.sleep(0.5)
+            return os.getpid()
+
+        await _parallel()
+
+        assert time.monotonic() - start_time < 1.5
+        pids = _parallel.results()
+        assert len(pids) == conc_count
+        # coroutines are spread over the processes evenly
+        assert len(set(pids)) == min(conc_count, 2)
+        assert os.getpid() not in pids
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_stop(self):
+        @concurrently(4, engine=AsyncIOProcessEngine, processes=2)
+        async def _parallel():
+            yield 1
+            await asyncio.sleep(10)
+            yield 2
+
+        await asyncio.sleep(0.5)
+        start_time = time.monotonic()
+        await _parallel.stop()
+
+        assert time.monotonic() - start_time < 1
+        assert _parallel.results() == (1, 1, 1, 1)
+        assert _parallel.exceptions() == ()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_exception(self):
+        @concurrently(4, engine=AsyncIOProcessEngine, processes=2)
+        async def _parallel():
+            raise RuntimeError()
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            await _parallel()
+
+        assert len(exc.value.exceptions) == 4
+        assert all(isinstance(e, RuntimeError) for e in exc.value.exceptions)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_exception_suppress(self):
+        @concurrently(2, engine=AsyncIOProcessEngine, processes=2)
+        async def _parallel():
+            raise RuntimeError()
+
+        await _parallel(suppress_exceptions=True)
+
+        exc_list = _parallel.exceptions()
+        assert len(exc_list) == 2
+        assert all(isinstance(e, RuntimeError) for e in exc_list)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_fail_hard(self):
+        waiter = concurrently.map(
+            _fail_on_one, range(10), 4, engine=AsyncIOProcessEngine
+        )
+
+        start_time = time.monotonic()
+        with pytest.raises(RuntimeError):
+            await waiter(fail_hard=True)
+
+        assert time.monotonic() - start_time < 2
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_map(self):
+        waiter = concurrently.map(
+            _square, range(10), 4, engine=AsyncIOProcessEngine, processes=2
+        )
+        await waiter()
+
+        assert sorted(waiter.results()) == [d * d for d in range(10)]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_map_adaptive(self):
+        with pytest.raises(ValueError):
+            concurrently.map(
+                _square,
+                range(10),
+                engine=AsyncIOProcessEngine,
+                adaptive=Limits(max=4),
+            )
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_as_completed(self):
+        # processes start at once
+        start_time = time.monotonic()
+
+        @concurrently(2, engine=AsyncIOProcessEngine, processes=2)
+        async def _parallel():
+            for d in range(2):
+                await asyncio.sleep(0.5)
+                yield d
+
+        results = []
+        async for d in _parallel.as_completed():
+            results.append((d, time.monotonic() - start_time))
+
+        assert sorted(d for d, _ in results) == [0, 0, 1, 1]
+        assert all(0.5 <= t < 1.5 for d, t in results if d == 0)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_timeout(self):
+        async def _block(d):
+            time.sleep(d)  # blocks the event loop of the process
+            return d
+
+        waiter = concurrently.map(
+            _block, [0, 3], 2, engine=AsyncIOProcessEngine, processes=2
+        )
+
+        start_time = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await waiter(timeout=0.5)
+
+        # the waiter doesn't wait for the blocked process
+        assert time.monotonic() - start_time < 1.5
+        assert waiter.results() == (0,)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_killed_process(self):
+        @concurrently(2, engine=AsyncIOProcessEngine, processes=2)
+        async def _parallel():
+            os.kill(os.getpid(), signal.SIGKILL)
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            await _parallel()
+
+        assert all(isinstance(e, RuntimeError) for e in exc.value.exceptions)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_unpicklable_exception(self):
+        @concurrently(2, engine=AsyncIOProcessEngine, processes=2)
+        async def _parallel():
+            raise PairError(1, 2)
+
+        waiter = concurrently.map(
+            _fail_unpicklable, range(4), 2, engine=AsyncIOProcessEngine
+        )
+
+        # exceptions which can't be unpickled in the parent are reported
+        with pytest.raises(UnhandledExceptions) as exc:
+            await asyncio.wait_for(_parallel(), 5)
+        await asyncio.wait_for(waiter(suppress_exceptions=True), 5)
+
+        assert len(exc.value.exceptions) == 2
+        assert all(isinstance(e, RuntimeError) for e in exc.value.exceptions)
+        assert sorted(waiter.results()) == [0, 2]
+        assert len(waiter.exceptions()) == 2
+
+
+class PairError(Exception):
+    # pickled by its single argument, it can't be unpickled
+    def __init__(self, a, b):
+        super().__init__(a)
+        self.b = b
+
+
+async def _fail_unpicklable(d):
+    if d % 2:
+        raise PairError(d, d)
+    return d
+
+
+async def _square(d):
+    await asyncio.sleep(0.01)
+    return d * d
+
+
+async def _fail_on_one(d):
+    if d == 1:
+        raise RuntimeError()
+    await asyncio.sleep(10)
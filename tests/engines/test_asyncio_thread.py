@@ -1,5 +1,8 @@
 import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from queue import Queue
 
 import pytest  # type: ignore
@@ -15,6 +18,7 @@ def process(data):
 
 
 class TestAsyncIOThreadEngine(EngineTest):
+
     @pytest.mark.asyncio(forbid_global_loop=True)
     @paramz_conc_count
     @paramz_data_count
@@ -130,6 +134,44 @@ class TestAsyncIOThreadEngine(EngineTest):
         assert len(results) == 1
         assert results[0]
 
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_map(self):
+        q_results = Queue()
+
+        def _process(d):
+            q_results.put({d: process(0.1)})
+
+        waiter = concurrently.map(
+            _process, range(4), 2, engine=AsyncIOThreadEngine
+        )
+        await waiter()
+
+        results = {}
+        while not q_results.empty():
+            results.update(q_results.get())
+
+        assert sorted(results) == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_as_completed(self):
+        @concurrently(2, engine=AsyncIOThreadEngine)
+        def _parallel():
+            for d in range(2):
+                yield d
+
+        results = [d async for d in _parallel.as_completed()]
+
+        assert sorted(results) == [0, 0, 1, 1]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_results(self):
+        waiter = concurrently.map(
+            lambda d: d * 2, range(4), 2, engine=AsyncIOThreadEngine
+        )
+        await waiter()
+
+        assert sorted(waiter.results()) == [0, 2, 4, 6]
+
     @pytest.mark.asyncio(forbid_global_loop=True)
     async def test_decorated_fn_is_not_coroutine(self):
         with pytest.raises(AssertionError) as e:
@@ -142,3 +184,96 @@ class TestAsyncIOThreadEngine(EngineTest):
             str(e.value)
             == 'Decorated function `_coroutine` must be regular not a coroutine'
         )
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_concurrency_over_default_pool(self):
+        # every function waits for all others
+        barrier = threading.Barrier(64, timeout=5)
+
+        @concurrently(64, engine=AsyncIOThreadEngine)
+        def _parallel():
+            return barrier.wait()
+
+        await _parallel()
+
+        assert sorted(_parallel.results()) == list(range(64))
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_named_executor(self):
+        threads = set()
+
+        def _parallel():
+            time.sleep(0.1)
+            threads.add(threading.current_thread())
+
+        for _ in range(2):
+            await concurrently(
+                4, engine=AsyncIOThreadEngine, executor='test-named'
+            )(_parallel)()
+
+        # the second call reuses idle threads
+        assert len(threads) == 4
+        assert all(t.name.startswith('test-named') for t in threads)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_named_executor_bounded(self):
+        for _ in range(3):
+            await concurrently(
+                4, engine=AsyncIOThreadEngine, executor='test-bounded'
+            )(partial(time.sleep, 0.01))()
+
+        # threads are limited by the concurrency, not started for every call
+        executor = AsyncIOThreadEngine._named['test-bounded']
+        assert executor._max_workers == 4
+        assert len(executor._threads) == 4
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_per_loop(self):
+        threads = set()
+
+        def _parallel():
+            time.sleep(0.1)
+            threads.add(threading.current_thread())
+
+        for _ in range(2):
+            await concurrently(2, engine=AsyncIOThreadEngine, per_loop=True)(
+                _parallel
+            )()
+
+        assert len(threads) == 2
+
+        with pytest.raises(ValueError):
+            AsyncIOThreadEngine(executor='test-named', per_loop=True)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_executor(self):
+        start_time = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            await concurrently(
+                2, engine=AsyncIOThreadEngine, executor=executor
+            )(partial(time.sleep, 0.2))()
+
+        # functions wait for the single thread
+        assert time.monotonic() - start_time >= 0.4
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_shared_instance(self):
+        idents = set()
+
+        def _process(d):
+            idents.add(threading.get_ident())
+            return d
+
+        engine = AsyncIOThreadEngine()
+        engine.start()
+        try:
+            for _ in range(3):
+                waiter = concurrently.map(_process, range(4), 2, engine=engine)
+                await waiter()
+                assert sorted(waiter.results()) == [0, 1, 2, 3]
+        finally:
+            engine.close()
+
+        # the executor is shared by the calls
+        assert len(idents) <= 2
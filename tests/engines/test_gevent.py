@@ -116,3 +116,86 @@ class TestGeventEngine(EngineTest):
 
         assert len(results) == 1
         assert results[0]
+
+    def test_map(self):
+        results = {}
+
+        def _process(d):
+            gevent.sleep(0.1)
+            results[d] = gevent.getcurrent()
+
+        waiter = concurrently.map(_process, range(4), 2, engine=GeventEngine)
+        waiter()
+
+        assert sorted(results) == [0, 1, 2, 3]
+        assert len(set(results.values())) == 2
+
+    def test_as_completed(self):
+        @concurrently(2, engine=GeventEngine)
+        def _parallel():
+            for d in range(2):
+                gevent.sleep(0.5)
+                yield d
+
+        start_time = time.monotonic()
+        results = []
+        for d in _parallel.as_completed():
+            results.append((d, time.monotonic() - start_time))
+
+        assert sorted(d for d, _ in results) == [0, 0, 1, 1]
+        assert all(0.5 <= t < 0.9 for d, t in results if d == 0)
+
+    def test_result_size(self):
+        produced = []
+
+        @concurrently(2, engine=GeventEngine, result_size=4)
+        def _parallel():
+            for d in range(50):
+                produced.append(d)
+                yield d
+
+        gevent.sleep(0.1)
+        # greenlets wait for consumer of results
+        assert len(produced) <= 6
+
+        assert len(list(_parallel.as_completed())) == 100
+
+    def test_results(self):
+        @concurrently(2, engine=GeventEngine)
+        def _parallel():
+            return gevent.getcurrent()
+
+        _parallel()
+
+        assert len(set(_parallel.results())) == 2
+
+    def test_timeout(self):
+        waiter = concurrently.map(process, [0.1, 1], 2, engine=GeventEngine)
+
+        with pytest.raises(TimeoutError):
+            waiter(timeout=0.5)
+
+        assert len(waiter.results()) == 1
+
+    def test_item_timeout(self):
+        waiter = concurrently.map(
+            process, [0, 1, 0], 1, engine=GeventEngine, item_timeout=0.2
+        )
+
+        with pytest.raises(UnhandledExceptions) as e:
+            waiter()
+
+        assert type(e.value.exceptions[0]) is TimeoutError
+        # the worker goes on with next items
+        assert len(waiter.results()) == 2
+
+    def test_shared_instance(self):
+        engine = GeventEngine()
+
+        first = concurrently.map(process, [0.1] * 2, 2, engine=engine)
+        second = concurrently.map(process, [0.1] * 2, 2, engine=engine)
+        first()
+        second()
+
+        assert len(first.results()) == 2
+        assert len(second.results()) == 2
@@ -0,0 +1,139 @@
+import time
+from functools import partial
+
+import pytest  # type: ignore
+
+from concurrently import (
+    InterpreterEngine,
+    ProcessPoolEngine,
+    UnhandledExceptions,
+    concurrently,
+)
+from concurrently.engines.interpreter import interpreters
+
+from . import EngineTest, paramz_conc_count
+
+requires_interpreters = pytest.mark.skipif(
+    interpreters is None, reason='subinterpreters are not supported'
+)
+
+
+def get_interpreter_id():
+    from concurrent import interpreters
+
+    return interpreters.get_current().id
+
+
+def sleep(data):
+    time.sleep(data)
+    return data
+
+
+def raise_error(data=None):
+    raise RuntimeError(data)
+
+
+def fail_on_one(data):
+    if data == 1:
+        raise RuntimeError()
+    time.sleep(data)
+    return data
+
+
+def count(stop):
+    for d in range(stop):
+        time.sleep(0.5)
+        yield d
+
+
+@requires_interpreters
+class TestInterpreterEngine(EngineTest):
+    @paramz_conc_count
+    def test_concurrently(self, conc_count):
+        start_time = time.monotonic()
+
+        waiter = concurrently(conc_count, engine=InterpreterEngine)(
+            partial(sleep, 0.5)
+        )
+        waiter()
+
+        assert time.monotonic() - start_time < 1.5
+        assert waiter.results() == (0.5,) * conc_count
+
+    def test_results(self):
+        waiter = concurrently(4, engine=InterpreterEngine)(get_interpreter_id)
+        waiter()
+
+        ids = waiter.results()
+        assert len(set(ids)) == 4
+        assert interpreters.get_current().id not in ids
+
+    def test_exception(self):
+        waiter = concurrently(3, engine=InterpreterEngine)(raise_error)
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            waiter()
+
+        assert len(exc.value.exceptions) == 3
+        assert all(isinstance(e, RuntimeError) for e in exc.value.exceptions)
+
+    def test_exception_suppress(self):
+        waiter = concurrently(2, engine=InterpreterEngine)(raise_error)
+        waiter(suppress_exceptions=True)
+
+        assert len(waiter.exceptions()) == 2
+
+    def test_fail_hard(self):
+        waiter = concurrently.map(
+            fail_on_one, [0.1, 1, 0.1, 0.1, 10], 2, engine=InterpreterEngine
+        )
+
+        start_time = time.monotonic()
+        with pytest.raises(RuntimeError):
+            waiter(fail_hard=True)
+
+        # items after the failed one are dropped
+        assert time.monotonic() - start_time < 2
+
+    def test_map(self):
+        waiter = concurrently.map(
+            sleep, [0.01] * 10, 4, engine=InterpreterEngine
+        )
+        waiter()
+
+        assert waiter.results() == (0.01,) * 10
+
+    def test_as_completed(self):
+        start_time = time.monotonic()
+        waiter = concurrently(2, engine=InterpreterEngine)(partial(count, 2))
+
+        results = []
+        for d in waiter.as_completed():
+            results.append((d, time.monotonic() - start_time))
+
+        assert sorted(d for d, _ in results) == [0, 0, 1, 1]
+        assert all(0.5 <= t < 1 for d, t in results if d == 0)
+
+    def test_stop(self):
+        waiter = concurrently.map(
+            sleep, [0.1] * 100, 2, engine=InterpreterEngine
+        )
+        time.sleep(0.25)
+
+        start_time = time.monotonic()
+        waiter.stop()
+
+        assert time.monotonic() - start_time < 0.5
+        assert 2 <= len(waiter.results()) < 10
+
+
+@pytest.mark.skipif(
+    interpreters is not None, reason='subinterpreters are supported'
+)
+def test_fallback():
+    assert isinstance(InterpreterEngine(), ProcessPoolEngine)
+
+    waiter = concurrently.map(sleep, [0.01] * 4, 2, engine=InterpreterEngine)
+    waiter()
+
+    assert waiter.results() == (0.01,) * 4
@@ -1,10 +1,25 @@
+import hashlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import signal
+import struct
+import subprocess
+import sys
+import threading
 import time
 from multiprocessing import Queue
 from queue import Empty
 
 import pytest  # type: ignore
 
-from concurrently import ProcessEngine, UnhandledExceptions, concurrently
+from concurrently import (
+    ProcessEngine,
+    SharedMemoryChannel,
+    UnhandledExceptions,
+    concurrently,
+)
 
 from . import EngineTest, paramz_conc_count
 
@@ -14,6 +29,19 @@ def process(data):
     return time.monotonic()
 
 
+class PairError(Exception):
+    # pickled by its single argument, it can't be unpickled
+    def __init__(self, a, b):
+        super().__init__(a)
+        self.b = b
+
+
+def _fail_unpicklable(d):
+    if d % 2:
+        raise PairError(d, d)
+    return d
+
+
 class TestProcessEngine(EngineTest):
     @paramz_conc_count
     def test_concurrently(self, conc_count):
@@ -155,3 +183,219 @@ class TestProcessEngine(EngineTest):
 
         assert len(results) == 1
         assert results[0]
+
+    def test_map(self):
+        q_results = Queue()
+
+        def _process(d):
+            q_results.put((d, os.getpid()))
+
+        waiter = concurrently.map(_process, range(10), 2, engine=ProcessEngine)
+        waiter()
+
+        results = dict(q_results.get(timeout=1) for _ in range(10))
+
+        assert sorted(results) == list(range(10))
+        assert os.getpid() not in results.values()
+
+    def test_map_stop(self):
+        q_results = Queue()
+
+        def _process(d):
+            q_results.put(d)
+            time.sleep(1)
+
+        waiter = concurrently.map(
+            _process, itertools.count(), 2, engine=ProcessEngine
+        )
+        time.sleep(0.5)
+        waiter.stop()
+
+        assert sorted(q_results.get(timeout=1) for _ in range(2)) == [0, 1]
+        assert q_results.empty()
+
+    def test_as_completed(self):
+        @concurrently(2, engine=ProcessEngine)
+        def _parallel():
+            yield os.getpid()
+            time.sleep(0.5)
+            yield os.getpid()
+
+        start_time = time.monotonic()
+        it = _parallel.as_completed()
+        first = next(it)
+
+        assert time.monotonic() - start_time < 0.5
+
+        results = [first] + list(it)
+
+        assert len(results) == 4
+        assert len(set(results)) == 2
+
+    def test_results(self):
+        waiter = concurrently.map(
+            lambda d: d * 2, range(4), 2, engine=ProcessEngine
+        )
+        waiter()
+
+        assert sorted(waiter.results()) == [0, 2, 4, 6]
+
+    def test_shared_memory_channel(self):
+        size = 1024 * 1024
+        data = SharedMemoryChannel(slot_size=size, slots=2)
+
+        def _process(view):
+            return view[0], len(view), hashlib.md5(view).hexdigest()
+
+        waiter = concurrently.map(_process, data, 2, engine=ProcessEngine)
+
+        expected = set()
+        for n in range(8):
+            chunk = bytes([n]) * (size - n)
+            data.send(chunk)
+            expected.add((n, size - n, hashlib.md5(chunk).hexdigest()))
+        data.close()
+        waiter()
+
+        assert set(waiter.results()) == expected
+
+    def test_shared_memory_channel_output(self):
+        output = SharedMemoryChannel(slot_size=16, slots=1)
+
+        @concurrently(2, engine=ProcessEngine)
+        def _parallel():
+            for _ in range(3):
+                with output.reserve(4) as slot:
+                    struct.pack_into('i', slot, 0, os.getpid())
+
+        received = []
+        for view in output:
+            received.append(struct.unpack('i', view)[0])
+            if len(received) == 6:
+                break
+        _parallel()
+
+        assert len(set(received)) == 2
+
+        with pytest.raises(ValueError):
+            output.send(b'0' * 17)
+
+    def test_shared_memory_channel_fork_only(self, monkeypatch):
+        with pytest.raises(TypeError):
+            pickle.dumps(SharedMemoryChannel(slot_size=16))
+
+        # spawned processes don't inherit anonymous memory
+        monkeypatch.setattr(
+            multiprocessing, 'get_start_method', lambda allow_none: 'spawn'
+        )
+        with pytest.raises(RuntimeError):
+            SharedMemoryChannel(slot_size=16)
+
+        # the default method of the platform, which isn't fixed yet
+        monkeypatch.setattr(
+            multiprocessing, 'get_start_method', lambda allow_none: None
+        )
+        monkeypatch.setattr(
+            multiprocessing, 'get_all_start_methods', lambda: ['spawn']
+        )
+        with pytest.raises(RuntimeError):
+            SharedMemoryChannel(slot_size=16)
+
+    def test_shared_memory_channel_start_method_not_fixed(self):
+        code = (
+            'import multiprocessing\n'
+            'from concurrently import SharedMemoryChannel\n'
+            'SharedMemoryChannel(slot_size=16)\n'
+            'multiprocessing.set_start_method("fork")\n'
+            'print(multiprocessing.get_start_method())\n'
+        )
+        out = subprocess.run(
+            [sys.executable, '-c', code],
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=30,
+        ).stdout
+
+        assert out.strip() == 'fork'
+
+    def test_shared_instance(self):
+        engine = ProcessEngine(channel_size=10)
+
+        first = concurrently.map(process, [0.1] * 2, 2, engine=engine)
+        second = concurrently.map(process, [0.1] * 3, 3, engine=engine)
+        first()
+        second()
+
+        assert len(first.results()) == 2
+        assert len(second.results()) == 3
+
+    def test_process_died(self):
+        @concurrently(2, engine=ProcessEngine)
+        def _parallel():
+            time.sleep(0.1)
+            os.kill(os.getpid(), signal.SIGKILL)
+
+        start_time = time.monotonic()
+        with pytest.raises(UnhandledExceptions) as exc:
+            _parallel()
+
+        assert time.monotonic() - start_time < 2
+        assert len(exc.value.exceptions) == 2
+        assert 'exited unexpectedly' in str(exc.value.exceptions[0])
+
+    def test_unpicklable_exception(self):
+        @concurrently(1, engine=ProcessEngine)
+        def _parallel():
+            lock = threading.Lock()
+            raise RuntimeError(lock)
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            _parallel()
+
+        assert isinstance(exc.value.exceptions[0], RuntimeError)
+        assert 'RuntimeError' in str(exc.value.exceptions[0])
+
+    def test_exception_unpickled_in_parent(self):
+        @concurrently(2, engine=ProcessEngine)
+        def _parallel():
+            raise PairError(1, 2)
+
+        waiter = concurrently.map(
+            _fail_unpicklable, range(4), 2, engine=ProcessEngine
+        )
+
+        # exceptions which can't be unpickled in the parent are reported
+        with pytest.raises(UnhandledExceptions) as exc:
+            _parallel()
+        waiter(suppress_exceptions=True)
+
+        assert len(exc.value.exceptions) == 2
+        assert all(isinstance(e, RuntimeError) for e in exc.value.exceptions)
+        assert 'can not be unpickled' in str(exc.value.exceptions[0])
+        assert sorted(waiter.results()) == [0, 2]
+        assert len(waiter.exceptions()) == 2
+
+    def test_result_size(self):
+        engine = ProcessEngine(result_size=2)
+
+        waiter = concurrently.map(process, [0] * 20, 4, engine=engine)
+        time.sleep(0.2)
+        waiter()
+
+        assert len(waiter.results()) == 20
+
+    def test_stop_large_results(self):
+        @concurrently(2, engine=ProcessEngine)
+        def _parallel():
+            while True:
+                yield b'0' * 1024 * 1024
+
+        results = _parallel.as_completed()
+        for _ in range(3):
+            assert len(next(results)) == 1024 * 1024
+
+        start_time = time.monotonic()
+        _parallel.stop()
+
+        assert time.monotonic() - start_time < 5
@@ -0,0 +1,325 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    ProcessPool,
+    ProcessPoolEngine,
+    UnhandledExceptions,
+    concurrently,
+)
+
+from . import EngineTest, paramz_conc_count
+
+
+def get_pid():
+    return os.getpid()
+
+
+def sleep(data):
+    time.sleep(data)
+    return data
+
+
+def sleep_forever():
+    while True:
+        time.sleep(0.01)
+
+
+def raise_error(data=None):
+    raise RuntimeError(data)
+
+
+class PairError(Exception):
+    # unpickling calls PairError(a) without b
+    def __init__(self, a, b):
+        super().__init__(a)
+
+
+def fail_unpicklable(data=None):
+    if data is None or data % 2:
+        raise PairError(data, 'b')
+    return data
+
+
+def _processes_with(marker):
+    pids = []
+    for pid in os.listdir('/proc'):
+        try:
+            with open('/proc/{}/cmdline'.format(pid), 'rb') as f:
+                cmdline = f.read()
+            with open('/proc/{}/stat'.format(pid)) as f:
+                state = f.read().rsplit(')', 1)[1].split()[0]
+        except (OSError, IndexError):
+            continue
+        # zombies are dead, but may be not reaped by init
+        if marker.encode() in cmdline and state != 'Z':
+            pids.append(int(pid))
+    return pids
+
+
+def fail_on_one(data):
+    if data == 1:
+        raise RuntimeError()
+    time.sleep(data)
+    return data
+
+
+def is_preloaded():
+    return 'json' in sys.modules
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = ProcessPool(4)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+class TestProcessPoolEngine(EngineTest):
+    @paramz_conc_count
+    def test_concurrently(self, conc_count, pool):
+        start_time = time.monotonic()
+
+        waiter = concurrently(conc_count, engine=ProcessPoolEngine, pool=pool)(
+            get_pid
+        )
+        waiter()
+
+        assert len(set(waiter.results())) == conc_count
+        assert time.monotonic() - start_time < 0.1
+
+    def test_stop(self, pool):
+        waiter = concurrently.map(
+            sleep, [0, 1, 1], 2, engine=ProcessPoolEngine, pool=pool
+        )
+
+        time.sleep(0.5)
+        waiter.stop()
+
+        assert waiter.results() == (0,)
+
+    def test_exception(self, pool):
+        waiter = concurrently(2, engine=ProcessPoolEngine, pool=pool)(
+            raise_error
+        )
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            waiter()
+
+        assert len(exc.value.exceptions) == 2
+        assert isinstance(exc.value.exceptions[0], RuntimeError)
+
+    def test_exception_suppress(self, pool):
+        waiter = concurrently.map(
+            fail_on_one, range(3), 1, engine=ProcessPoolEngine, pool=pool
+        )
+        waiter(suppress_exceptions=True)
+
+        assert waiter.results() == (0, 2)
+
+        exc_list = waiter.exceptions()
+        assert len(exc_list) == 1
+        assert isinstance(exc_list[0], RuntimeError)
+
+    def test_fail_hard(self, pool):
+        waiter = concurrently.map(
+            fail_on_one, range(4), 3, engine=ProcessPoolEngine, pool=pool
+        )
+
+        with pytest.raises(RuntimeError):
+            waiter(fail_hard=True)
+
+        assert set(waiter.results()) <= {0}
+
+        # the pool survives interrupted functions
+        waiter = concurrently(4, engine=ProcessPoolEngine, pool=pool)(get_pid)
+        waiter()
+
+        assert len(set(waiter.results())) == 4
+
+    def test_map(self, pool):
+        waiter = concurrently.map(
+            sleep, [0.1] * 8, 4, engine=ProcessPoolEngine, pool=pool
+        )
+        results = list(waiter.as_completed())
+
+        assert results == [0.1] * 8
+
+    def test_map_iterable_exception(self, pool):
+        def _gen():
+            yield 0
+            raise ValueError()
+
+        waiter = concurrently.map(
+            sleep, _gen(), 2, engine=ProcessPoolEngine, pool=pool
+        )
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            waiter()
+
+        assert len(exc.value.exceptions) == 1
+        assert isinstance(exc.value.exceptions[0], ValueError)
+
+    def test_interrupt_pending(self):
+        pool = ProcessPool(1)
+        waiter = concurrently(2, engine=ProcessPoolEngine, pool=pool)(
+            sleep_forever
+        )
+        time.sleep(0.1)
+        waiter.stop()
+        pool.shutdown()
+
+        assert waiter.exceptions() == ()
+
+    def test_not_picklable(self, pool):
+        with pytest.raises(Exception):
+            concurrently(1, engine=ProcessPoolEngine, pool=pool)(lambda: None)
+
+    def test_max_tasks_per_child(self):
+        pool = ProcessPool(1, max_tasks_per_child=2)
+        pids = []
+        for _ in range(4):
+            waiter = concurrently(1, engine=ProcessPoolEngine, pool=pool)(
+                get_pid
+            )
+            waiter()
+            pids.extend(waiter.results())
+        pool.shutdown()
+
+        assert pids[0] == pids[1]
+        assert pids[2] == pids[3]
+        assert pids[1] != pids[2]
+
+    def test_spawn_preload(self):
+        pool = ProcessPool(1, start_method='spawn', preload=['json'])
+        waiter = concurrently(1, engine=ProcessPoolEngine, pool=pool)(
+            is_preloaded
+        )
+        waiter()
+        pool.shutdown()
+
+        assert waiter.results() == (True,)
+
+    def test_process_died(self, pool):
+        waiter = concurrently(1, engine=ProcessPoolEngine, pool=pool)(
+            os.abort
+        )
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            waiter()
+
+        assert 'exited unexpectedly' in str(exc.value.exceptions[0])
+
+    def test_unpicklable_exception(self, pool):
+        waiter = concurrently(2, engine=ProcessPoolEngine, pool=pool)(
+            fail_unpicklable
+        )
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            waiter(timeout=5)
+
+        assert len(exc.value.exceptions) == 2
+        assert all(
+            'can not be unpickled' in str(e) for e in exc.value.exceptions
+        )
+
+        waiter = concurrently.map(
+            fail_unpicklable, range(6), 2, engine=ProcessPoolEngine, pool=pool
+        )
+        waiter(timeout=5, suppress_exceptions=True)
+
+        # items after the failed ones are processed
+        assert sorted(waiter.results()) == [0, 2, 4]
+        assert len(waiter.exceptions()) == 3
+
+        # the pool still runs functions
+        waiter = concurrently(1, engine=ProcessPoolEngine, pool=pool)(get_pid)
+        waiter(timeout=5)
+        assert len(waiter.results()) == 1
+
+    def test_timeout(self, pool):
+        waiter = concurrently.map(
+            sleep, [0.1, 1], 2, engine=ProcessPoolEngine, pool=pool
+        )
+
+        with pytest.raises(TimeoutError):
+            waiter(timeout=0.5)
+
+        assert waiter.results() == (0.1,)
+
+    def test_item_timeout(self, pool):
+        waiter = concurrently.map(
+            sleep,
+            [0, 1, 0],
+            1,
+            engine=ProcessPoolEngine,
+            pool=pool,
+            item_timeout=0.2,
+        )
+
+        with pytest.raises(UnhandledExceptions) as e:
+            waiter()
+
+        assert type(e.value.exceptions[0]) is TimeoutError
+        # the worker goes on with next items
+        assert waiter.results() == (0, 0)
+
+    def test_shared_instance(self, pool):
+        engine = ProcessPoolEngine(pool=pool)
+        engine.start()
+
+        first = concurrently.map(sleep, [0.1] * 4, 2, engine=engine)
+        second = concurrently.map(sleep, [0.2] * 2, 2, engine=engine)
+        first()
+        second()
+
+        assert first.results() == (0.1,) * 4
+        assert second.results() == (0.2,) * 2
+
+    @pytest.mark.skipif(
+        not os.path.isdir('/proc'), reason='processes are listed by /proc'
+    )
+    def test_start_method_not_fixed(self):
+        code = (
+            'import multiprocessing\n'
+            'from concurrently import ProcessPool, ProcessPoolEngine\n'
+            'ProcessPoolEngine(), ProcessPool(1)\n'
+            'multiprocessing.set_start_method("spawn")\n'
+            'print(multiprocessing.get_start_method())\n'
+        )
+        out = subprocess.run(
+            [sys.executable, '-c', code],
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=30,
+        ).stdout
+
+        assert out.strip() == 'spawn'
+
+    def test_no_orphans(self):
+        marker = 'test-no-orphans-{}'.format(os.getpid())
+        code = (
+            '# {}\n'
+            'from concurrently import ProcessPoolEngine, concurrently\n'
+            'concurrently.map(abs, range(20), 4, engine=ProcessPoolEngine)()\n'
+        ).format(marker)
+        subprocess.run(
+            [sys.executable, '-c', code],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            timeout=30,
+        )
+
+        # processes of the default pool exit with the interpreter
+        for _ in range(30):
+            left = _processes_with(marker)
+            if not left:
+                break
+            time.sleep(0.1)
+        assert not left
@@ -1,8 +1,16 @@
+import threading
 import time
 
 import pytest  # type: ignore
 
-from concurrently import ThreadEngine, UnhandledExceptions, concurrently
+from concurrently import (
+    CancelToken,
+    RateLimit,
+    ThreadEngine,
+    UnhandledExceptions,
+    concurrently,
+)
+from concurrently.engines.thread import Timers
 
 from . import EngineTest, paramz_conc_count, paramz_data_count
 
@@ -12,6 +20,13 @@ def process(data):
     return time.monotonic()
 
 
+def process_sliced(data):
+    # blocked calls are interrupted only after their end
+    for _ in range(int(data * 100)):
+        time.sleep(0.01)
+    return data
+
+
 class TestThreadEngine(EngineTest):
     @paramz_conc_count
     @paramz_data_count
@@ -115,3 +130,192 @@ class TestThreadEngine(EngineTest):
 
         assert len(results) == 1
         assert results[0]
+
+    def test_map(self):
+        results = {}
+
+        def _process(d):
+            time.sleep(0.1)
+            results[d] = threading.get_ident()
+
+        waiter = concurrently.map(_process, range(4), 2, engine=ThreadEngine)
+        waiter()
+
+        assert sorted(results) == [0, 1, 2, 3]
+        assert len(set(results.values())) == 2
+
+    def test_map_iterable_exception(self):
+        def _gen():
+            yield 0
+            raise RuntimeError()
+
+        waiter = concurrently.map(lambda d: d, _gen(), 2, engine=ThreadEngine)
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            waiter()
+
+        assert len(exc.value.exceptions) == 1
+        assert isinstance(exc.value.exceptions[0], RuntimeError)
+
+    def test_as_completed(self):
+        @concurrently(2, engine=ThreadEngine)
+        def _parallel():
+            for d in range(2):
+                time.sleep(0.5)
+                yield d
+
+        start_time = time.monotonic()
+        results = []
+        for d in _parallel.as_completed():
+            results.append((d, time.monotonic() - start_time))
+
+        assert sorted(d for d, _ in results) == [0, 0, 1, 1]
+        assert all(0.5 <= t < 0.9 for d, t in results if d == 0)
+        assert _parallel.results() == ()
+
+    def test_results(self):
+        waiter = concurrently.map(
+            lambda d: d * 2, range(4), 2, engine=ThreadEngine
+        )
+        waiter()
+
+        assert sorted(waiter.results()) == [0, 2, 4, 6]
+
+    def test_stop_many(self):
+        started = threading.Barrier(501)
+
+        @concurrently(500, engine=ThreadEngine)
+        def _parallel():
+            started.wait()
+            while True:
+                time.sleep(0.001)
+
+        started.wait()
+        start_time = time.monotonic()
+        _parallel.stop()
+
+        assert time.monotonic() - start_time < 1
+
+    def test_cancel_token(self):
+        tokens = []
+
+        @concurrently(2, engine=ThreadEngine)
+        def _parallel():
+            token = CancelToken.current()
+            tokens.append(token)
+            try:
+                token.wait()
+            finally:
+                tokens.append(token.cancelled)
+
+        time.sleep(0.1)
+        start_time = time.monotonic()
+        _parallel.stop()
+
+        assert time.monotonic() - start_time < 0.5
+        assert tokens[2:] == [True, True]
+        assert not CancelToken.current().cancelled
+
+    def test_stop_timeout(self):
+        @concurrently(2, engine=ThreadEngine, stop_timeout=0.1)
+        def _parallel():
+            time.sleep(0.5)
+
+        time.sleep(0.1)
+
+        with pytest.raises(TimeoutError):
+            _parallel.stop()
+
+    def test_stop_rate_wait(self):
+        rate = RateLimit(1, period=10)
+
+        waiter = concurrently.map(
+            lambda d: d, range(4), 2, engine=ThreadEngine, rate=rate
+        )
+        time.sleep(0.1)
+        start_time = time.monotonic()
+        waiter.stop()
+
+        assert time.monotonic() - start_time < 0.5
+        assert waiter.results() == (0,)
+
+    def test_timeout(self):
+        waiter = concurrently.map(
+            lambda d: time.sleep(d) or d, [0.1, 3, 0.1], 3, engine=ThreadEngine
+        )
+
+        start_time = time.monotonic()
+        with pytest.raises(TimeoutError):
+            waiter(timeout=0.5)
+
+        # the thread blocked in sleep isn't waited
+        assert time.monotonic() - start_time < 0.8
+        # results before the deadline are kept
+        assert waiter.results() == (0.1, 0.1)
+
+    def test_deadline(self):
+        waiter = concurrently.map(process, [1], 1, engine=ThreadEngine)
+
+        with pytest.raises(TimeoutError):
+            list(waiter.as_completed(deadline=time.monotonic() + 0.2))
+
+    def test_item_timeout(self):
+        waiter = concurrently.map(
+            process_sliced, [0, 1, 0], 1, engine=ThreadEngine, item_timeout=0.2
+        )
+
+        with pytest.raises(UnhandledExceptions) as e:
+            waiter()
+
+        assert type(e.value.exceptions[0]) is TimeoutError
+        # the worker goes on with next items
+        assert waiter.results() == (0, 0)
+
+    def test_timers(self):
+        timers = Timers()
+        calls = []
+
+        timers.schedule(0.2, lambda: calls.append(2))
+        timers.schedule(0.1, lambda: calls.append(1))
+        timers.cancel(timers.schedule(0.15, lambda: calls.append(None)))
+        time.sleep(0.3)
+
+        assert calls == [1, 2]
+
+    def test_timers_failed_function(self, caplog):
+        timers = Timers()
+        calls = []
+
+        timers.schedule(0.05, lambda: 1 / 0)
+        timers.schedule(0.1, lambda: calls.append(1))
+        time.sleep(0.2)
+
+        # the failure doesn't stop the timer thread
+        assert calls == [1]
+        assert 'ZeroDivisionError' in caplog.text
+
+    def test_shared_instance(self):
+        idents = set()
+
+        def _process(d):
+            idents.add(threading.get_ident())
+            time.sleep(0.01)
+            return d
+
+        with ThreadEngine() as engine:
+            first = concurrently.map(_process, range(10), 2, engine=engine)
+            second = concurrently.map(_process, range(10, 20), 2, engine=engine)
+            first()
+            second()
+            third = concurrently.map(_process, range(5), 4, engine=engine)
+            third()
+
+        # calls running at the same time have own results
+        assert sorted(first.results()) == list(range(10))
+        assert sorted(second.results()) == list(range(10, 20))
+        assert sorted(third.results()) == list(range(5))
+        # threads of the first calls are reused
+        assert len(idents) == 4
+
+        with pytest.raises(RuntimeError):
+            concurrently(1, engine=engine)(lambda: None)
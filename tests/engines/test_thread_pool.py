@@ -0,0 +1,193 @@
+import threading
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    Buffer,
+    ThreadPool,
+    ThreadPoolEngine,
+    UnhandledExceptions,
+    concurrently,
+)
+
+from . import EngineTest, paramz_conc_count, paramz_data_count
+
+
+def process(data):
+    time.sleep(data)
+    return time.monotonic()
+
+
+class TestThreadPoolEngine(EngineTest):
+    @paramz_conc_count
+    @paramz_data_count
+    def test_concurrently(self, conc_count, data_count):
+        data = range(data_count)
+        i_data = iter(data)
+        results = {}
+        start_time = time.monotonic()
+
+        @concurrently(conc_count, engine=ThreadPoolEngine)
+        def _parallel():
+            for d in i_data:
+                res = process(d)
+                results[d] = res
+
+        _parallel()
+
+        def calc_delta(n):
+            if n // conc_count == 0:
+                return n
+            return n + calc_delta(n - conc_count)
+
+        assert len(results) == data_count
+        for n, v in results.items():
+            delta = v - start_time
+            assert int(delta) == calc_delta(n)
+
+    def test_stop(self):
+        data = range(3)
+        i_data = iter(data)
+        results = {}
+        start_time = time.monotonic()
+
+        @concurrently(2, engine=ThreadPoolEngine, pool=ThreadPool())
+        def _parallel():
+            for d in i_data:
+                r = process(d)
+                results[d] = r
+
+        time.sleep(0.5)
+        _parallel.stop()
+
+        assert len(results) == 1
+        assert int(results[0]) == int(start_time)
+
+    def test_exception(self):
+        data = range(2)
+        i_data = iter(data)
+
+        @concurrently(2, engine=ThreadPoolEngine)
+        def _parallel():
+            for d in i_data:
+                if d == 1:
+                    raise RuntimeError()
+
+        with pytest.raises(UnhandledExceptions) as exc:
+            _parallel()
+
+        assert len(exc.value.exceptions) == 1
+        assert isinstance(exc.value.exceptions[0], RuntimeError)
+
+    def test_fail_hard(self):
+        i_data = iter(range(4))
+        results = {}
+
+        @concurrently(3, engine=ThreadPoolEngine, pool=ThreadPool())
+        def _parallel():
+            for d in i_data:
+                if d == 1:
+                    raise RuntimeError()
+                for _ in range(d * 10):
+                    time.sleep(0.1)
+                results[d] = True
+
+        time.sleep(0.1)
+
+        with pytest.raises(RuntimeError):
+            _parallel(fail_hard=True)
+
+        assert len(results) == 1
+        assert results[0]
+
+    def test_reuse_threads(self):
+        pool = ThreadPool()
+        idents = set()
+
+        for _ in range(3):
+
+            @concurrently(2, engine=ThreadPoolEngine, pool=pool)
+            def _parallel():
+                idents.add(threading.get_ident())
+                time.sleep(0.1)
+
+            _parallel()
+
+        assert len(idents) == 2
+
+    def test_stopped_thread_is_reused(self):
+        pool = ThreadPool()
+        idents = []
+
+        @concurrently(1, engine=ThreadPoolEngine, pool=pool)
+        def _stopped():
+            idents.append(threading.get_ident())
+            while True:
+                time.sleep(0.01)
+
+        time.sleep(0.1)
+        _stopped.stop()
+
+        @concurrently(1, engine=ThreadPoolEngine, pool=pool)
+        def _parallel():
+            idents.append(threading.get_ident())
+
+        _parallel()
+
+        assert len(idents) == 2
+        assert idents[0] == idents[1]
+
+    def test_stop_timeout(self):
+        @concurrently(
+            2, engine=ThreadPoolEngine, pool=ThreadPool(), stop_timeout=0.1
+        )
+        def _parallel():
+            time.sleep(0.5)
+
+        time.sleep(0.1)
+
+        with pytest.raises(TimeoutError):
+            _parallel.stop()
+
+    def test_result_buffer(self):
+        produced = []
+
+        @concurrently(2, engine=ThreadPoolEngine, result_buffer=Buffer(high=4))
+        def _parallel():
+            for d in range(50):
+                produced.append(d)
+                yield d
+
+        time.sleep(0.1)
+        # workers wait for consumer of results
+        assert len(produced) <= 6
+
+        assert len(list(_parallel.as_completed())) == 100
+
+    def test_results(self):
+        waiter = concurrently.map(
+            lambda d: d * 2, range(4), 2, engine=ThreadPoolEngine
+        )
+        waiter()
+
+        assert sorted(waiter.results()) == [0, 2, 4, 6]
+
+    def test_idle_timeout(self):
+        pool = ThreadPool(idle_timeout=0.1)
+
+        @concurrently(2, engine=ThreadPoolEngine, pool=pool)
+        def _parallel():
+            pass
+
+        _parallel()
+        time.sleep(0.3)
+
+        assert pool._size == 0
+
+    def test_shutdown(self):
+        pool = ThreadPool()
+        pool.shutdown()
+
+        with pytest.raises(RuntimeError):
+            concurrently(1, engine=ThreadPoolEngine, pool=pool)(lambda: None)
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+
+import gevent  # type: ignore
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    GeventEngine,
+    Limits,
+    ProcessEngine,
+    ThreadEngine,
+    concurrently,
+)
+
+
+class Backend:
+    """
+    Serves ``capacity`` requests at the same time, others slow down.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            return 0.01 * max(1, self.active / self.capacity) ** 2
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+
+def test_limits_grow_when_saturated():
+    limits = Limits(min=2, max=10)
+    for _ in range(20):
+        for _ in range(limits.limit):
+            limits._enter()
+        for _ in range(limits.inflight):
+            limits._leave(0.1, failed=False)
+
+    assert limits.limit == 10
+
+    limits = Limits(min=2, max=10)
+    for _ in range(20):
+        limits._enter()
+        limits._leave(0.1, failed=False)
+
+    assert limits.limit == 3
+
+
+def test_limits_backoff():
+    limits = Limits(min=2, max=100, initial=40)
+
+    limits._enter()
+    limits._leave(0.1, failed=True)
+    assert limits.limit == 30
+
+    limits._enter()
+    limits._leave(0.1, failed=False)
+    limits._enter()
+    limits._leave(0.5, failed=False)
+    assert limits.limit == 22
+
+    for _ in range(20):
+        limits._enter()
+        limits._leave(0.1, failed=True)
+    assert limits.limit == 2
+
+
+def test_release_adapts_limit():
+    limits = Limits(min=1, max=10, initial=4)
+    for _ in range(4):
+        assert limits.acquire()
+
+    # saturated workers in time grow the limit
+    limits.release(0.1, failed=False)
+    assert limits.limit == 5
+    limits.release(0.1, failed=True)
+    assert limits.limit == 3
+    # slower than tolerance of the lowest latency
+    limits.release(0.5, failed=False)
+    assert limits.limit == 2
+
+    assert limits.acquire()
+    worker = threading.Thread(target=limits.acquire)
+    worker.start()
+    worker.join(0.05)
+    assert worker.is_alive()
+
+    limits.release(0.1, failed=False)
+    worker.join(1)
+    assert not worker.is_alive()
+    assert limits.limit == 3
+    assert limits.inflight == 2
+
+
+def test_thread_engine():
+    backend = Backend(capacity=5)
+    limits = Limits(min=1, max=50)
+
+    def _request(d):
+        time.sleep(backend.enter())
+        backend.leave()
+        return d
+
+    waiter = concurrently.map(
+        _request, range(500), engine=ThreadEngine, adaptive=limits
+    )
+    waiter()
+
+    assert sorted(waiter.results()) == list(range(500))
+    # the limit depends on timing, the adaptation is tested by release
+    assert limits.min <= limits.limit <= limits.max
+    assert backend.peak <= 50
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_engine():
+    backend = Backend(capacity=5)
+    limits = Limits(min=1, max=50)
+
+    async def _request(d):
+        await asyncio.sleep(backend.enter())
+        backend.leave()
+        return d
+
+    waiter = concurrently.map(
+        _request, range(500), engine=AsyncIOEngine, adaptive=limits
+    )
+    await waiter()
+
+    assert sorted(waiter.results()) == list(range(500))
+    # the limit depends on timing, the adaptation is tested by release
+    assert limits.min <= limits.limit <= limits.max
+    assert backend.peak <= 50
+
+
+def test_gevent_engine():
+    backend = Backend(capacity=5)
+    limits = Limits(min=1, max=50)
+
+    def _request(d):
+        gevent.sleep(backend.enter())
+        backend.leave()
+        return d
+
+    waiter = concurrently.map(
+        _request, range(500), engine=GeventEngine, adaptive=limits
+    )
+    waiter()
+
+    assert sorted(waiter.results()) == list(range(500))
+    # the limit depends on timing, the adaptation is tested by release
+    assert limits.min <= limits.limit <= limits.max
+    assert backend.peak <= 50
+
+
+def test_errors_shrink_limit():
+    limits = Limits(min=1, max=20, initial=20)
+
+    def _request(d):
+        if d % 2:
+            raise RuntimeError()
+
+    waiter = concurrently.map(
+        _request, range(100), engine=ThreadEngine, adaptive=limits
+    )
+    waiter(suppress_exceptions=True)
+
+    assert len(waiter.results()) == len(waiter.exceptions()) == 50
+    assert limits.limit <= 5
+
+
+def test_requires_map():
+    with pytest.raises(ValueError):
+        concurrently(engine=ThreadEngine, adaptive=Limits())(lambda: None)
+
+
+def test_not_supported():
+    with pytest.raises(NotImplementedError):
+        concurrently.map(
+            print, range(1), engine=ProcessEngine, adaptive=Limits()
+        )
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_errors_shrink_limit_asyncio():
+    limits = Limits(min=1, max=20, initial=20)
+
+    async def _request(d):
+        await asyncio.sleep(0)
+        if d % 2:
+            raise RuntimeError()
+        return d
+
+    waiter = concurrently.map(
+        _request, range(100), engine=AsyncIOEngine, adaptive=limits
+    )
+    await waiter(suppress_exceptions=True)
+
+    # failed items don't end workers, every item is processed
+    assert sorted(waiter.results()) == list(range(0, 100, 2))
+    assert len(waiter.exceptions()) == 50
+    assert limits.limit <= 5
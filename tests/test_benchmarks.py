@@ -0,0 +1,87 @@
+import asyncio
+import json
+import warnings
+
+import pytest  # type: ignore
+
+from benchmarks.__main__ import main
+
+
+@pytest.fixture(autouse=True)
+def _close_event_loop():
+    # asyncio.run() of benchmarks drops the loop left by async tests
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        try:
+            asyncio.get_event_loop_policy().get_event_loop().close()
+        except RuntimeError:
+            pass
+    asyncio.set_event_loop(None)
+
+
+def test_quick(tmp_path):
+    output = tmp_path / 'results.json'
+
+    code = main(
+        [
+            '--quick',
+            '-e',
+            'thread',
+            '-e',
+            'asyncio',
+            '-b',
+            'dispatch',
+            '-b',
+            'chunks',
+            '-b',
+            'stop',
+            '-b',
+            'contention',
+            '-b',
+            'imports',
+            '-o',
+            str(output),
+        ]
+    )
+
+    assert code == 0
+    report = json.loads(output.read_text())
+    assert report['meta']['cpu_count']
+    assert isinstance(report['meta']['gil_enabled'], bool)
+    assert {(r['benchmark'], r['engine']) for r in report['results']} == {
+        ('dispatch', 'thread'),
+        ('dispatch', 'asyncio'),
+        ('chunks', 'thread'),
+        ('chunks', 'asyncio'),
+        ('stop', 'thread'),
+        ('stop', 'asyncio'),
+        ('contention', 'thread'),
+        ('contention', 'asyncio'),
+        ('imports', 'thread'),
+        ('imports', 'asyncio'),
+    }
+    assert all(r['seconds'] > 0 for r in report['results'])
+
+
+def test_compare(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    record = dict(benchmark='dispatch', engine='thread', concurrency=4)
+    baseline.write_text(
+        json.dumps({'results': [dict(record, seconds=1e-9)]})
+    )
+
+    code = main(
+        [
+            '--quick',
+            '-e',
+            'thread',
+            '-b',
+            'dispatch',
+            '-o',
+            str(tmp_path / 'results.json'),
+            '--compare',
+            str(baseline),
+        ]
+    )
+
+    assert code == 1
@@ -0,0 +1,214 @@
+import asyncio
+import threading
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    AsyncIOThreadEngine,
+    Buffer,
+    ProcessEngine,
+    ThreadEngine,
+    concurrently,
+)
+
+
+def _produce(buffer, count):
+    sizes = []
+    for d in range(count):
+        buffer.put(d)
+        sizes.append(len(buffer))
+    buffer.close()
+    return sizes
+
+
+def test_watermarks():
+    buffer = Buffer(high=4, low=1)
+    for d in range(4):
+        buffer.put(d)
+
+    producer = threading.Thread(target=buffer.put, args=(4,))
+    producer.start()
+    time.sleep(0.05)
+    assert buffer.get() == 0
+    assert buffer.get() == 1
+    producer.join(0.05)
+    # the producer waits till the low watermark
+    assert producer.is_alive()
+
+    assert buffer.get() == 2
+    producer.join(1)
+    assert not producer.is_alive()
+    assert list(buffer._items) == [3, 4]
+
+
+def test_close():
+    buffer = Buffer()
+    buffer.put(1)
+    buffer.close()
+
+    assert list(buffer) == [1]
+    with pytest.raises(EOFError):
+        buffer.get()
+
+
+def test_release():
+    buffer = Buffer(high=1)
+    buffer.put(0)
+
+    producer = threading.Thread(target=buffer.put, args=(1,))
+    producer.start()
+    buffer.release()
+    producer.join(1)
+
+    assert not producer.is_alive()
+    assert len(buffer) == 2
+
+
+def test_push():
+    buffer = Buffer(high=1)
+    buffer.put(0)
+    buffer.push(1)
+
+    assert len(buffer) == 2
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_async():
+    buffer = Buffer(high=2, low=0)
+
+    async def _produce():
+        for d in range(10):
+            await buffer.put_async(d)
+            assert len(buffer) <= 2
+        buffer.close()
+
+    producer = asyncio.ensure_future(_produce())
+    items = [d async for d in buffer]
+    await producer
+
+    assert items == list(range(10))
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_async_cancel():
+    buffer = Buffer()
+
+    getters = [asyncio.ensure_future(buffer.get_async()) for _ in range(2)]
+    await asyncio.sleep(0)
+    buffer.put(1)
+    # the cancelled getter passes the item to the next one
+    getters[0].cancel()
+
+    assert await getters[1] == 1
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_threads_to_async():
+    buffer = Buffer(high=10)
+
+    producer = threading.Thread(target=_produce, args=(buffer, 100))
+    producer.start()
+    items = [d async for d in buffer]
+    producer.join()
+
+    assert items == list(range(100))
+
+
+def test_thread_engine_input():
+    buffer = Buffer(high=10)
+
+    waiter = concurrently.map(
+        lambda d: time.sleep(0.001) or d, buffer, 4, engine=ThreadEngine
+    )
+    sizes = _produce(buffer, 200)
+    waiter()
+
+    assert sorted(waiter.results()) == list(range(200))
+    assert max(sizes) <= 10
+
+
+def test_thread_engine_results():
+    produced = []
+
+    @concurrently(2, engine=ThreadEngine, result_buffer=Buffer(high=4))
+    def _parallel():
+        for d in range(50):
+            produced.append(d)
+            yield d
+
+    time.sleep(0.1)
+    # workers wait for consumer of results
+    assert len(produced) <= 6
+
+    results = list(_parallel.as_completed())
+
+    assert len(results) == 100
+
+
+def test_thread_engine_results_stop():
+    @concurrently(2, engine=ThreadEngine, result_buffer=Buffer(high=1))
+    def _parallel():
+        while True:
+            yield 1
+
+    time.sleep(0.1)
+    _parallel.stop()
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_engine_results():
+    produced = []
+
+    @concurrently(2, engine=AsyncIOEngine, result_buffer=Buffer(high=4))
+    async def _parallel():
+        for d in range(50):
+            produced.append(d)
+            yield d
+
+    await asyncio.sleep(0.1)
+    assert len(produced) <= 6
+
+    results = [d async for d in _parallel.as_completed()]
+
+    assert len(results) == 100
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_thread_engine_results():
+    produced = []
+
+    @concurrently(2, engine=AsyncIOThreadEngine, result_buffer=Buffer(high=4))
+    def _parallel():
+        for d in range(50):
+            produced.append(d)
+            yield d
+
+    await asyncio.sleep(0.1)
+    assert len(produced) <= 6
+
+    results = [d async for d in _parallel.as_completed()]
+
+    assert len(results) == 100
+
+
+def test_process_engine_results():
+    @concurrently(2, engine=ProcessEngine, result_size=2)
+    def _parallel():
+        for d in range(50):
+            yield d
+            if d == 10:
+                raise RuntimeError()
+
+    time.sleep(0.2)
+
+    with pytest.raises(RuntimeError):
+        _parallel(fail_hard=True)
+
+
+def test_get_timeout():
+    buffer = Buffer()
+
+    with pytest.raises(TimeoutError):
+        buffer.get(timeout=0.1)
@@ -0,0 +1,173 @@
+import asyncio
+from functools import partial
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    AsyncIOThreadEngine,
+    Chunks,
+    GeventEngine,
+    Metrics,
+    ProcessEngine,
+    ProcessPoolEngine,
+    RateLimit,
+    ThreadEngine,
+    ThreadPoolEngine,
+    UnhandledExceptions,
+    concurrently,
+)
+from concurrently.engines import Batch
+
+
+def _square(d):
+    return d * d
+
+
+def _fail_on_five(d):
+    if d == 5:
+        raise RuntimeError()
+    return d
+
+
+@pytest.mark.parametrize(
+    'engine',
+    [
+        ThreadEngine,
+        ThreadPoolEngine,
+        GeventEngine,
+        ProcessEngine,
+        ProcessPoolEngine,
+    ],
+)
+@pytest.mark.parametrize('size', [None, 7], ids=['tuned', 'fixed'])
+def test_map(engine, size):
+    metrics = Metrics()
+    chunks = Chunks(size)
+
+    waiter = concurrently.map(
+        _square, range(100), 3, engine=engine, chunks=chunks, observer=metrics
+    )
+    waiter()
+
+    assert sorted(waiter.results()) == [d * d for d in range(100)]
+    assert metrics.results == 100
+    assert metrics['_square'].finished == 3
+
+
+def test_as_completed():
+    waiter = concurrently.map(
+        _square, range(10), 1, engine=ThreadEngine, chunks=4
+    )
+
+    assert list(waiter.as_completed()) == [d * d for d in range(10)]
+
+
+def test_split():
+    chunks = Chunks(3)
+
+    assert list(chunks.split(range(7))) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_tune():
+    chunks = Chunks(target=0.01, max_size=1000)
+    assert chunks.size == 1
+
+    chunks.tune(Batch([None] * 10, 0.001))
+    assert chunks.size == pytest.approx(100, abs=1)
+
+    # slow chunk is mostly waiting, the lowest time is kept
+    chunks.tune(Batch([None] * 10, 0.1))
+    assert 90 <= chunks.size < 100
+
+    chunks.tune(Batch([None] * 10, 0.000001))
+    assert chunks.size == 1000
+
+    fixed = Chunks(5)
+    fixed.tune(Batch([None] * 10, 0.001))
+    assert fixed.size == 5
+
+
+@pytest.mark.parametrize(
+    'engine',
+    [ThreadEngine, GeventEngine, ProcessEngine, ProcessPoolEngine],
+)
+def test_exception(engine):
+    waiter = concurrently.map(
+        _fail_on_five, range(10), 2, engine=engine, chunks=3
+    )
+
+    with pytest.raises(UnhandledExceptions) as exc:
+        waiter()
+
+    assert len(exc.value.exceptions) == 1
+    # other items of the failed chunk are processed
+    assert sorted(waiter.results()) == [0, 1, 2, 3, 4, 6, 7, 8, 9]
+
+
+def test_exception_fail_hard():
+    waiter = concurrently.map(
+        _fail_on_five, range(10), 1, engine=ThreadEngine, chunks=3
+    )
+
+    with pytest.raises(RuntimeError):
+        waiter(fail_hard=True)
+
+    # results of the chunk before the failed item
+    assert waiter.results() == (0, 1, 2, 3, 4)
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_exception_asyncio():
+    async def _process(d):
+        return _fail_on_five(d)
+
+    waiter = concurrently.map(
+        _process, range(10), 2, engine=AsyncIOEngine, chunks=3
+    )
+    await waiter(suppress_exceptions=True)
+
+    assert sorted(waiter.results()) == [0, 1, 2, 3, 4, 6, 7, 8, 9]
+    assert len(waiter.exceptions()) == 1
+
+
+def test_rate():
+    with pytest.raises(ValueError):
+        concurrently.map(
+            _square,
+            range(10),
+            engine=ThreadEngine,
+            chunks=3,
+            rate=RateLimit(10),
+        )
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_engine():
+    async def _process(d):
+        await asyncio.sleep(0)
+        return d
+
+    chunks = Chunks()
+    waiter = concurrently.map(
+        _process, range(100), 2, engine=AsyncIOEngine, chunks=chunks
+    )
+    await waiter()
+
+    assert sorted(waiter.results()) == list(range(100))
+    assert chunks.size > 1
+
+    waiter = concurrently.map(
+        _square, range(100), 2, engine=AsyncIOThreadEngine, chunks=10
+    )
+    await waiter()
+
+    assert sorted(waiter.results()) == [d * d for d in range(100)]
+
+    # chunks of partial coroutine are awaited too
+    waiter = concurrently.map(
+        partial(_process), range(10), 2, engine=AsyncIOEngine, chunks=3
+    )
+    await waiter()
+
+    assert sorted(waiter.results()) == list(range(10))
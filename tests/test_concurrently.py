@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import tracemalloc
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    AsyncIOThreadEngine,
+    Buffer,
+    GeventEngine,
+    ProcessEngine,
+    ProcessPoolEngine,
+    ThreadEngine,
+    ThreadPool,
+    ThreadPoolEngine,
+    UnhandledExceptions,
+    concurrently,
+    get_default_engine,
+    set_default_engine,
+    use_engine,
+)
+
+
+def _fail_on_odd(d):
+    if d % 2:
+        raise ValueError(d)
+    return d
+
+
+def test_default_engine_in_thread():
+    engines = []
+    thread = threading.Thread(
+        target=lambda: engines.append(get_default_engine())
+    )
+    thread.start()
+    thread.join()
+
+    assert engines == [AsyncIOEngine]
+
+
+def test_set_default_engine():
+    set_default_engine(ThreadEngine)
+    try:
+        waiter = concurrently.map(lambda d: d, range(3), 2)
+        waiter()
+
+        assert sorted(waiter.results()) == [0, 1, 2]
+    finally:
+        set_default_engine(AsyncIOEngine)
+
+
+def test_use_engine_nested():
+    pool = ThreadPool(4)
+
+    def _double_all():
+        waiter = concurrently.map(lambda d: d * 2, range(3), 2)
+        waiter()
+        return get_default_engine(), waiter.results()
+
+    with concurrently.use_engine(ThreadPoolEngine, pool=pool):
+        # the engine applies to functions started in the block
+        waiter = concurrently(2)(_double_all)
+        waiter()
+
+    assert waiter.results() == ((ThreadPoolEngine, (0, 2, 4)),) * 2
+    assert get_default_engine() is AsyncIOEngine
+    pool.shutdown()
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_use_engine_asyncio_tasks():
+    async def _engine_of_task():
+        await asyncio.sleep(0)
+        return get_default_engine()
+
+    with use_engine(ThreadEngine):
+        task = asyncio.ensure_future(_engine_of_task())
+
+    assert await task is ThreadEngine
+    assert await _engine_of_task() is AsyncIOEngine
+
+
+def test_use_engine_instance():
+    with ThreadEngine() as engine, use_engine(engine):
+        waiter = concurrently.map(lambda d: d, range(3), 2)
+        waiter()
+
+        assert sorted(waiter.results()) == [0, 1, 2]
+        assert get_default_engine() is ThreadEngine
+
+        with pytest.raises(ValueError):
+            concurrently(1, stop_timeout=1)(lambda: None)
+
+
+@pytest.mark.parametrize(
+    'engine',
+    [
+        ThreadEngine,
+        ThreadPoolEngine,
+        GeventEngine,
+        ProcessEngine,
+        ProcessPoolEngine,
+    ],
+)
+def test_map_item_errors(engine):
+    waiter = concurrently.map(_fail_on_odd, range(100), 4, engine=engine)
+
+    with pytest.raises(UnhandledExceptions) as exc:
+        waiter()
+
+    # workers go on after exceptions of their items
+    assert sorted(waiter.results()) == list(range(0, 100, 2))
+    assert sorted(e.args[0] for e in exc.value.exceptions) == list(
+        range(1, 100, 2)
+    )
+
+
+def test_map_item_errors_fail_hard():
+    waiter = concurrently.map(_fail_on_odd, range(100), 1, engine=ThreadEngine)
+
+    with pytest.raises(ValueError):
+        waiter(fail_hard=True)
+
+    # results till the first exception
+    assert waiter.results() == (0,)
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_map_item_errors_asyncio():
+    async def _process(d):
+        return _fail_on_odd(d)
+
+    waiter = concurrently.map(_process, range(100), 4, engine=AsyncIOEngine)
+    await waiter(suppress_exceptions=True)
+
+    assert sorted(waiter.results()) == list(range(0, 100, 2))
+    assert len(waiter.exceptions()) == 50
+
+    waiter = concurrently.map(
+        _fail_on_odd, range(100), 4, engine=AsyncIOThreadEngine
+    )
+    await waiter(suppress_exceptions=True)
+
+    assert len(waiter.results()) == len(waiter.exceptions()) == 50
+
+
+def _map_peak(count):
+    waiter = concurrently.map(
+        str, range(count), 4, engine=ThreadEngine, result_buffer=Buffer(100)
+    )
+    tracemalloc.start()
+    try:
+        waiter(keep_results=False)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_map_without_results():
+    _map_peak(100)  # warm up imports and caches
+
+    # 100000 kept results would take several MB
+    assert _map_peak(100000) < 512 * 1024
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_map_without_results_asyncio():
+    async def _process(d):
+        return str(d)
+
+    waiter = concurrently.map(_process, range(1000), 4, engine=AsyncIOEngine)
+    await waiter(keep_results=False)
+
+    assert waiter.results() == ()
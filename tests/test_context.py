@@ -0,0 +1,196 @@
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    GeventEngine,
+    ProcessPool,
+    ProcessPoolEngine,
+    ThreadEngine,
+    ThreadPool,
+    UnhandledExceptions,
+    WorkerContext,
+    concurrently,
+)
+
+
+class Connections:
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connect(self):
+        with self._lock:
+            conn = len(self.opened)
+            self.opened.append(conn)
+        try:
+            yield conn
+        finally:
+            self.closed.append(conn)
+
+    @asynccontextmanager
+    async def connect_async(self):
+        with self.connect() as conn:
+            yield conn
+
+
+@contextmanager
+def _process_resource():
+    yield os.getpid(), id(object())
+
+
+def _get_resource(d):
+    return _resources.get()
+
+
+_resources = WorkerContext(_process_resource, keep=True)
+
+
+def test_thread_engine():
+    conns = Connections()
+    connections = WorkerContext(conns.connect)
+
+    @concurrently(2, engine=ThreadEngine, context=connections)
+    def _parallel():
+        return connections.get()
+
+    _parallel()
+
+    assert sorted(_parallel.results()) == [0, 1]
+    assert sorted(conns.closed) == [0, 1]
+    with pytest.raises(LookupError):
+        connections.get()
+
+
+def test_factory():
+    conns = Connections()
+
+    waiter = concurrently.map(
+        lambda d: d, range(4), 2, engine=ThreadEngine, context=conns.connect
+    )
+    waiter()
+
+    assert sorted(waiter.results()) == [0, 1, 2, 3]
+    assert sorted(conns.closed) == [0, 1]
+
+
+def test_keep():
+    conns = Connections()
+    connections = WorkerContext(conns.connect, keep=True)
+    pool = ThreadPool()
+
+    for _ in range(3):
+        waiter = concurrently.map(
+            lambda d: connections.get(),
+            range(4),
+            2,
+            engine=ThreadEngine,
+            pool=pool,
+            context=connections,
+        )
+        waiter()
+        assert set(waiter.results()) <= {0, 1}
+
+    # resources are reused by workers of next calls
+    assert len(conns.opened) <= 2
+    assert conns.closed == []
+
+    connections.close()
+    pool.shutdown()
+
+    assert sorted(conns.closed) == conns.opened
+
+
+def test_exception_closes():
+    conns = Connections()
+    connections = WorkerContext(conns.connect, keep=True)
+
+    @concurrently(2, engine=ThreadEngine, context=connections)
+    def _parallel():
+        if connections.get() == 0:
+            raise RuntimeError()
+
+    with pytest.raises(UnhandledExceptions):
+        _parallel()
+
+    assert conns.closed == [0]
+
+    connections.close()
+    assert sorted(conns.closed) == [0, 1]
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_engine():
+    conns = Connections()
+    connections = WorkerContext(conns.connect_async, keep=True)
+
+    async def _process(d):
+        return connections.get()
+
+    for _ in range(2):
+        waiter = concurrently.map(
+            _process, range(4), 2, engine=AsyncIOEngine, context=connections
+        )
+        await waiter()
+        assert set(waiter.results()) <= {0, 1}
+
+    @concurrently(2, engine=AsyncIOEngine, context=connections)
+    async def _parallel():
+        await asyncio.sleep(0.01)
+        yield connections.get()
+
+    await _parallel()
+
+    assert sorted(_parallel.results()) == [0, 1]
+    assert len(conns.opened) == 2
+    assert conns.closed == []
+
+    await connections.close_async()
+    assert sorted(conns.closed) == [0, 1]
+
+
+def test_gevent_engine():
+    conns = Connections()
+    connections = WorkerContext(conns.connect)
+
+    waiter = concurrently.map(
+        lambda d: connections.get(),
+        range(4),
+        2,
+        engine=GeventEngine,
+        context=connections,
+    )
+    waiter()
+
+    assert set(waiter.results()) <= {0, 1}
+    assert sorted(conns.closed) == [0, 1]
+
+
+def test_process_pool_engine():
+    pool = ProcessPool(2)
+
+    try:
+        results = set()
+        for _ in range(3):
+            waiter = concurrently.map(
+                _get_resource,
+                range(4),
+                2,
+                engine=ProcessPoolEngine,
+                pool=pool,
+                context=_resources,
+            )
+            waiter()
+            results.update(waiter.results())
+    finally:
+        pool.shutdown()
+
+    # every process opens the resource once
+    assert 1 <= len(results) <= 2
+    assert os.getpid() not in {pid for pid, _ in results}
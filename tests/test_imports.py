@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+import pytest  # type: ignore
+
+import concurrently
+from concurrently.engines.thread import ThreadEngine
+
+
+def _modules_after(statement):
+    code = 'import sys; {}; print(" ".join(sys.modules))'.format(statement)
+    out = subprocess.run(
+        [sys.executable, '-c', code],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    return set(out.split())
+
+
+def test_lazy_engines():
+    modules = _modules_after('import concurrently')
+
+    assert 'concurrently' in modules
+    for name in ('asyncio', 'multiprocessing', 'gevent', 'ctypes'):
+        assert name not in modules
+
+    modules = _modules_after('from concurrently import ThreadEngine')
+
+    assert 'concurrently.engines.thread' in modules
+    assert 'asyncio' not in modules
+    assert 'multiprocessing' not in modules
+
+
+def test_getattr():
+    assert concurrently.ThreadEngine is ThreadEngine
+    assert 'ThreadEngine' in dir(concurrently)
+
+    with pytest.raises(AttributeError):
+        concurrently.NoEngine
@@ -0,0 +1,225 @@
+import asyncio
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    AsyncIOThreadEngine,
+    Buffer,
+    GeventEngine,
+    Metrics,
+    Observer,
+    ProcessEngine,
+    ProcessPoolEngine,
+    ThreadEngine,
+    ThreadPoolEngine,
+    UnhandledExceptions,
+    concurrently,
+)
+from concurrently.metrics import Histogram
+
+
+def _square(d):
+    time.sleep(0.01)
+    return d * d
+
+
+@pytest.mark.parametrize(
+    'engine',
+    [
+        ThreadEngine,
+        ThreadPoolEngine,
+        GeventEngine,
+        ProcessEngine,
+        ProcessPoolEngine,
+    ],
+)
+def test_map(engine):
+    metrics = Metrics()
+
+    waiter = concurrently.map(
+        _square, range(4), 2, engine=engine, observer=metrics
+    )
+    waiter()
+
+    assert sorted(waiter.results()) == [0, 1, 4, 9]
+    counters = metrics['_square']
+    assert counters.started == 2
+    assert counters.finished == 2
+    assert counters.running == 0
+    assert counters.latency.count == 2
+    assert counters.latency.max >= 0.02
+    assert metrics.results == 4
+    assert counters.items == counters.item_latency.count == 4
+    assert counters.item_latency.max >= 0.01
+
+
+def test_map_failed_items():
+    metrics = Metrics()
+
+    def _fail_on_odd(d):
+        if d % 2:
+            raise ValueError(d)
+        return d
+
+    waiter = concurrently.map(
+        _fail_on_odd, range(10), 2, engine=ThreadEngine, observer=metrics
+    )
+    waiter(suppress_exceptions=True)
+
+    counters = metrics['_fail_on_odd']
+    assert counters.items == 10
+    assert counters.failed_items == len(waiter.exceptions()) == 5
+    assert counters.finished == 2
+
+
+def test_error():
+    metrics = Metrics()
+
+    @concurrently(3, engine=ThreadEngine, observer=metrics)
+    def _parallel():
+        raise RuntimeError()
+
+    with pytest.raises(UnhandledExceptions):
+        _parallel()
+
+    assert metrics['_parallel'].failed == 3
+    assert metrics['_parallel'].finished == 0
+    assert metrics.results == 0
+
+
+def test_cancel():
+    metrics = Metrics()
+
+    @concurrently(2, engine=ThreadEngine, observer=metrics)
+    def _parallel():
+        while True:
+            time.sleep(0.01)
+
+    time.sleep(0.05)
+    _parallel.stop()
+
+    assert metrics['_parallel'].cancelled == 2
+    assert metrics['_parallel'].running == 0
+
+
+def test_observer():
+    events = []
+
+    class Events(Observer):
+        def on_event(self, event):
+            events.append((event.kind, event.name))
+            assert event.started <= time.monotonic()
+
+    @concurrently(1, engine=ThreadEngine, observer=Events())
+    def _parallel():
+        yield 1
+        yield 2
+
+    _parallel()
+
+    assert _parallel.results() == (1, 2)
+    assert events == [('start', '_parallel'), ('finish', '_parallel')]
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_engine():
+    metrics = Metrics()
+
+    async def _process(d):
+        await asyncio.sleep(0.01)
+        return d
+
+    waiter = concurrently.map(
+        _process, range(4), 2, engine=AsyncIOEngine, observer=metrics
+    )
+    await waiter()
+
+    assert sorted(waiter.results()) == [0, 1, 2, 3]
+    assert metrics['_process'].finished == 2
+    assert metrics['_process'].items == 4
+    assert metrics['_process'].item_latency.max >= 0.01
+
+    @concurrently(2, engine=AsyncIOEngine, observer=metrics)
+    async def _endless():
+        while True:
+            await asyncio.sleep(0.01)
+
+    await asyncio.sleep(0.05)
+    await _endless.stop()
+
+    assert metrics['_endless'].cancelled == 2
+
+    waiter = concurrently.map(
+        _square, range(4), 2, engine=AsyncIOThreadEngine, observer=metrics
+    )
+    await waiter()
+
+    assert metrics['_square'].finished == 2
+    assert metrics['_square'].items == 4
+
+
+def test_histogram():
+    histogram = Histogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.max == 1.0
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.125)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.125)
+    assert histogram.quantile(1) == 1.0
+    assert list(histogram.cumulative([0.000001, 0.5, 2])) == [
+        (0.000001, 0),
+        (0.5, pytest.approx(500, rel=0.125)),
+        (2, 1000),
+    ]
+
+
+def test_exposition():
+    metrics = Metrics(prefix='app')
+
+    @concurrently(2, engine=ThreadEngine, observer=metrics)
+    def _parallel():
+        return 1
+
+    _parallel()
+    text = metrics.exposition()
+
+    assert '# TYPE app_started_total counter' in text
+    assert 'app_started_total{function="_parallel"} 2' in text
+    assert 'app_running{function="_parallel"} 0' in text
+    assert 'app_duration_seconds_bucket{function="_parallel",le="+Inf"} 2' in (
+        text
+    )
+    assert 'app_duration_seconds_count{function="_parallel"} 2' in text
+    assert 'app_results_total 2' in text
+
+    text = metrics.exposition(openmetrics=True)
+
+    assert '# TYPE app_started counter' in text
+    assert 'app_started_total{function="_parallel"} 2' in text
+    assert text.endswith('# EOF\n')
+
+
+def test_exposition_items():
+    metrics = Metrics(prefix='app')
+    items = Buffer()
+    metrics.gauge('buffered_items', lambda: len(items), 'Items waiting.')
+
+    for d in range(4):
+        items.put(d)
+    assert 'app_buffered_items 4' in metrics.exposition()
+
+    items.close()
+    concurrently.map(
+        lambda d: d, items, 2, engine=ThreadEngine, observer=metrics
+    )()
+    text = metrics.exposition()
+
+    assert '# HELP app_buffered_items Items waiting.' in text
+    assert '# TYPE app_buffered_items gauge' in text
+    assert 'app_buffered_items 0' in text
+    assert 'app_items_total{function="<lambda>"} 4' in text
+    assert 'app_item_duration_seconds_count{function="<lambda>"} 4' in text
@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    AsyncIOThreadEngine,
+    Pipeline,
+    ProcessPoolEngine,
+    ThreadEngine,
+)
+
+
+def _double(d):
+    return d * 2
+
+
+def _inc(d):
+    return d + 1
+
+
+def _fail_on_ten(d):
+    if d == 10:
+        raise RuntimeError(d)
+    return d
+
+
+def _slow(d):
+    time.sleep(0.01)
+    return d
+
+
+def test_stages():
+    waiter = (
+        Pipeline(range(100))
+        .stage(_double, 4, engine=ThreadEngine)
+        .stage(_inc, 2, engine=ProcessPoolEngine)
+        .start()
+    )
+    waiter()
+
+    assert sorted(waiter.results()) == [d * 2 + 1 for d in range(100)]
+    stats = waiter.stats()
+    assert [s.name for s in stats] == ['_double', '_inc']
+    assert [s.results for s in stats] == [100, 100]
+    assert all(s.rate > 0 for s in stats)
+
+
+def test_as_completed():
+    waiter = Pipeline(range(10)).stage(_inc, engine=ThreadEngine).start()
+
+    assert list(waiter.as_completed()) == list(range(1, 11))
+
+
+def test_error():
+    waiter = (
+        Pipeline(itertools.count())
+        .stage(_double, 2, engine=ThreadEngine)
+        .stage(_fail_on_ten, 2, engine=ThreadEngine)
+        .start()
+    )
+
+    # endless items of the first stage are stopped too
+    with pytest.raises(RuntimeError):
+        waiter()
+
+
+def test_stop():
+    waiter = (
+        Pipeline(itertools.count())
+        .stage(_double, 2, engine=ThreadEngine)
+        .stage(_slow, 2, engine=ThreadEngine)
+        .start()
+    )
+    time.sleep(0.2)
+
+    start_time = time.monotonic()
+    waiter.stop()
+
+    assert time.monotonic() - start_time < 0.5
+
+
+def test_backlog():
+    waiter = (
+        Pipeline(range(100), buffer_size=10)
+        .stage(_double, 2, engine=ThreadEngine)
+        .stage(_slow, 1, engine=ThreadEngine)
+        .start()
+    )
+    time.sleep(0.2)
+
+    fast, slow = waiter.stats()
+    assert slow.backlog >= 5
+    assert fast.stalled > 0
+    waiter.stop()
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_async():
+    async def _fetch(d):
+        await asyncio.sleep(0.001)
+        return d
+
+    waiter = (
+        Pipeline(range(50))
+        .stage(_fetch, 10, engine=AsyncIOEngine)
+        .stage(_double, 2, engine=AsyncIOThreadEngine)
+        .start()
+    )
+    await waiter()
+
+    assert sorted(waiter.results()) == [d * 2 for d in range(50)]
+
+    with pytest.raises(ValueError):
+        (
+            Pipeline(range(50))
+            .stage(_fetch, 10, engine=AsyncIOEngine)
+            .stage(_double, 2, engine=ThreadEngine)
+            .start()
+        )
@@ -0,0 +1,177 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    GeventEngine,
+    PriorityBuffer,
+    ThreadEngine,
+    concurrently,
+)
+
+
+def _fill(buffer, items):
+    for priority, item in items:
+        buffer.put(item, priority)
+    buffer.close()
+
+
+def test_order():
+    buffer = PriorityBuffer()
+    _fill(buffer, [(2, 'a'), (0, 'b'), (1, 'c'), (0, 'd'), (2, 'e')])
+
+    assert list(buffer) == ['b', 'd', 'c', 'a', 'e']
+
+
+def test_items_not_compared():
+    buffer = PriorityBuffer()
+    _fill(buffer, [(0, {}), (0, {})])
+
+    assert list(buffer) == [{}, {}]
+
+
+def test_weights():
+    buffer = PriorityBuffer(weights={0: 3, 1: 1})
+    _fill(buffer, [(1, 'batch')] * 10 + [(0, 'fast')] * 10)
+
+    items = list(buffer)
+
+    # every 4 items have 3 of the first priority while both are waiting
+    assert items[:4].count('fast') == items[4:8].count('fast') == 3
+    assert items.count('fast') == items.count('batch') == 10
+
+
+def test_weights_idle_priority():
+    buffer = PriorityBuffer(weights={0: 1, 1: 1})
+    for _ in range(5):
+        buffer.put('batch', 1)
+    for _ in range(4):
+        buffer.get()
+
+    # the priority without items didn't save credit meanwhile
+    buffer.put('fast', 0)
+    buffer.put('fast', 0)
+    buffer.close()
+
+    assert list(buffer) == ['fast', 'batch', 'fast']
+
+
+def test_watermarks():
+    buffer = PriorityBuffer(high=2, low=0)
+    buffer.put(0, 1)
+    buffer.put(1, 1)
+
+    producer = threading.Thread(target=buffer.put, args=(2, 0))
+    producer.start()
+    producer.join(0.05)
+    assert producer.is_alive()
+
+    buffer.get()
+    buffer.get()
+    producer.join(1)
+    assert not producer.is_alive()
+
+
+def test_live_producer():
+    buffer = PriorityBuffer(high=4, weights={0: 2, 1: 1})
+
+    producer = threading.Thread(
+        target=_fill, args=(buffer, [(d % 2, d) for d in range(100)])
+    )
+    producer.start()
+    waiter = concurrently.map(
+        lambda d: time.sleep(0.001) or d, buffer, 2, engine=ThreadEngine
+    )
+    waiter()
+    producer.join()
+
+    assert sorted(waiter.results()) == list(range(100))
+
+
+def test_gevent_live_producer():
+    # greenlets wait in the buffer only with patched threading
+    code = """
+from gevent import monkey
+monkey.patch_all()
+import gevent
+from concurrently import GeventEngine, PriorityBuffer, concurrently
+
+buffer = PriorityBuffer(high=4)
+
+def _produce():
+    for d in range(50):
+        buffer.put(d, d % 2)
+    buffer.close()
+
+producer = gevent.spawn(_produce)
+waiter = concurrently.map(
+    lambda d: gevent.sleep(0.001) or d, buffer, 2, engine=GeventEngine
+)
+waiter()
+producer.join()
+print(sorted(waiter.results()) == list(range(50)))
+"""
+    out = subprocess.run(
+        [sys.executable, '-c', code],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        timeout=30,
+    ).stdout
+
+    assert out.strip() == 'True'
+
+
+@pytest.mark.parametrize('engine', [ThreadEngine, GeventEngine])
+def test_engines(engine):
+    # filled before the start, so greenlets don't wait without patching
+    buffer = PriorityBuffer()
+    _fill(buffer, [(d % 3, d) for d in range(30)])
+
+    waiter = concurrently.map(lambda d: d, buffer, 1, engine=engine)
+
+    assert list(waiter.as_completed()) == sorted(
+        range(30), key=lambda d: d % 3
+    )
+
+
+def test_jump_ahead():
+    buffer = PriorityBuffer()
+    for d in range(10):
+        buffer.put(d, 1)
+
+    def _process(d):
+        time.sleep(0.02)
+        return d
+
+    waiter = concurrently.map(_process, buffer, 1, engine=ThreadEngine)
+    time.sleep(0.03)
+    buffer.put('fast', 0)
+    buffer.close()
+
+    results = list(waiter.as_completed())
+
+    assert results.index('fast') <= 3
+    assert len(results) == 11
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_engine():
+    buffer = PriorityBuffer(high=5, weights={0: 2, 1: 1})
+
+    async def _process(d):
+        await asyncio.sleep(0)
+        return d
+
+    waiter = concurrently.map(_process, buffer, 1, engine=AsyncIOEngine)
+    for d in range(20):
+        await buffer.put_async(d, d % 2)
+    buffer.close()
+    await waiter()
+
+    assert sorted(waiter.results()) == list(range(20))
@@ -0,0 +1,184 @@
+import asyncio
+import time
+
+import gevent  # type: ignore
+import pytest  # type: ignore
+
+from concurrently import (
+    AsyncIOEngine,
+    GeventEngine,
+    ProcessEngine,
+    ProcessPool,
+    ProcessPoolEngine,
+    RateLimit,
+    ThreadEngine,
+    concurrently,
+)
+
+
+def _stamp(d):
+    return time.monotonic()
+
+
+def _check_rate(stamps, rate, burst=1):
+    stamps = sorted(stamps)
+    # the first `burst` items go at once, others wait for tokens
+    assert stamps[-1] - stamps[0] >= (len(stamps) - burst) / rate - 0.02
+    assert stamps[-1] - stamps[0] < (len(stamps) - burst) / rate + 0.3
+
+
+def test_reserve():
+    rate = RateLimit(10, burst=3)
+
+    delays = [rate.reserve() for _ in range(5)]
+
+    assert delays[:3] == [0, 0, 0]
+    assert delays[3] == pytest.approx(0.1, abs=0.01)
+    assert delays[4] == pytest.approx(0.2, abs=0.01)
+
+
+def test_reserve_refill():
+    rate = RateLimit(20, burst=2)
+    rate.reserve()
+    rate.reserve()
+
+    time.sleep(0.1)
+
+    assert rate.reserve() == 0
+    assert rate.reserve() == 0
+    assert rate.reserve() > 0
+
+
+def test_reserve_keys():
+    rate = RateLimit(1, key=lambda url: url.split('/')[2])
+
+    assert rate.reserve(rate.key_of('http://a/1')) == 0
+    assert rate.reserve(rate.key_of('http://b/1')) == 0
+    assert rate.reserve(rate.key_of('http://a/2')) > 0
+
+
+def test_reserve_shared():
+    rate = RateLimit(10)
+    rate.reserve('a')
+
+    rate.share()
+
+    assert rate.reserve('a') > 0
+    assert rate.reserve('b') == 0
+
+
+def test_shared_keys_overflow():
+    rate = RateLimit(10, keys=2)
+    rate.share()
+    rate.reserve('a')
+    rate.reserve('b')
+
+    with pytest.raises(RuntimeError):
+        rate.reserve('c')
+
+
+def test_thread_engine():
+    rate = RateLimit(50)
+
+    waiter = concurrently.map(
+        _stamp, range(20), 4, engine=ThreadEngine, rate=rate
+    )
+    waiter()
+
+    _check_rate(waiter.results(), 50)
+
+
+def test_thread_engine_keys():
+    rate = RateLimit(20, burst=2, key=lambda d: d % 2)
+
+    waiter = concurrently.map(
+        _stamp, range(20), 4, engine=ThreadEngine, rate=rate
+    )
+    waiter()
+
+    # two buckets double the rate
+    _check_rate(waiter.results(), 40, burst=4)
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_engine():
+    rate = RateLimit(50)
+
+    async def _request(d):
+        return time.monotonic()
+
+    waiter = concurrently.map(
+        _request, range(20), 4, engine=AsyncIOEngine, rate=rate
+    )
+    await waiter()
+
+    _check_rate(waiter.results(), 50)
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_asyncio_wait():
+    rate = RateLimit(50)
+    stamps = []
+
+    @concurrently(4, engine=AsyncIOEngine)
+    async def _worker():
+        for _ in range(5):
+            await rate.wait_async()
+            stamps.append(time.monotonic())
+            await asyncio.sleep(0)
+
+    await _worker()
+
+    _check_rate(stamps, 50)
+
+
+def test_gevent_engine():
+    rate = RateLimit(50)
+    ticks = []
+
+    def _ticker():
+        # greenlets must not block the hub while waiting for tokens
+        while True:
+            ticks.append(time.monotonic())
+            gevent.sleep(0.01)
+
+    ticker = gevent.spawn(_ticker)
+    waiter = concurrently.map(
+        _stamp, range(20), 4, engine=GeventEngine, rate=rate
+    )
+    waiter()
+    ticker.kill()
+
+    _check_rate(waiter.results(), 50)
+    assert len(ticks) > 10
+
+
+def test_process_engine():
+    rate = RateLimit(50)
+
+    waiter = concurrently.map(
+        _stamp, range(20), 4, engine=ProcessEngine, rate=rate
+    )
+    waiter()
+
+    _check_rate(waiter.results(), 50)
+
+
+def test_process_pool_engine():
+    rate = RateLimit(50)
+    pool = ProcessPool(4)
+
+    try:
+        waiter = concurrently.map(
+            _stamp,
+            range(20),
+            4,
+            engine=ProcessPoolEngine,
+            pool=pool,
+            rate=rate,
+        )
+        waiter()
+    finally:
+        pool.shutdown()
+
+    _check_rate(waiter.results(), 50)
@@ -0,0 +1,85 @@
+import time
+
+import pytest  # type: ignore
+
+from concurrently import (
+    ProcessPool,
+    ProcessPoolEngine,
+    ThreadEngine,
+    ThreadPoolEngine,
+    WorkStealing,
+    concurrently,
+)
+
+
+def _sleep(d):
+    time.sleep(d)
+    return d
+
+
+def _square(d):
+    return d * d
+
+
+def test_partition():
+    jobs = WorkStealing.partition(range(10), 3)
+
+    assert len(jobs) == 10
+    assert [list(p) for p in jobs._deques] == [
+        [0, 1, 2, 3],
+        [4, 5, 6, 7],
+        [8, 9],
+    ]
+
+
+def test_steal():
+    jobs = WorkStealing([[0, 1, 2], [3]])
+    first, second = iter(jobs), iter(jobs)
+
+    assert next(first) == 0
+    assert next(second) == 3
+    # the end of the largest partition is stolen
+    assert next(second) == 2
+    assert list(first) == [1]
+    assert list(second) == []
+
+
+@pytest.mark.parametrize('engine', [ThreadEngine, ThreadPoolEngine])
+def test_threads(engine):
+    jobs = WorkStealing.partition(range(10000), 8)
+
+    waiter = concurrently.map(_square, jobs, 8, engine=engine)
+    waiter()
+
+    assert sorted(waiter.results()) == [d * d for d in range(10000)]
+    assert len(jobs) == 0
+
+
+def test_skewed_partitions():
+    # all long jobs are in the partition of the first worker
+    jobs = WorkStealing([[0.2] * 4, [], [], []])
+
+    start_time = time.monotonic()
+    waiter = concurrently.map(_sleep, jobs, 4, engine=ThreadEngine)
+    waiter()
+
+    assert time.monotonic() - start_time < 0.6
+    assert waiter.results() == (0.2,) * 4
+
+
+def test_process_pool():
+    pool = ProcessPool(4)
+    pool.start()
+    try:
+        jobs = WorkStealing([[0.2] * 4, [], [], []])
+
+        start_time = time.monotonic()
+        waiter = concurrently.map(
+            _sleep, jobs, 4, engine=ProcessPoolEngine, pool=pool
+        )
+        waiter()
+
+        assert time.monotonic() - start_time < 0.6
+        assert waiter.results() == (0.2,) * 4
+    finally:
+        pool.shutdown()